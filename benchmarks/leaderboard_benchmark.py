@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Benchmark for Kingdom of Aldoria
+Load-tests LeaderboardManager against synthetic seasons and reports
+throughput and latency percentiles per operation as JSON
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+from typing import Dict, List, Any
+
+# Allow running from the repository root or from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.systems.leaderboard_system import LeaderboardManager, LeaderboardType, PartitionMode
+
+DEFAULT_MIX = {
+    "update_score": 40,
+    "bulk_update": 5,
+    "get_leaderboard": 25,
+    "get_player_ranking": 15,
+    "get_neighborhood": 5,
+    "get_percentile": 5,
+    "claim_rewards": 5
+}
+
+# Not in the default mix: a player jumps from their rank to first place, which
+# shifts every row in between (the worst case for a single update)
+EXTRA_OPERATIONS = ("climb_to_top",)
+
+# Synthetic players created by seed_season
+BENCH_USERS = "user_id LIKE 'bench\\_%' ESCAPE '\\'"
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse an operation mix like 'update_score=50,get_leaderboard=50'"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX and name not in EXTRA_OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {name}")
+        mix[name] = int(weight)
+    return mix
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency summary for one operation (latencies in seconds)"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "throughput_per_sec": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 4) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if count else 0.0
+    }
+
+def seed_season(manager: LeaderboardManager, entries: int, pending_rewards: int,
+                rng: random.Random) -> Dict[str, Any]:
+    """Insert a synthetic season straight into the database.
+
+    Entries are spread evenly over every LeaderboardType with ranks already
+    assigned, so the manager starts from a consistent board. Rows left by an
+    earlier run against the same --database file are cleared first.
+    """
+    started = time.perf_counter()
+    season_id = manager.current_season.season_id
+    per_type = max(1, entries // len(LeaderboardType))
+    now = time.time()
+
+    for lb_type in LeaderboardType:
+        # Entries live in the board's partition file when storage is partitioned
+        board_conn = sqlite3.connect(manager._board_pool(lb_type.value).database_path)
+        try:
+            board_conn.execute(f'''
+                DELETE FROM leaderboard_entries
+                WHERE leaderboard_type = ? AND season_id = ? AND {BENCH_USERS}
+            ''', (lb_type.value, season_id))
+            scores = sorted((rng.randint(0, 1_000_000) for _ in range(per_type)), reverse=True)
+            chunk = []
+            for rank, score in enumerate(scores, 1):
+                user_id = f"bench_{rank}_{lb_type.value}"
+                chunk.append((user_id, f"Player{rank}", lb_type.value, season_id, score,
+                              rank, rank, rng.randint(1, 80), now - rank * 0.001))
+                if len(chunk) >= 50_000:
+                    _insert_entries(board_conn, chunk)
+                    chunk = []
+            _insert_entries(board_conn, chunk)
+            board_conn.commit()
+        finally:
+            board_conn.close()
+
+    conn = sqlite3.connect(manager.database_path)
+    try:
+        conn.execute(f'DELETE FROM leaderboard_rewards WHERE {BENCH_USERS}')
+
+        # Unclaimed rewards for claim_rewards to work through
+        reward_rows = [
+            (f"bench_{rng.randint(1, per_type)}_{LeaderboardType.POWER_LEVEL.value}", "season_bench",
+             LeaderboardType.POWER_LEVEL.value, 100, "silver", json.dumps([{"reward_type": "gems", "amount": 400}]))
+            for _ in range(pending_rewards)
+        ]
+        conn.executemany('''
+            INSERT INTO leaderboard_rewards (user_id, season_id, leaderboard_type, rank_achieved, tier, rewards)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', reward_rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    seed_seconds = time.perf_counter() - started
+
+    # Build rank indexes and histograms up front so they are not charged to the first writes
+    started = time.perf_counter()
+    for lb_type in LeaderboardType:
+        manager._recalculate_rankings(lb_type.value)
+    warmup_seconds = time.perf_counter() - started
+
+    return {
+        "entries_per_type": per_type,
+        "total_entries": per_type * len(LeaderboardType),
+        "pending_rewards": pending_rewards,
+        "seed_seconds": round(seed_seconds, 3),
+        "index_warmup_seconds": round(warmup_seconds, 3)
+    }
+
+def _insert_entries(conn: sqlite3.Connection, rows: List[tuple]):
+    if rows:
+        conn.executemany('''
+            INSERT INTO leaderboard_entries
+            (user_id, username, leaderboard_type, season_id, score, rank_position,
+             previous_rank, level, last_updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+def run_workload(manager: LeaderboardManager, mix: Dict[str, int], threads: int,
+                 operations: int, entries_per_type: int, seed: int) -> Dict[str, Any]:
+    """Drive a mixed workload from several threads and collect latencies"""
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    lb_types = list(LeaderboardType)
+
+    # Reward ids available to claim, shared between workers
+    conn = sqlite3.connect(manager.database_path)
+    reward_queue = conn.execute(
+        'SELECT id, user_id FROM leaderboard_rewards WHERE claimed = 0'
+    ).fetchall()
+    conn.close()
+    reward_lock = threading.Lock()
+
+    per_thread = max(1, operations // threads)
+    results: List[Dict[str, List[float]]] = []
+    results_lock = threading.Lock()
+
+    def random_user(rng: random.Random, lb_type: LeaderboardType) -> str:
+        return f"bench_{rng.randint(1, entries_per_type)}_{lb_type.value}"
+
+    def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        latencies: Dict[str, List[float]] = {name: [] for name in names}
+
+        for _ in range(per_thread):
+            name = rng.choices(names, weights)[0]
+            lb_type = rng.choice(lb_types)
+
+            if name == "claim_rewards":
+                with reward_lock:
+                    claim = reward_queue.pop() if reward_queue else None
+                if claim is None:
+                    continue
+            elif name == "climb_to_top":
+                climber = random_user(rng, lb_type)
+                top = manager.get_leaderboard(lb_type, 1)
+                current = manager.get_player_ranking(climber, lb_type)
+                climb = (top[0].score if top else 0) - (current.score if current else 0) + 1
+
+            started = time.perf_counter()
+            if name == "update_score":
+                manager.update_player_score(random_user(rng, lb_type), "Bench", lb_type,
+                                            rng.randint(-500, 5000))
+            elif name == "bulk_update":
+                manager.update_player_scores_bulk([
+                    (random_user(rng, lb_type), lb_type, rng.randint(-500, 5000)) for _ in range(50)
+                ])
+            elif name == "get_leaderboard":
+                manager.get_leaderboard(lb_type, rng.choice([10, 50, 100]))
+            elif name == "get_player_ranking":
+                manager.get_player_ranking(random_user(rng, lb_type), lb_type)
+            elif name == "get_neighborhood":
+                manager.get_leaderboard_neighborhood(random_user(rng, lb_type), lb_type, 5)
+            elif name == "get_percentile":
+                manager.get_player_percentile(random_user(rng, lb_type), lb_type)
+            elif name == "claim_rewards":
+                manager.claim_rewards(claim[1], claim[0])
+            elif name == "climb_to_top":
+                manager.update_player_score(climber, "Bench", lb_type, climb)
+            latencies[name].append(time.perf_counter() - started)
+
+        with results_lock:
+            results.append(latencies)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged: Dict[str, List[float]] = {name: [] for name in names}
+    for latencies in results:
+        for name, values in latencies.items():
+            merged[name].extend(values)
+
+    all_latencies = [value for values in merged.values() for value in values]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "operations": {name: summarize(values, elapsed) for name, values in merged.items()},
+        "total": summarize(all_latencies, elapsed)
+    }
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix="aldoria_lb_bench_")
+    database_path = args.database or os.path.join(work_dir, "leaderboards.db")
+    rng = random.Random(args.seed)
+
+    report: Dict[str, Any] = {
+        "benchmark": "leaderboard",
+        "config": {
+            "entries": args.entries,
+            "threads": args.threads,
+            "operations": args.operations,
+            "mix": args.mix,
+            "seed": args.seed,
+            "partition_mode": args.partition_mode.value,
+            "database": database_path
+        }
+    }
+
+    manager = LeaderboardManager(database_path, partition_mode=args.partition_mode)
+    try:
+        report["setup"] = seed_season(manager, args.entries, args.pending_rewards, rng)
+        report["workload"] = run_workload(manager, args.mix, args.threads, args.operations,
+                                          report["setup"]["entries_per_type"], args.seed)
+
+        if not args.skip_season_end:
+            started = time.perf_counter()
+            manager.force_season_end()
+            report["season_end"] = {"seconds": round(time.perf_counter() - started, 3)}
+    finally:
+        manager.close()
+        if not args.keep and not args.database:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LeaderboardManager under a mixed workload")
+    parser.add_argument("--entries", type=int, default=10_000,
+                        help="Synthetic entries in the season, split across all leaderboard types")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent worker threads")
+    parser.add_argument("--operations", type=int, default=20_000, help="Total operations across all threads")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Operation weights, e.g. update_score=50,get_leaderboard=50 "
+                             "(climb_to_top times the worst-case single update)")
+    parser.add_argument("--pending-rewards", type=int, default=2_000, help="Unclaimed rewards to seed for claim_rewards")
+    parser.add_argument("--partition-mode", type=PartitionMode, default=PartitionMode.NONE,
+                        choices=list(PartitionMode), metavar="{none,season,season_type}",
+                        help="Leaderboard storage layout: one database file, per season, or per season and type")
+    parser.add_argument("--skip-season-end", action="store_true", help="Do not time a forced season end")
+    parser.add_argument("--database", help="Benchmark against this database file instead of a temporary one")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary database afterwards")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Per-update INFO logging would dominate the measurements
+    logging.basicConfig(level=logging.ERROR)
+
+    report = run_benchmark(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Save Benchmark for Kingdom of Aldoria
+Measures SaveManager load, save, export/import and backup costs on synthetic
+player saves from a fresh game up to two years of play, and reports wall time,
+bytes written and peak memory per operation as JSON
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import pstats
+import logging
+import argparse
+import cProfile
+import tempfile
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+# Allow running from the repository root or from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.core.config import Config
+from src.systems.save_manager import SaveManager, canonical_json
+
+# Days of play per synthetic save profile
+PROFILES = {
+    "fresh": 0,
+    "1_week": 7,
+    "3_months": 90,
+    "1_year": 365,
+    "2_years": 730
+}
+
+DAY = 86400
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def written_bytes() -> Optional[int]:
+    """Bytes this process has passed to write calls so far (Linux only)"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def generate_player_data(manager: SaveManager, days: int, rng: random.Random) -> Dict[str, Any]:
+    """Grow a fresh save as if it had been played daily for the given days"""
+    data = json.loads(canonical_json(manager.player_data))
+    now = time.time()
+    start = now - days * DAY
+    data["created_time"] = start
+    data["play_time"] = days * rng.uniform(1200, 3600)
+
+    player = data["player"]
+    player["level"] = min(100, 1 + days // 7)
+    player["xp"] = rng.randint(0, 10_000)
+
+    progress = data["progress"]
+    progress["stages_completed"] = min(300, days * 2)
+    progress["current_world"] = min(9, progress["stages_completed"] // 30)
+    progress["worlds_unlocked"] = progress["current_world"] + 1
+    progress["bosses_defeated"] = progress["stages_completed"] // 5
+
+    data["currency"] = {"gold": rng.randint(0, 5_000_000), "gems": rng.randint(0, 50_000)}
+
+    inventory = data["inventory"]
+    inventory["weapons"] += [f"weapon_{i}" for i in range(min(120, days // 5))]
+    inventory["skins"] += [f"skin_{i}" for i in range(min(60, days // 10))]
+    inventory["items"] = {f"item_{i}": rng.randint(1, 99) for i in range(min(400, days))}
+    data["weapon_levels"] = {weapon: rng.randint(1, 50) for weapon in inventory["weapons"]}
+
+    stats = data["stats"]
+    stats["battles_won"] = days * rng.randint(5, 20)
+    stats["battles_lost"] = days * rng.randint(0, 5)
+    stats["ads_watched"] = days * 4
+    stats["daily_login_streak"] = min(days, 30)
+
+    # Sections that grow with every day played
+    daily_views = {}
+    for day in range(days):
+        date = time.strftime("%Y-%m-%d", time.gmtime(start + day * DAY))
+        daily_views[date] = {"rewarded": rng.randint(0, 10), "interstitial": rng.randint(0, 6),
+                             "gems_earned": rng.randint(0, 40), "gold_earned": rng.randint(0, 2000)}
+    data["ads"] = {
+        "watched_today": rng.randint(0, 10),
+        "total_watched": days * 4,
+        "last_ad_time": now,
+        "last_reset_date": time.strftime("%Y-%m-%d"),
+        "total_gems_earned": days * 20,
+        "total_gold_earned": days * 1000,
+        "analytics": {"daily_views": daily_views}
+    }
+
+    data["transactions"] = [
+        {"id": f"txn_{i}", "package": rng.choice(["starter", "gems_small", "gems_large", "monthly"]),
+         "timestamp": start + i * DAY / 3, "amount": rng.choice([0.99, 4.99, 9.99, 14.99]),
+         "method": "card"}
+        for i in range(days * 3)
+    ]
+
+    data["competitions"] = {
+        f"week_{week}": {"score": rng.randint(0, 100_000), "rank": rng.randint(1, 5000),
+                         "ads_watched": rng.randint(0, 70), "rewards_claimed": True,
+                         "joined": start + week * 7 * DAY}
+        for week in range(days // 7)
+    }
+    return data
+
+def measure(operation: Callable[[], Any], iterations: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time an operation, tracking bytes written and peak traced memory"""
+    timings = []
+    bytes_written = []
+    peak_memory = 0
+
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        before = written_bytes()
+        tracemalloc.start()
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        after = written_bytes()
+        if before is not None and after is not None:
+            bytes_written.append(after - before)
+
+    values = sorted(timings)
+    return {
+        "iterations": iterations,
+        "mean_ms": round(sum(values) / len(values) * 1000, 4),
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4),
+        "bytes_written": round(sum(bytes_written) / len(bytes_written)) if bytes_written else None,
+        "peak_memory_kb": round(peak_memory / 1024, 1)
+    }
+
+def profile_load(manager: SaveManager, top: int) -> List[Dict[str, Any]]:
+    """cProfile one _load_player_data call and return the costliest functions"""
+    profiler = cProfile.Profile()
+    profiler.runcall(manager._load_player_data)
+
+    stats = pstats.Stats(profiler, stream=StringIO())
+    stats.sort_stats("cumulative")
+    rows = []
+    for func in stats.fcn_list[:top]:
+        calls, _, total_time, cumulative_time, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total_time * 1000, 4),
+            "cumulative_ms": round(cumulative_time * 1000, 4)
+        })
+    return rows
+
+def directory_bytes(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+def benchmark_profile(name: str, days: int, args: argparse.Namespace, work_dir: Path) -> Dict[str, Any]:
+    """Run every measurement against one synthetic save"""
+    rng = random.Random(args.seed + days)
+    Config.SAVE_DIR = work_dir / name
+
+    manager = SaveManager()
+    try:
+        manager.player_data = generate_player_data(manager, days, rng)
+        manager.mark_dirty()
+        manager.save_game_data(force=True)
+
+        result: Dict[str, Any] = {
+            "days_played": days,
+            "sections": len(manager.player_data),
+            "player_data_json_bytes": len(canonical_json(manager.player_data)),
+            "save_file_bytes": manager.player_save_file.stat().st_size
+        }
+
+        operations = {}
+        operations["load_player_data"] = measure(manager._load_player_data, args.iterations)
+        operations["startup"] = measure(lambda: SaveManager(), args.iterations)
+
+        # First access to each lazily decoded section after a load
+        operations["first_access_lazy_sections"] = measure(
+            lambda: [manager.get_player_data(section) for section in SaveManager.LAZY_SECTIONS],
+            args.iterations, setup=manager._load_player_data
+        )
+
+        counter = iter(range(1_000_000_000))
+        operations["incremental_save"] = measure(
+            lambda: manager.save_game_data(), args.iterations,
+            setup=lambda: manager.set_player_data("currency.gold", next(counter))
+        )
+        operations["full_save"] = measure(
+            lambda: manager.save_game_data(force=True), args.iterations,
+            setup=lambda: manager.set_player_data("currency.gems", next(counter))
+        )
+
+        exported = manager.export_save_data()
+        operations["export"] = measure(manager.export_save_data, args.iterations)
+        operations["import"] = measure(lambda: manager.import_save_data(exported), args.iterations)
+
+        # Each backup gets distinct content so deduplication does not skip it
+        backup_data = json.loads(canonical_json(manager.player_data))
+        payload = []
+
+        def next_backup():
+            backup_data["currency"]["gold"] = next(counter)
+            payload[:] = [canonical_json(backup_data).encode('utf-8')]
+
+        operations["backup"] = measure(lambda: manager.backup_store.add(payload[0]), args.iterations,
+                                       setup=next_backup)
+
+        result["operations"] = operations
+        result["backup_dir_bytes"] = directory_bytes(manager.backup_dir)
+        result["save_dir_bytes"] = directory_bytes(Config.SAVE_DIR)
+
+        if args.profile:
+            result["load_profile"] = profile_load(manager, args.profile_top)
+        return result
+    finally:
+        manager.cleanup()
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    work_dir = Path(tempfile.mkdtemp(prefix="aldoria_save_bench_"))
+    original_save_dir = Config.SAVE_DIR
+
+    report: Dict[str, Any] = {
+        "benchmark": "save",
+        "config": {
+            "profiles": args.profiles,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "profile": args.profile,
+            "work_dir": str(work_dir)
+        },
+        "profiles": {}
+    }
+
+    try:
+        for name in args.profiles:
+            report["profiles"][name] = benchmark_profile(name, PROFILES[name], args, work_dir)
+    finally:
+        Config.SAVE_DIR = original_save_dir
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return report
+
+def parse_profiles(text: str) -> List[str]:
+    """Parse a comma-separated list of save profiles"""
+    names = [name.strip() for name in text.split(",")]
+    for name in names:
+        if name not in PROFILES:
+            raise argparse.ArgumentTypeError(f"Unknown profile: {name} (choose from {', '.join(PROFILES)})")
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SaveManager on synthetic saves of growing age")
+    parser.add_argument("--profiles", type=parse_profiles, default=list(PROFILES),
+                        help=f"Comma-separated save sizes to test ({', '.join(PROFILES)})")
+    parser.add_argument("--iterations", type=int, default=10, help="Repetitions per operation")
+    parser.add_argument("--profile", action="store_true",
+                        help="Include a cProfile breakdown of _load_player_data for each save")
+    parser.add_argument("--profile-top", type=int, default=15, help="Functions to list in the load profile")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary save directories afterwards")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Per-save INFO logging would dominate the measurements
+    logging.basicConfig(level=logging.ERROR)
+
+    report = run_benchmark(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Sync Benchmark for Kingdom of Aldoria
+Runs DatabaseManager sync paths against the local Firestore stand-in with
+simulated latency, bandwidth and failures, for accounts of growing size, and
+reports round-trips, bytes and wall time per scenario as JSON
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Any
+
+# Allow running from the repository root or from this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.core.config import Config
+
+# Keep the missing-Firebase notice out of the JSON report on stdout
+with redirect_stdout(sys.stderr):
+    from src.systems.database_manager import DatabaseManager, MockFirestore
+
+# Inventory items and stage progress rows per synthetic account
+ACCOUNTS = {
+    "new": {"items": 10, "stages": 5},
+    "casual": {"items": 150, "stages": 60},
+    "veteran": {"items": 1500, "stages": 300},
+    "collector": {"items": 10000, "stages": 300}
+}
+
+USER_ID = "bench_player"
+
+def seed_account(manager: DatabaseManager, items: int, stages: int, rng: random.Random):
+    """Create a local-only account with the given inventory and stage progress"""
+    with manager.transaction():
+        manager.create_user(USER_ID)
+        manager.add_currency(USER_ID, 'gold', rng.randint(0, 1_000_000))
+        manager.add_currency(USER_ID, 'gems', rng.randint(0, 10_000))
+        for i in range(items):
+            item_type = rng.choice(["weapon", "skin", "material", "consumable"])
+            manager.add_inventory_item(USER_ID, item_type, f"{item_type}_{i}", rng.randint(1, 99))
+        for i in range(stages):
+            manager.update_stage_progress(USER_ID, i // 30 + 1, i % 30 + 1, True,
+                                          rng.randint(1, 3), rng.uniform(20, 300))
+
+def play_session(manager: DatabaseManager, rng: random.Random, items: int):
+    """A few minutes of play: rewards, a couple of drops and one stage"""
+    with manager.transaction():
+        for _ in range(5):
+            manager.add_currency(USER_ID, rng.choice(['gold', 'gems']), rng.randint(1, 500))
+        for _ in range(3):
+            manager.add_inventory_item(USER_ID, "material", f"material_{rng.randrange(max(1, items))}")
+        stage = rng.randrange(300)
+        manager.update_stage_progress(USER_ID, stage // 30 + 1, stage % 30 + 1, True,
+                                      3, rng.uniform(20, 300))
+
+def measure_sync(manager: DatabaseManager, store: MockFirestore, max_attempts: int) -> Dict[str, Any]:
+    """Sync until it succeeds (or attempts run out) and report what it cost"""
+    store.reset_stats()
+    attempts = 0
+    synced = False
+    started = time.perf_counter()
+    while attempts < max_attempts and not synced:
+        attempts += 1
+        synced = manager._attempt_online_sync(USER_ID)
+    elapsed = time.perf_counter() - started
+
+    result: Dict[str, Any] = {
+        "success": synced,
+        "attempts": attempts,
+        "wall_ms": round(elapsed * 1000, 3)
+    }
+    result.update(store.stats)
+    return result
+
+def average(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean of numeric fields across repeated measurements"""
+    summary: Dict[str, Any] = {"iterations": len(results),
+                               "success": all(result["success"] for result in results)}
+    for key, value in results[0].items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            summary[key] = round(sum(result[key] for result in results) / len(results), 3)
+    return summary
+
+def open_manager(save_dir: Path, store: MockFirestore) -> DatabaseManager:
+    Config.SAVE_DIR = save_dir
+    manager = DatabaseManager(None)
+    # Syncs are driven by the benchmark, not the background worker
+    manager.auto_sync_enabled = False
+    manager.firestore_db = store
+    return manager
+
+def benchmark_account(name: str, size: Dict[str, int], args: argparse.Namespace,
+                      work_dir: Path) -> Dict[str, Any]:
+    """Run every sync scenario for one account size"""
+    rng = random.Random(args.seed)
+    store = MockFirestore(latency=args.latency_ms / 1000,
+                          bandwidth=args.bandwidth_kbps * 125 if args.bandwidth_kbps else None,
+                          error_rate=args.error_rate, seed=args.seed)
+
+    manager = open_manager(work_dir / f"{name}_device_a", store)
+    try:
+        started = time.perf_counter()
+        seed_account(manager, size["items"], size["stages"], rng)
+        result: Dict[str, Any] = {
+            "inventory_rows": len(manager.get_inventory(USER_ID)),
+            "stage_rows": len(manager.get_stage_progress(USER_ID)),
+            "seed_seconds": round(time.perf_counter() - started, 3)
+        }
+
+        scenarios = {}
+        scenarios["initial_upload"] = measure_sync(manager, store, args.max_attempts)
+        # Pulls this device's own upload back once
+        scenarios["first_resync"] = measure_sync(manager, store, args.max_attempts)
+        scenarios["idle_sync"] = measure_sync(manager, store, args.max_attempts)
+
+        sessions = []
+        for _ in range(args.iterations):
+            play_session(manager, rng, size["items"])
+            sessions.append(measure_sync(manager, store, args.max_attempts))
+        scenarios["incremental_sync"] = average(sessions)
+    finally:
+        manager.cleanup()
+
+    # A second device restoring the whole account
+    device_b = open_manager(work_dir / f"{name}_device_b", store)
+    try:
+        scenarios["new_device_restore"] = measure_sync(device_b, store, args.max_attempts)
+        result["restored_inventory_rows"] = len(device_b.get_inventory(USER_ID))
+    finally:
+        device_b.cleanup()
+
+    result["scenarios"] = scenarios
+    result["remote_documents"] = {collection: len(documents) for collection, documents in store.data.items()}
+    return result
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    work_dir = Path(tempfile.mkdtemp(prefix="aldoria_sync_bench_"))
+    original_save_dir = Config.SAVE_DIR
+
+    report: Dict[str, Any] = {
+        "benchmark": "sync",
+        "config": {
+            "accounts": args.accounts,
+            "latency_ms": args.latency_ms,
+            "bandwidth_kbps": args.bandwidth_kbps,
+            "error_rate": args.error_rate,
+            "max_attempts": args.max_attempts,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "work_dir": str(work_dir)
+        },
+        "accounts": {}
+    }
+
+    try:
+        for name in args.accounts:
+            report["accounts"][name] = benchmark_account(name, ACCOUNTS[name], args, work_dir)
+    finally:
+        Config.SAVE_DIR = original_save_dir
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return report
+
+def parse_accounts(text: str) -> List[str]:
+    """Parse a comma-separated list of account sizes"""
+    names = [name.strip() for name in text.split(",")]
+    for name in names:
+        if name not in ACCOUNTS:
+            raise argparse.ArgumentTypeError(f"Unknown account: {name} (choose from {', '.join(ACCOUNTS)})")
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager sync against a simulated remote store")
+    parser.add_argument("--accounts", type=parse_accounts, default=list(ACCOUNTS),
+                        help=f"Comma-separated account sizes to test ({', '.join(ACCOUNTS)})")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated latency per remote request")
+    parser.add_argument("--bandwidth-kbps", type=float, default=4000.0,
+                        help="Simulated link speed in kilobits per second (0 for unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of remote requests that fail")
+    parser.add_argument("--max-attempts", type=int, default=10, help="Sync attempts per scenario before giving up")
+    parser.add_argument("--iterations", type=int, default=5, help="Play sessions synced in the incremental scenario")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary databases afterwards")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Per-sync logging, including every injected failure, would flood the report
+    logging.basicConfig(level=logging.CRITICAL)
+
+    report = run_benchmark(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -209,10 +209,9 @@ class Game:
         """Cleanup resources before shutdown"""
         self.logger.info("Cleaning up game resources")
         
-        # Save game data
+        # Save game data and drain the background save worker
         try:
-            self.save_manager.save_game_data()
-            self.logger.info("Game data saved successfully")
+            self.save_manager.cleanup()
         except Exception as e:
             self.logger.error(f"Failed to save game data: {e}")
         
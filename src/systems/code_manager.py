@@ -8,9 +8,11 @@ import time
 import hashlib
 import json
 import sqlite3
+from contextlib import nullcontext
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from ..core.config import Config
+from .sqlite_connections import SQLiteConnectionPool
 
 class CodeManager:
     """Manages promo codes and redemption system"""
@@ -19,8 +21,8 @@ class CodeManager:
         self.game = game
         self.logger = logging.getLogger(__name__)
         
-        # Database connection
-        self.sqlite_conn = None
+        # Database connections
+        self.connections: Optional[SQLiteConnectionPool] = None
         
         # Code types and rewards
         self.code_types = {
@@ -43,14 +45,14 @@ class CodeManager:
             db_path = Config.SAVE_DIR / "codes.db"
             Config.SAVE_DIR.mkdir(exist_ok=True)
             
-            self.sqlite_conn = sqlite3.connect(str(db_path), check_same_thread=False)
-            self.sqlite_conn.row_factory = sqlite3.Row
+            self.connections = SQLiteConnectionPool(str(db_path), row_factory=sqlite3.Row)
             
-            # Create tables
-            self._create_tables()
-            
-            # Insert default codes
-            self._create_default_codes()
+            with self.connections.transaction():
+                # Create tables
+                self._create_tables()
+                
+                # Insert default codes
+                self._create_default_codes()
             
             self.logger.info("Code database initialized")
             
@@ -58,6 +60,11 @@ class CodeManager:
             self.logger.error(f"Failed to initialize code database: {e}")
             raise
 
+    @property
+    def sqlite_conn(self) -> sqlite3.Connection:
+        """This thread's connection (the writer inside a transaction)"""
+        return self.connections.connection()
+
     def _create_tables(self):
         """Create code management tables"""
         cursor = self.sqlite_conn.cursor()
@@ -110,8 +117,6 @@ class CodeManager:
                 FOREIGN KEY (code) REFERENCES promo_codes (code)
             )
         ''')
-        
-        self.sqlite_conn.commit()
 
     def _create_default_codes(self):
         """Create some default promotional codes"""
@@ -166,8 +171,6 @@ class CodeManager:
                 code_data['usage_limit'], code_data['end_date'], code_data['created_by'],
                 current_time, current_time
             ))
-        
-        self.sqlite_conn.commit()
 
     def create_code(self, code: str, name: str, description: str = "", 
                    code_type: str = "custom", reward_gems: int = 0, 
@@ -199,19 +202,18 @@ class CodeManager:
             reward_items_json = json.dumps(reward_items) if reward_items else None
             
             # Insert new code
-            cursor.execute('''
-                INSERT INTO promo_codes 
-                (code, name, description, code_type, reward_gems, reward_gold, 
-                 reward_items, usage_limit, start_date, end_date, created_by, 
-                 created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                code, name, description, code_type, reward_gems, reward_gold,
-                reward_items_json, usage_limit, current_time, end_date, created_by,
-                current_time, current_time
-            ))
-            
-            self.sqlite_conn.commit()
+            with self.connections.transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO promo_codes 
+                    (code, name, description, code_type, reward_gems, reward_gold, 
+                     reward_items, usage_limit, start_date, end_date, created_by, 
+                     created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    code, name, description, code_type, reward_gems, reward_gold,
+                    reward_items_json, usage_limit, current_time, end_date, created_by,
+                    current_time, current_time
+                ))
             
             self.logger.info(f"Created promo code: {code} by {created_by}")
             
@@ -239,104 +241,108 @@ class CodeManager:
     def redeem_code(self, user_id: str, code: str, ip_address: str = "unknown") -> Dict[str, Any]:
         """Redeem a promo code for a user"""
         try:
-            cursor = self.sqlite_conn.cursor()
             current_time = int(time.time())
             
-            # Get code information
-            cursor.execute('''
-                SELECT * FROM promo_codes WHERE code = ? AND active = TRUE
-            ''', (code.upper(),))
-            
-            code_data = cursor.fetchone()
-            if not code_data:
-                return {
-                    'success': False,
-                    'message': 'Invalid or inactive code.'
-                }
-            
-            code_dict = dict(code_data)
-            
-            # Check if code is expired
-            if code_dict['end_date'] > 0 and current_time > code_dict['end_date']:
-                return {
-                    'success': False,
-                    'message': 'Code has expired.'
-                }
-            
-            # Check if code hasn't started yet
-            if code_dict['start_date'] > 0 and current_time < code_dict['start_date']:
-                return {
-                    'success': False,
-                    'message': 'Code is not yet active.'
-                }
-            
-            # Check usage limit
-            if code_dict['current_usage'] >= code_dict['usage_limit']:
-                return {
-                    'success': False,
-                    'message': 'Code usage limit reached.'
-                }
-            
-            # Check if user already redeemed this code
-            cursor.execute('''
-                SELECT id FROM code_redemptions 
-                WHERE user_id = ? AND code = ?
-            ''', (user_id, code.upper()))
-            
-            if cursor.fetchone():
-                return {
-                    'success': False,
-                    'message': 'You have already redeemed this code.'
-                }
-            
-            # Process redemption
-            rewards_granted = {}
-            
-            # Grant gems
-            if code_dict['reward_gems'] > 0:
-                db_manager = self.game.get_system('database_manager')
-                if db_manager:
-                    db_manager.add_currency(user_id, 'gems', code_dict['reward_gems'])
-                    rewards_granted['gems'] = code_dict['reward_gems']
-            
-            # Grant gold
-            if code_dict['reward_gold'] > 0:
+            # Checks and writes share one write transaction, so concurrent
+            # redemptions cannot both pass the usage limit
+            with self.connections.transaction():
+                cursor = self.sqlite_conn.cursor()
+                
+                # Get code information
+                cursor.execute('''
+                    SELECT * FROM promo_codes WHERE code = ? AND active = TRUE
+                ''', (code.upper(),))
+                
+                code_data = cursor.fetchone()
+                if not code_data:
+                    return {
+                        'success': False,
+                        'message': 'Invalid or inactive code.'
+                    }
+                
+                code_dict = dict(code_data)
+                
+                # Check if code is expired
+                if code_dict['end_date'] > 0 and current_time > code_dict['end_date']:
+                    return {
+                        'success': False,
+                        'message': 'Code has expired.'
+                    }
+                
+                # Check if code hasn't started yet
+                if code_dict['start_date'] > 0 and current_time < code_dict['start_date']:
+                    return {
+                        'success': False,
+                        'message': 'Code is not yet active.'
+                    }
+                
+                # Check usage limit
+                if code_dict['current_usage'] >= code_dict['usage_limit']:
+                    return {
+                        'success': False,
+                        'message': 'Code usage limit reached.'
+                    }
+                
+                # Check if user already redeemed this code
+                cursor.execute('''
+                    SELECT id FROM code_redemptions 
+                    WHERE user_id = ? AND code = ?
+                ''', (user_id, code.upper()))
+                
+                if cursor.fetchone():
+                    return {
+                        'success': False,
+                        'message': 'You have already redeemed this code.'
+                    }
+                
+                # Process redemption
+                rewards_granted = {}
                 db_manager = self.game.get_system('database_manager')
-                if db_manager:
-                    db_manager.add_currency(user_id, 'gold', code_dict['reward_gold'])
-                    rewards_granted['gold'] = code_dict['reward_gold']
-            
-            # Grant items
-            if code_dict['reward_items']:
-                try:
-                    items = json.loads(code_dict['reward_items'])
-                    db_manager = self.game.get_system('database_manager')
-                    if db_manager and items:
-                        for item_type, item_list in items.items():
-                            for item_id, quantity in item_list.items():
-                                db_manager.add_inventory_item(user_id, item_type, item_id, quantity)
-                        rewards_granted['items'] = items
-                except json.JSONDecodeError:
-                    pass
-            
-            # Record redemption
-            cursor.execute('''
-                INSERT INTO code_redemptions 
-                (user_id, code, redeemed_at, reward_claimed, ip_address)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, code.upper(), current_time, json.dumps(rewards_granted), ip_address))
-            
-            # Update code usage
-            cursor.execute('''
-                UPDATE promo_codes 
-                SET current_usage = current_usage + 1, updated_at = ?
-                WHERE code = ?
-            ''', (current_time, code.upper()))
-            
-            # Update analytics
-            self._update_code_analytics(code.upper(), code_dict['reward_gems'], code_dict['reward_gold'])
-            
-            self.sqlite_conn.commit()
+                
+                # Rewards reach the player database in a single commit. A failed
+                # grant raises, so neither database keeps a partial redemption
+                with db_manager.transaction() if db_manager else nullcontext():
+                    # Grant gems
+                    if code_dict['reward_gems'] > 0 and db_manager:
+                        if not db_manager.add_currency(user_id, 'gems', code_dict['reward_gems']):
+                            raise RuntimeError(f"Could not add {code_dict['reward_gems']} gems for {user_id}")
+                        rewards_granted['gems'] = code_dict['reward_gems']
+                    
+                    # Grant gold
+                    if code_dict['reward_gold'] > 0 and db_manager:
+                        if not db_manager.add_currency(user_id, 'gold', code_dict['reward_gold']):
+                            raise RuntimeError(f"Could not add {code_dict['reward_gold']} gold for {user_id}")
+                        rewards_granted['gold'] = code_dict['reward_gold']
+                    
+                    # Grant items
+                    if code_dict['reward_items']:
+                        try:
+                            items = json.loads(code_dict['reward_items'])
+                            if db_manager and items:
+                                for item_type, item_list in items.items():
+                                    for item_id, quantity in item_list.items():
+                                        if not db_manager.add_inventory_item(user_id, item_type, item_id, quantity):
+                                            raise RuntimeError(f"Could not add {quantity} {item_id} for {user_id}")
+                                rewards_granted['items'] = items
+                        except json.JSONDecodeError:
+                            pass
+                
+                # Record redemption
+                cursor.execute('''
+                    INSERT INTO code_redemptions 
+                    (user_id, code, redeemed_at, reward_claimed, ip_address)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (user_id, code.upper(), current_time, json.dumps(rewards_granted), ip_address))
+                
+                # Update code usage
+                cursor.execute('''
+                    UPDATE promo_codes 
+                    SET current_usage = current_usage + 1, updated_at = ?
+                    WHERE code = ?
+                ''', (current_time, code.upper()))
+                
+                # Update analytics (committed together with the redemption)
+                self._update_code_analytics(code.upper(), code_dict['reward_gems'], code_dict['reward_gold'])
             
             self.logger.info(f"Code {code} redeemed by {user_id}")
             
@@ -492,13 +498,12 @@ class CodeManager:
             values.append(code.upper())
             
             # Execute update
-            cursor.execute(f'''
-                UPDATE promo_codes 
-                SET {', '.join(update_fields)}
-                WHERE code = ?
-            ''', values)
-            
-            self.sqlite_conn.commit()
+            with self.connections.transaction() as cursor:
+                cursor.execute(f'''
+                    UPDATE promo_codes 
+                    SET {', '.join(update_fields)}
+                    WHERE code = ?
+                ''', values)
             
             self.logger.info(f"Updated code: {code}")
             
@@ -527,16 +532,15 @@ class CodeManager:
                     'message': 'Code not found.'
                 }
             
-            # Delete redemptions first (foreign key constraint)
-            cursor.execute('DELETE FROM code_redemptions WHERE code = ?', (code.upper(),))
-            
-            # Delete analytics
-            cursor.execute('DELETE FROM code_analytics WHERE code = ?', (code.upper(),))
-            
-            # Delete code
-            cursor.execute('DELETE FROM promo_codes WHERE code = ?', (code.upper(),))
-            
-            self.sqlite_conn.commit()
+            with self.connections.transaction() as cursor:
+                # Delete redemptions first (foreign key constraint)
+                cursor.execute('DELETE FROM code_redemptions WHERE code = ?', (code.upper(),))
+                
+                # Delete analytics
+                cursor.execute('DELETE FROM code_analytics WHERE code = ?', (code.upper(),))
+                
+                # Delete code
+                cursor.execute('DELETE FROM promo_codes WHERE code = ?', (code.upper(),))
             
             self.logger.info(f"Deleted code: {code}")
             
@@ -651,7 +655,7 @@ class CodeManager:
             return []
 
     def _update_code_analytics(self, code: str, gems_given: int, gold_given: int):
-        """Update daily analytics for a code"""
+        """Update daily analytics for a code (the caller commits)"""
         try:
             cursor = self.sqlite_conn.cursor()
             today = datetime.now().strftime('%Y-%m-%d')
@@ -680,8 +684,6 @@ class CodeManager:
                     VALUES (?, ?, 1, 1, ?, ?)
                 ''', (code, today, gems_given, gold_given))
             
-            self.sqlite_conn.commit()
-            
         except Exception as e:
             self.logger.error(f"Failed to update analytics for {code}: {e}")
 
@@ -699,8 +701,8 @@ class CodeManager:
     def cleanup(self):
         """Cleanup database connections"""
         try:
-            if self.sqlite_conn:
-                self.sqlite_conn.close()
+            if self.connections:
+                self.connections.close_all()
                 
             self.logger.info("CodeManager cleaned up")
             
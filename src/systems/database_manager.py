@@ -7,11 +7,13 @@ import sqlite3
 import json
 import time
 import logging
+import random
 import hashlib
 import threading
-from typing import Dict, List, Optional, Any, Tuple
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any, Tuple, Set
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 try:
     import firebase_admin
@@ -21,7 +23,196 @@ except ImportError:
     FIREBASE_AVAILABLE = False
     print("Firebase not available - running in offline mode only")
 
+# Stamp replaced by the store's commit time when a document is written, so a
+# document's synced_at orders it by when it became visible to readers
+SERVER_TIMESTAMP = firestore.SERVER_TIMESTAMP if FIREBASE_AVAILABLE else object()
+
 from ..core.config import Config
+from .sqlite_connections import SQLiteConnectionPool
+
+# Tables synced with the remote store: collection name and the columns that
+# identify a row within one user's data
+SYNC_TABLES = {
+    'player_data': ('players', ()),
+    'inventory': ('inventory', ('item_type', 'item_id')),
+    'stage_progress': ('stage_progress', ('world_id', 'stage_id'))
+}
+
+# Firestore rejects write batches with more operations than this
+MAX_BATCH_WRITES = 500
+
+class SyncWorker:
+    """Background thread that runs DatabaseManager syncs off the game thread.
+    
+    request() only records which tables of which user need syncing. Requests
+    for the same table are coalesced until it has been quiet for `debounce`
+    seconds, but never held back longer than `max_wait`. Failed syncs are
+    retried with exponential backoff and jitter. While auto sync is enabled a
+    full sync of the current user is also queued every `sync_interval`.
+    Changes themselves are tracked in SQLite, so dropping the queue on
+    shutdown loses nothing.
+    """
+    
+    def __init__(self, manager: "DatabaseManager", debounce: float = 2.0, max_wait: float = 30.0,
+                 base_retry_delay: float = 1.0, max_retry_delay: float = 300.0):
+        self.manager = manager
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.base_retry_delay = base_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.logger = logging.getLogger(__name__)
+        
+        # (user_id, table_name) -> [due time, first requested time]
+        self._pending: Dict[Tuple[str, str], List[float]] = {}
+        self._in_flight: List[Tuple[str, str]] = []
+        self._failures = 0  # Consecutive failed syncs
+        self._retry_at = 0.0
+        self._last_periodic = time.time()
+        self._stopping = False
+        self._condition = threading.Condition()
+        
+        self.metrics = {
+            'syncs_requested': 0,
+            'syncs_completed': 0,
+            'syncs_failed': 0,
+            'last_sync_ms': 0.0,
+            'last_success_time': 0.0
+        }
+        
+        self._worker = threading.Thread(target=self._run, name="database-sync-worker", daemon=True)
+        self._worker.start()
+    
+    def request(self, user_id: str, tables: Optional[List[str]] = None, delay: Optional[float] = None):
+        """Queue a sync of some tables (all synced tables by default); returns immediately
+        
+        delay overrides the debounce; 0 runs the sync as soon as backoff allows.
+        """
+        delay = self.debounce if delay is None else delay
+        now = time.time()
+        
+        with self._condition:
+            if self._stopping:
+                return
+            
+            for table_name in tables or SYNC_TABLES:
+                key = (user_id, table_name)
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [now + delay, now]
+                elif delay <= 0:
+                    entry[0] = now
+                else:
+                    entry[0] = min(max(entry[0], now + delay), entry[1] + self.max_wait)
+            
+            self.metrics['syncs_requested'] += 1
+            self._condition.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Run everything queued now, skipping debounce and backoff
+        
+        Returns False if a sync fails or the timeout expires first.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            failed = self.metrics['syncs_failed']
+            now = time.time()
+            for entry in self._pending.values():
+                entry[0] = now
+            self._retry_at = 0.0
+            self._condition.notify_all()
+            
+            while self._pending or self._in_flight:
+                if self._stopping or self.metrics['syncs_failed'] != failed:
+                    return False
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return self.metrics['syncs_failed'] == failed
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Queue depth, backoff state and counters"""
+        with self._condition:
+            status = dict(self.metrics)
+            status['queued_tables'] = len(self._pending)
+            status['in_flight_tables'] = len(self._in_flight)
+            status['consecutive_failures'] = self._failures
+            status['retry_in_seconds'] = round(max(0.0, self._retry_at - time.time()), 3)
+        return status
+    
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop the worker once any sync in progress finishes"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        
+        self._worker.join(timeout)
+        return not self._worker.is_alive()
+    
+    def _queue_periodic(self, now: float):
+        manager = self.manager
+        if now - self._last_periodic < manager.sync_interval:
+            return
+        self._last_periodic = now
+        if manager.auto_sync_enabled and manager.current_user_id and manager.firestore_db:
+            for table_name in SYNC_TABLES:
+                self._pending.setdefault((manager.current_user_id, table_name), [now, now])
+    
+    def _next_wakeup(self, now: float) -> float:
+        wakeups = [self._last_periodic + self.manager.sync_interval]
+        if self._pending:
+            wakeups.append(max(min(due for due, _ in self._pending.values()), self._retry_at))
+        return max(0.0, min(wakeups) - now)
+    
+    def _take_due(self, now: float) -> Tuple[Optional[str], List[str]]:
+        """Pop the due tables of one user"""
+        if now < self._retry_at:
+            return None, []
+        due = [key for key, (at, _) in self._pending.items() if at <= now]
+        if not due:
+            return None, []
+        
+        user_id = due[0][0]
+        tables = [table_name for uid, table_name in due if uid == user_id]
+        for table_name in tables:
+            del self._pending[(user_id, table_name)]
+        return user_id, tables
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.time()
+                    self._queue_periodic(now)
+                    user_id, tables = self._take_due(now)
+                    if tables:
+                        break
+                    self._condition.wait(self._next_wakeup(now))
+                self._in_flight = [(user_id, table_name) for table_name in tables]
+            
+            started = time.perf_counter()
+            synced = self.manager._attempt_online_sync(user_id, tables)
+            
+            with self._condition:
+                self._in_flight = []
+                now = time.time()
+                if synced:
+                    self._failures = 0
+                    self._retry_at = 0.0
+                    self.metrics['syncs_completed'] += 1
+                    self.metrics['last_sync_ms'] = round((time.perf_counter() - started) * 1000, 3)
+                    self.metrics['last_success_time'] = now
+                else:
+                    # Equal jitter keeps retries from many clients apart
+                    self._failures += 1
+                    delay = min(self.max_retry_delay, self.base_retry_delay * 2 ** min(self._failures - 1, 20))
+                    self._retry_at = now + delay / 2 + random.uniform(0, delay / 2)
+                    for table_name in tables:
+                        self._pending.setdefault((user_id, table_name), [now, now])
+                    self.metrics['syncs_failed'] += 1
+                self._condition.notify_all()
 
 class DatabaseManager:
     """Unified database manager for offline and online data"""
@@ -31,7 +222,7 @@ class DatabaseManager:
         self.logger = logging.getLogger(__name__)
         
         # Database connections
-        self.sqlite_conn = None
+        self.connections: Optional[SQLiteConnectionPool] = None
         self.firestore_db = None
         
         # User state
@@ -43,10 +234,17 @@ class DatabaseManager:
         self.auto_sync_enabled = True
         self.sync_interval = 300  # 5 minutes
         self.sync_lock = threading.Lock()
+        self.sync_worker: Optional[SyncWorker] = None
+        
+        # Change tracking: every local write stamps its row with a new version
+        self._sync_version = 0
+        self._sync_columns: Dict[str, List[str]] = {}
+        self._changed_tables: Set[Tuple[str, str]] = set()
         
         # Initialize databases
         self._init_sqlite()
         self._init_firebase()
+        self.sync_worker = SyncWorker(self)
         
         self.logger.info("DatabaseManager initialized")
 
@@ -56,11 +254,11 @@ class DatabaseManager:
             db_path = Config.SAVE_DIR / "kingdom_of_aldoria.db"
             Config.SAVE_DIR.mkdir(exist_ok=True)
             
-            self.sqlite_conn = sqlite3.connect(str(db_path), check_same_thread=False)
-            self.sqlite_conn.row_factory = sqlite3.Row
+            self.connections = SQLiteConnectionPool(str(db_path), row_factory=sqlite3.Row)
             
             # Create tables
-            self._create_sqlite_tables()
+            with self.connections.transaction():
+                self._create_sqlite_tables()
             
             self.logger.info("SQLite database initialized")
             
@@ -90,7 +288,8 @@ class DatabaseManager:
                 stamina_max INTEGER DEFAULT 10,
                 stamina_last_update INTEGER DEFAULT 0,
                 created_at INTEGER DEFAULT 0,
-                updated_at INTEGER DEFAULT 0
+                updated_at INTEGER DEFAULT 0,
+                sync_version INTEGER DEFAULT 0
             )
         ''')
         
@@ -104,6 +303,7 @@ class DatabaseManager:
                 quantity INTEGER DEFAULT 1,
                 equipped BOOLEAN DEFAULT FALSE,
                 acquired_at INTEGER DEFAULT 0,
+                sync_version INTEGER DEFAULT 0,
                 FOREIGN KEY (user_id) REFERENCES player_data (user_id)
             )
         ''')
@@ -119,6 +319,7 @@ class DatabaseManager:
                 stars INTEGER DEFAULT 0,
                 best_time REAL DEFAULT 0,
                 completed_at INTEGER DEFAULT 0,
+                sync_version INTEGER DEFAULT 0,
                 FOREIGN KEY (user_id) REFERENCES player_data (user_id)
             )
         ''')
@@ -159,11 +360,84 @@ class DatabaseManager:
                 last_sync INTEGER DEFAULT 0,
                 sync_hash TEXT,
                 conflict_count INTEGER DEFAULT 0,
+                pushed_version INTEGER DEFAULT 0,
+                pulled_at REAL DEFAULT 0,
                 FOREIGN KEY (user_id) REFERENCES player_data (user_id)
             )
         ''')
         
-        self.sqlite_conn.commit()
+        self._migrate_sync_schema(cursor)
+        
+        # Continue versioning after the newest local change
+        for table_name in SYNC_TABLES:
+            cursor.execute(f'SELECT MAX(sync_version) FROM {table_name}')
+            self._sync_version = max(self._sync_version, cursor.fetchone()[0] or 0)
+
+    def _migrate_sync_schema(self, cursor: sqlite3.Cursor):
+        """Bring databases from before change tracking up to date"""
+        for table_name in SYNC_TABLES:
+            if 'sync_version' not in self._table_columns(cursor, table_name):
+                cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN sync_version INTEGER DEFAULT 0')
+                # Existing rows are uploaded once by the next sync
+                cursor.execute(f'UPDATE {table_name} SET sync_version = 1')
+        
+        metadata_columns = self._table_columns(cursor, 'sync_metadata')
+        if 'pushed_version' not in metadata_columns:
+            cursor.execute('ALTER TABLE sync_metadata ADD COLUMN pushed_version INTEGER DEFAULT 0')
+        if 'pulled_at' not in metadata_columns:
+            cursor.execute('ALTER TABLE sync_metadata ADD COLUMN pulled_at REAL DEFAULT 0')
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        indexes = {row[0] for row in cursor.fetchall()}
+        
+        # Older versions appended a row per write instead of replacing it. The
+        # newest row of each group is kept, merged with the best of the others
+        if 'idx_sync_metadata_table' not in indexes:
+            cursor.execute('''
+                SELECT MAX(id), MAX(last_sync), MAX(conflict_count), MAX(pushed_version), MAX(pulled_at)
+                FROM sync_metadata GROUP BY user_id, table_name HAVING COUNT(*) > 1
+            ''')
+            cursor.executemany('''
+                UPDATE sync_metadata
+                SET last_sync = ?, conflict_count = ?, pushed_version = ?, pulled_at = ?
+                WHERE id = ?
+            ''', [(last_sync, conflicts, pushed, pulled, row_id)
+                  for row_id, last_sync, conflicts, pushed, pulled in cursor.fetchall()])
+            cursor.execute('''
+                DELETE FROM sync_metadata WHERE id NOT IN
+                (SELECT MAX(id) FROM sync_metadata GROUP BY user_id, table_name)
+            ''')
+            cursor.execute('CREATE UNIQUE INDEX idx_sync_metadata_table ON sync_metadata (user_id, table_name)')
+        if 'idx_stage_progress_stage' not in indexes:
+            # A best_time of 0 means no time was recorded
+            cursor.execute('''
+                SELECT MAX(id), MAX(completed), MAX(stars), MIN(NULLIF(best_time, 0))
+                FROM stage_progress GROUP BY user_id, world_id, stage_id HAVING COUNT(*) > 1
+            ''')
+            cursor.executemany('''
+                UPDATE stage_progress SET completed = ?, stars = ?, best_time = COALESCE(?, 0)
+                WHERE id = ?
+            ''', [(completed, stars, best_time, row_id)
+                  for row_id, completed, stars, best_time in cursor.fetchall()])
+            cursor.execute('''
+                DELETE FROM stage_progress WHERE id NOT IN
+                (SELECT MAX(id) FROM stage_progress GROUP BY user_id, world_id, stage_id)
+            ''')
+            cursor.execute('CREATE UNIQUE INDEX idx_stage_progress_stage ON stage_progress (user_id, world_id, stage_id)')
+        
+        # Item lookups by add_inventory_item and sync would otherwise scan the table
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_inventory_item ON inventory (user_id, item_type, item_id)')
+        
+        for table_name in SYNC_TABLES:
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_{table_name}_sync_version
+                ON {table_name} (user_id, sync_version)
+            ''')
+            self._sync_columns[table_name] = self._table_columns(cursor, table_name)
+
+    def _table_columns(self, cursor: sqlite3.Cursor, table_name: str) -> List[str]:
+        cursor.execute(f'PRAGMA table_info({table_name})')
+        return [row[1] for row in cursor.fetchall()]
 
     def _init_firebase(self):
         """Initialize Firebase connection"""
@@ -199,27 +473,74 @@ class DatabaseManager:
             self.logger.warning(f"Firebase initialization failed: {e}")
             self.firestore_db = MockFirestore()
 
+    @property
+    def sqlite_conn(self) -> sqlite3.Connection:
+        """This thread's connection (the writer inside transaction())"""
+        return self.connections.connection()
+
+    @contextmanager
+    def transaction(self):
+        """Group SQLite writes into a single commit
+        
+        The outermost block commits on success and rolls back if an exception
+        escapes. Nested blocks run inside a savepoint, so a failed inner block
+        undoes only its own writes while the outer transaction carries on.
+        Other threads wait until the outermost block finishes.
+        """
+        with self.connections.write_lock:
+            outermost = not self.connections.in_transaction
+            try:
+                with self.connections.transaction() as cursor:
+                    yield cursor
+            except BaseException:
+                if outermost:
+                    self._changed_tables.clear()
+                raise
+            
+            if outermost:
+                changed, self._changed_tables = self._changed_tables, set()
+                self._request_sync(changed)
+
+    def _next_sync_version(self, table_name: str, user_id: str) -> int:
+        """Version to stamp on a locally changed row
+        
+        Rows whose version is above their table's pushed_version in
+        sync_metadata are uploaded by the next sync, which is requested from
+        the sync worker once the transaction commits.
+        """
+        with self.connections.write_lock:
+            self._sync_version += 1
+            self._changed_tables.add((user_id, table_name))
+            return self._sync_version
+
+    def _request_sync(self, changed: Set[Tuple[str, str]]):
+        """Hand committed changes to the background sync worker"""
+        if not changed or not self.auto_sync_enabled or not self.firestore_db or not self.sync_worker:
+            return
+        for user_id, table_name in changed:
+            self.sync_worker.request(user_id, [table_name])
+
     def create_user(self, user_id: str) -> bool:
         """Create new user in both databases"""
         try:
             current_time = int(time.time())
             
             # Create in SQLite
-            cursor = self.sqlite_conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO player_data 
-                (user_id, created_at, updated_at, stamina_last_update)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, current_time, current_time, current_time))
-            
-            # Initialize login streak
-            cursor.execute('''
-                INSERT OR REPLACE INTO login_streaks 
-                (user_id, last_login_date, total_logins)
-                VALUES (?, ?, ?)
-            ''', (user_id, datetime.now().strftime('%Y-%m-%d'), 1))
-            
-            self.sqlite_conn.commit()
+            with self.transaction():
+                cursor = self.sqlite_conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO player_data 
+                    (user_id, created_at, updated_at, stamina_last_update, sync_version)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (user_id, current_time, current_time, current_time,
+                      self._next_sync_version('player_data', user_id)))
+                
+                # Initialize login streak
+                cursor.execute('''
+                    INSERT OR REPLACE INTO login_streaks 
+                    (user_id, last_login_date, total_logins)
+                    VALUES (?, ?, ?)
+                ''', (user_id, datetime.now().strftime('%Y-%m-%d'), 1))
             
             # Create in Firebase if online
             if self.is_online and self.firestore_db:
@@ -238,11 +559,10 @@ class DatabaseManager:
                     'stamina_max': 10,
                     'stamina_last_update': current_time,
                     'created_at': current_time,
-                    'updated_at': current_time
+                    'updated_at': current_time,
+                    'synced_at': SERVER_TIMESTAMP
                 }
                 
-                self.firestore_db.collection('players').document(user_id).set(player_data)
-                
                 # Initialize login streak in Firebase
                 streak_data = {
                     'current_streak': 1,
@@ -250,7 +570,10 @@ class DatabaseManager:
                     'last_login_date': datetime.now().strftime('%Y-%m-%d'),
                     'total_logins': 1
                 }
-                self.firestore_db.collection('login_streaks').document(user_id).set(streak_data)
+                self._write_documents([
+                    ('players', user_id, player_data),
+                    ('login_streaks', user_id, streak_data)
+                ])
             
             self.current_user_id = user_id
             self.logger.info(f"Created user: {user_id}")
@@ -271,9 +594,9 @@ class DatabaseManager:
             # Handle daily login
             self._handle_daily_login(user_id)
             
-            # Attempt online sync
-            if self.firestore_db:
-                self._attempt_online_sync(user_id)
+            # Sync on the background worker; login only waits for local state
+            if self.firestore_db and self.auto_sync_enabled:
+                self.sync_worker.request(user_id, delay=0)
             
             self.logger.info(f"User logged in: {user_id}")
             return True
@@ -306,13 +629,12 @@ class DatabaseManager:
                 stamina_gained = min(time_diff // stamina_regen_time, max_stamina - current_stamina)
                 new_stamina = min(current_stamina + stamina_gained, max_stamina)
                 
-                cursor.execute('''
-                    UPDATE player_data 
-                    SET stamina_current = ?, stamina_last_update = ?
-                    WHERE user_id = ?
-                ''', (new_stamina, current_time, user_id))
-                
-                self.sqlite_conn.commit()
+                with self.transaction():
+                    self.sqlite_conn.execute('''
+                        UPDATE player_data
+                        SET stamina_current = ?, stamina_last_update = ?, sync_version = ?
+                        WHERE user_id = ?
+                    ''', (new_stamina, current_time, self._next_sync_version('player_data', user_id), user_id))
                 
                 if stamina_gained > 0:
                     self.logger.info(f"Stamina regenerated: +{stamina_gained} (Total: {new_stamina})")
@@ -323,53 +645,53 @@ class DatabaseManager:
     def _handle_daily_login(self, user_id: str):
         """Handle daily login streaks and rewards"""
         try:
-            cursor = self.sqlite_conn.cursor()
             today = datetime.now().strftime('%Y-%m-%d')
             
-            cursor.execute('''
-                SELECT current_streak, longest_streak, last_login_date, total_logins
-                FROM login_streaks WHERE user_id = ?
-            ''', (user_id,))
-            
-            result = cursor.fetchone()
-            if not result:
-                # First login
+            # Streak update and rewards are committed together
+            with self.transaction():
+                cursor = self.sqlite_conn.cursor()
                 cursor.execute('''
-                    INSERT INTO login_streaks 
-                    (user_id, current_streak, longest_streak, last_login_date, total_logins)
-                    VALUES (?, 1, 1, ?, 1)
-                ''', (user_id, today))
-            else:
-                current_streak, longest_streak, last_login, total_logins = result
-                
-                if last_login == today:
-                    # Already logged in today
-                    return
+                    SELECT current_streak, longest_streak, last_login_date, total_logins
+                    FROM login_streaks WHERE user_id = ?
+                ''', (user_id,))
                 
-                yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                
-                if last_login == yesterday:
-                    # Consecutive login
-                    current_streak += 1
+                result = cursor.fetchone()
+                if not result:
+                    # First login
+                    cursor.execute('''
+                        INSERT INTO login_streaks
+                        (user_id, current_streak, longest_streak, last_login_date, total_logins)
+                        VALUES (?, 1, 1, ?, 1)
+                    ''', (user_id, today))
                 else:
-                    # Streak broken
-                    current_streak = 1
-                
-                longest_streak = max(longest_streak, current_streak)
-                total_logins += 1
-                
-                cursor.execute('''
-                    UPDATE login_streaks 
-                    SET current_streak = ?, longest_streak = ?, 
-                        last_login_date = ?, total_logins = ?
-                    WHERE user_id = ?
-                ''', (current_streak, longest_streak, today, total_logins, user_id))
-                
-                # Grant daily login rewards
-                self._grant_daily_rewards(user_id, current_streak)
-            
-            self.sqlite_conn.commit()
-            
+                    current_streak, longest_streak, last_login, total_logins = result
+                    
+                    if last_login == today:
+                        # Already logged in today
+                        return
+                    
+                    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+                    
+                    if last_login == yesterday:
+                        # Consecutive login
+                        current_streak += 1
+                    else:
+                        # Streak broken
+                        current_streak = 1
+                    
+                    longest_streak = max(longest_streak, current_streak)
+                    total_logins += 1
+                    
+                    cursor.execute('''
+                        UPDATE login_streaks
+                        SET current_streak = ?, longest_streak = ?,
+                            last_login_date = ?, total_logins = ?
+                        WHERE user_id = ?
+                    ''', (current_streak, longest_streak, today, total_logins, user_id))
+                    
+                    # Grant daily login rewards
+                    self._grant_daily_rewards(user_id, current_streak)
+        
         except Exception as e:
             self.logger.error(f"Failed to handle daily login: {e}")
 
@@ -385,13 +707,16 @@ class DatabaseManager:
             if streak_day % 7 == 0:
                 total_gems += 50  # Weekly bonus
             
-            # Add gems to player
-            self.add_currency(user_id, 'gems', total_gems)
+            # Add gems to player; a failed grant raises so the caller's
+            # transaction rolls back the streak update with it
+            if not self.add_currency(user_id, 'gems', total_gems):
+                raise RuntimeError(f"Could not add {total_gems} gems for {user_id}")
             
             self.logger.info(f"Daily login reward: {total_gems} gems (Day {streak_day})")
             
         except Exception as e:
             self.logger.error(f"Failed to grant daily rewards: {e}")
+            raise
 
     def get_player_data(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get player data from SQLite"""
@@ -414,22 +739,19 @@ class DatabaseManager:
             current_time = int(time.time())
             data['updated_at'] = current_time
             
-            # Build dynamic UPDATE query
-            fields = list(data.keys())
-            placeholders = ', '.join([f"{field} = ?" for field in fields])
-            values = list(data.values()) + [user_id]
-            
-            cursor = self.sqlite_conn.cursor()
-            cursor.execute(f'''
-                UPDATE player_data SET {placeholders}
-                WHERE user_id = ?
-            ''', values)
-            
-            self.sqlite_conn.commit()
-            
-            # Queue for online sync if available
-            if self.is_online:
-                self._queue_sync('player_data', user_id)
+            with self.transaction():
+                data['sync_version'] = self._next_sync_version('player_data', user_id)
+                
+                # Build dynamic UPDATE query
+                fields = list(data.keys())
+                placeholders = ', '.join([f"{field} = ?" for field in fields])
+                values = list(data.values()) + [user_id]
+                
+                cursor = self.sqlite_conn.cursor()
+                cursor.execute(f'''
+                    UPDATE player_data SET {placeholders}
+                    WHERE user_id = ?
+                ''', values)
             
             return True
             
@@ -440,25 +762,15 @@ class DatabaseManager:
     def add_currency(self, user_id: str, currency_type: str, amount: int) -> bool:
         """Add currency to player account"""
         try:
-            cursor = self.sqlite_conn.cursor()
-            
-            if currency_type == 'gold':
-                cursor.execute('''
-                    UPDATE player_data SET gold = gold + ?, updated_at = ?
-                    WHERE user_id = ?
-                ''', (amount, int(time.time()), user_id))
-            elif currency_type == 'gems':
-                cursor.execute('''
-                    UPDATE player_data SET gems = gems + ?, updated_at = ?
-                    WHERE user_id = ?
-                ''', (amount, int(time.time()), user_id))
-            else:
+            if currency_type not in ('gold', 'gems'):
                 return False
             
-            self.sqlite_conn.commit()
-            
-            if self.is_online:
-                self._queue_sync('player_data', user_id)
+            with self.transaction():
+                cursor = self.sqlite_conn.cursor()
+                cursor.execute(f'''
+                    UPDATE player_data SET {currency_type} = {currency_type} + ?, updated_at = ?, sync_version = ?
+                    WHERE user_id = ?
+                ''', (amount, int(time.time()), self._next_sync_version('player_data', user_id), user_id))
             
             return True
             
@@ -469,35 +781,33 @@ class DatabaseManager:
     def add_inventory_item(self, user_id: str, item_type: str, item_id: str, quantity: int = 1) -> bool:
         """Add item to player inventory"""
         try:
-            cursor = self.sqlite_conn.cursor()
             current_time = int(time.time())
             
-            # Check if item already exists
-            cursor.execute('''
-                SELECT quantity FROM inventory 
-                WHERE user_id = ? AND item_type = ? AND item_id = ?
-            ''', (user_id, item_type, item_id))
-            
-            result = cursor.fetchone()
-            
-            if result:
-                # Update existing item
+            with self.transaction():
+                cursor = self.sqlite_conn.cursor()
+                
+                # Check if item already exists
                 cursor.execute('''
-                    UPDATE inventory SET quantity = quantity + ?
+                    SELECT quantity FROM inventory 
                     WHERE user_id = ? AND item_type = ? AND item_id = ?
-                ''', (quantity, user_id, item_type, item_id))
-            else:
-                # Insert new item
-                cursor.execute('''
-                    INSERT INTO inventory 
-                    (user_id, item_type, item_id, quantity, acquired_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (user_id, item_type, item_id, quantity, current_time))
-            
-            self.sqlite_conn.commit()
-            
-            if self.is_online:
-                self._queue_sync('inventory', user_id)
+                ''', (user_id, item_type, item_id))
+                
+                result = cursor.fetchone()
+                
+                if result:
+                    # Update existing item
+                    cursor.execute('''
+                        UPDATE inventory SET quantity = quantity + ?, sync_version = ?
+                        WHERE user_id = ? AND item_type = ? AND item_id = ?
+                    ''', (quantity, self._next_sync_version('inventory', user_id), user_id, item_type, item_id))
+                else:
+                    # Insert new item
+                    cursor.execute('''
+                        INSERT INTO inventory 
+                        (user_id, item_type, item_id, quantity, acquired_at, sync_version)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (user_id, item_type, item_id, quantity, current_time,
+                          self._next_sync_version('inventory', user_id)))
             
             return True
             
@@ -525,19 +835,16 @@ class DatabaseManager:
                             completed: bool = True, stars: int = 0, time_taken: float = 0) -> bool:
         """Update stage completion progress"""
         try:
-            cursor = self.sqlite_conn.cursor()
             current_time = int(time.time())
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO stage_progress 
-                (user_id, world_id, stage_id, completed, stars, best_time, completed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, world_id, stage_id, completed, stars, time_taken, current_time))
-            
-            self.sqlite_conn.commit()
-            
-            if self.is_online:
-                self._queue_sync('stage_progress', user_id)
+            with self.transaction():
+                cursor = self.sqlite_conn.cursor()
+                cursor.execute('''
+                    INSERT OR REPLACE INTO stage_progress 
+                    (user_id, world_id, stage_id, completed, stars, best_time, completed_at, sync_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (user_id, world_id, stage_id, completed, stars, time_taken, current_time,
+                      self._next_sync_version('stage_progress', user_id)))
             
             return True
             
@@ -561,151 +868,261 @@ class DatabaseManager:
             self.logger.error(f"Failed to get stage progress: {e}")
             return []
 
-    def _attempt_online_sync(self, user_id: str):
-        """Attempt to sync with Firebase"""
+    def _attempt_online_sync(self, user_id: str, tables: Optional[List[str]] = None) -> bool:
+        """Sync changed rows of some tables (all by default) with Firebase
+        
+        Runs on the sync worker; sync_lock keeps overlapping calls apart.
+        """
         if not self.firestore_db:
-            return
+            return False
+        
+        sync_methods = {
+            'player_data': self._sync_player_data,
+            'inventory': self._sync_inventory,
+            'stage_progress': self._sync_stage_progress
+        }
         
         try:
-            # Check network connectivity (simplified)
-            self.is_online = True  # In production, implement actual connectivity check
-            
-            if self.is_online:
-                # Perform bidirectional sync
-                self._sync_player_data(user_id)
-                self._sync_inventory(user_id)
-                self._sync_stage_progress(user_id)
-                
-                self.last_sync_time = int(time.time())
-                self.logger.info("Online sync completed")
-                
+            with self.sync_lock:
+                for table_name in tables or SYNC_TABLES:
+                    sync_methods[table_name](user_id)
+            
+            self.is_online = True
+            self.last_sync_time = int(time.time())
+            self.logger.info("Online sync completed")
+            return True
+            
         except Exception as e:
             self.logger.error(f"Online sync failed: {e}")
             self.is_online = False
+            return False
 
-    def _sync_player_data(self, user_id: str):
+    def _sync_player_data(self, user_id: str) -> Dict[str, int]:
         """Sync player data between SQLite and Firebase"""
-        try:
-            # Get local data
-            local_data = self.get_player_data(user_id)
-            if not local_data:
-                return
-            
-            # Get remote data
-            remote_doc = self.firestore_db.collection('players').document(user_id).get()
-            
-            if remote_doc.exists:
-                remote_data = remote_doc.to_dict()
-                
-                # Conflict resolution: use newest timestamp
-                local_timestamp = local_data.get('updated_at', 0)
-                remote_timestamp = remote_data.get('updated_at', 0)
-                
-                if remote_timestamp > local_timestamp:
-                    # Remote is newer, update local
-                    self.update_player_data(user_id, remote_data)
-                    self.logger.info("Updated local data from remote")
-                elif local_timestamp > remote_timestamp:
-                    # Local is newer, update remote
-                    self.firestore_db.collection('players').document(user_id).set(local_data)
-                    self.logger.info("Updated remote data from local")
-            else:
-                # No remote data, push local to remote
-                self.firestore_db.collection('players').document(user_id).set(local_data)
-                self.logger.info("Pushed local data to remote")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to sync player data: {e}")
+        return self._sync_table(user_id, 'player_data')
 
-    def _sync_inventory(self, user_id: str):
+    def _sync_inventory(self, user_id: str) -> Dict[str, int]:
         """Sync inventory between SQLite and Firebase"""
-        try:
-            # Get local inventory
-            local_inventory = self.get_inventory(user_id)
-            
-            # Get remote inventory
-            remote_ref = self.firestore_db.collection('inventory').where('user_id', '==', user_id)
-            remote_docs = remote_ref.get()
-            
-            remote_inventory = [doc.to_dict() for doc in remote_docs]
-            
-            # Simple merge: combine both inventories
-            # In production, implement proper conflict resolution
-            all_items = {}
-            
-            # Add local items
-            for item in local_inventory:
-                key = f"{item['item_type']}_{item['item_id']}"
-                all_items[key] = item
-            
-            # Merge remote items
-            for item in remote_inventory:
-                key = f"{item['item_type']}_{item['item_id']}"
-                if key not in all_items:
-                    all_items[key] = item
-                    # Add to local database
-                    self.add_inventory_item(
-                        user_id, item['item_type'], 
-                        item['item_id'], item['quantity']
-                    )
-            
-            # Update remote with local changes
-            for item in local_inventory:
-                doc_id = f"{user_id}_{item['item_type']}_{item['item_id']}"
-                self.firestore_db.collection('inventory').document(doc_id).set(item)
-                
-        except Exception as e:
-            self.logger.error(f"Failed to sync inventory: {e}")
+        return self._sync_table(user_id, 'inventory')
 
-    def _sync_stage_progress(self, user_id: str):
+    def _sync_stage_progress(self, user_id: str) -> Dict[str, int]:
         """Sync stage progress between SQLite and Firebase"""
-        try:
-            # Get local progress
-            local_progress = self.get_stage_progress(user_id)
-            
-            # Update remote with local progress
-            for progress in local_progress:
-                doc_id = f"{user_id}_{progress['world_id']}_{progress['stage_id']}"
-                self.firestore_db.collection('stage_progress').document(doc_id).set(progress)
+        return self._sync_table(user_id, 'stage_progress')
+
+    def _sync_table(self, user_id: str, table_name: str) -> Dict[str, int]:
+        """Exchange the rows of one table changed since its last sync
+        
+        Receives remote documents stamped after the table's pulled_at watermark,
+        then sends local rows whose sync_version is above pushed_version. A row
+        changed on both sides keeps the newer updated_at; tables without that
+        column keep the local row. Watermarks only move once a step succeeds.
+        """
+        collection_name, key_columns = SYNC_TABLES[table_name]
+        collection = self.firestore_db.collection(collection_name)
+        pushed_version, pulled_at = self._get_sync_watermarks(user_id, table_name)
+        
+        # Receive remote changes (rows this device sent last time come back
+        # once and are skipped as unchanged). synced_at is the store's commit
+        # time, so a slow multi-batch upload from another device can never land
+        # behind a watermark already moved past it
+        query = collection.where('user_id', '==', user_id)
+        if pulled_at:
+            query = query.where('synced_at', '>', datetime.fromtimestamp(pulled_at, timezone.utc))
+        remote_docs = query.get()
+        pulled = conflicts = 0
+        
+        with self.transaction():
+            cursor = self.sqlite_conn.cursor()
+            for doc in remote_docs:
+                remote = doc.to_dict()
+                pulled_at = max(pulled_at, self._stamp_seconds(remote.get('synced_at')))
+                if any(column not in remote for column in key_columns):
+                    continue
                 
-        except Exception as e:
-            self.logger.error(f"Failed to sync stage progress: {e}")
+                local = self._find_sync_row(cursor, table_name, user_id, remote)
+                if local is not None:
+                    if self._same_sync_row(table_name, local, remote):
+                        continue
+                    if local['sync_version'] > pushed_version:
+                        # Changed on both sides since the last sync
+                        conflicts += 1
+                        if remote.get('updated_at', 0) <= local.get('updated_at', 0):
+                            continue
+                
+                self._apply_remote_row(cursor, table_name, user_id, remote, local)
+                pulled += 1
+        
+        # Send local changes
+        cursor = self.sqlite_conn.cursor()
+        cursor.execute(f'''
+            SELECT * FROM {table_name}
+            WHERE user_id = ? AND sync_version > ?
+            ORDER BY sync_version
+        ''', (user_id, pushed_version))
+        changed = [dict(row) for row in cursor.fetchall()]
+        
+        writes = [
+            (collection_name,
+             '_'.join([user_id] + [str(row[column]) for column in key_columns]),
+             self._remote_document(row))
+            for row in changed
+        ]
+        result = self._write_documents(writes)
+        
+        # Acknowledge rows up to the first failed batch; later rows are resent
+        sent = result['first_failed'] if result['failed'] else len(changed)
+        if sent:
+            pushed_version = changed[sent - 1]['sync_version']
+        
+        self._set_sync_watermarks(user_id, table_name, pushed_version, pulled_at, conflicts)
+        
+        if result['failed']:
+            raise RuntimeError(f"{len(result['failed'])} of {len(changed)} {table_name} rows failed to upload")
+        
+        if pulled or changed:
+            self.logger.info(f"Synced {table_name}: {pulled} received, {len(changed)} sent in "
+                             f"{result['batches']} batches, {conflicts} conflicts")
+        return {'pulled': pulled, 'pushed': len(changed), 'conflicts': conflicts, 'batches': result['batches']}
+
+    def _write_documents(self, writes: List[Tuple[str, str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Set many remote documents using as few round-trips as possible
+        
+        writes holds (collection, document id, data) in order. They are sent in
+        write batches of up to MAX_BATCH_WRITES; a failed batch is reported and
+        the remaining batches are still attempted.
+        
+        Returns written and failed document ids, the number of batches sent and
+        the index of the first failed write (None if all succeeded).
+        """
+        result = {'written': [], 'failed': [], 'batches': 0, 'first_failed': None}
+        
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            chunk = writes[start:start + MAX_BATCH_WRITES]
+            doc_ids = [doc_id for _, doc_id, _ in chunk]
+            try:
+                batch = self.firestore_db.batch()
+                for collection_name, doc_id, data in chunk:
+                    batch.set(self.firestore_db.collection(collection_name).document(doc_id), data)
+                batch.commit()
+                result['written'].extend(doc_ids)
+            except Exception as e:
+                self.logger.warning(f"Write batch of {len(chunk)} documents failed: {e}")
+                result['failed'].extend(doc_ids)
+                if result['first_failed'] is None:
+                    result['first_failed'] = start
+            result['batches'] += 1
+        
+        return result
+
+    def _find_sync_row(self, cursor: sqlite3.Cursor, table_name: str, user_id: str,
+                       remote: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Local row matching a remote document, if any"""
+        key_columns = SYNC_TABLES[table_name][1]
+        conditions = ''.join(f' AND {column} = ?' for column in key_columns)
+        cursor.execute(f'SELECT * FROM {table_name} WHERE user_id = ?{conditions}',
+                       [user_id] + [remote[column] for column in key_columns])
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def _same_sync_row(self, table_name: str, local: Dict[str, Any], remote: Dict[str, Any]) -> bool:
+        """Whether a remote document holds the same values as the local row"""
+        return all(
+            local[column] == remote[column]
+            for column in self._sync_columns[table_name]
+            if column in remote and column not in ('id', 'sync_version')
+        )
+
+    def _apply_remote_row(self, cursor: sqlite3.Cursor, table_name: str, user_id: str,
+                          remote: Dict[str, Any], local: Optional[Dict[str, Any]]):
+        """Write a remote document locally without marking it as a local change"""
+        columns = [
+            column for column in self._sync_columns[table_name]
+            if column in remote and column not in ('id', 'user_id', 'sync_version')
+        ]
+        values = [remote[column] for column in columns]
+        
+        if local is not None:
+            assignments = ''.join(f'{column} = ?, ' for column in columns)
+            cursor.execute(f'UPDATE {table_name} SET {assignments}sync_version = 0 WHERE id = ?',
+                           values + [local['id']])
+        else:
+            placeholders = ', '.join('?' for _ in columns)
+            cursor.execute(f'''
+                INSERT INTO {table_name} (user_id, {', '.join(columns)}, sync_version)
+                VALUES (?, {placeholders}, 0)
+            ''', [user_id] + values)
+
+    def _remote_document(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Remote document for a local row (local ids and versions stay local)"""
+        document = {column: value for column, value in row.items() if column not in ('id', 'sync_version')}
+        document['synced_at'] = SERVER_TIMESTAMP
+        return document
+
+    @staticmethod
+    def _stamp_seconds(stamp: Any) -> float:
+        """Seconds since the epoch for a remote synced_at stamp"""
+        if isinstance(stamp, datetime):
+            return stamp.timestamp()
+        return float(stamp or 0)
+
+    def _get_sync_watermarks(self, user_id: str, table_name: str) -> Tuple[int, float]:
+        """Last pushed local version and newest received remote stamp for a table"""
+        cursor = self.sqlite_conn.cursor()
+        cursor.execute('''
+            SELECT pushed_version, pulled_at FROM sync_metadata
+            WHERE user_id = ? AND table_name = ?
+        ''', (user_id, table_name))
+        
+        row = cursor.fetchone()
+        if not row:
+            return 0, 0.0
+        return row['pushed_version'] or 0, row['pulled_at'] or 0.0
+
+    def _set_sync_watermarks(self, user_id: str, table_name: str, pushed_version: int,
+                             pulled_at: float, conflicts: int = 0):
+        """Record a completed sync of one table in sync_metadata"""
+        with self.transaction():
+            self.sqlite_conn.execute('''
+                INSERT INTO sync_metadata
+                (user_id, table_name, last_sync, pushed_version, pulled_at, conflict_count)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, table_name) DO UPDATE SET
+                    last_sync = excluded.last_sync,
+                    pushed_version = excluded.pushed_version,
+                    pulled_at = excluded.pulled_at,
+                    conflict_count = conflict_count + excluded.conflict_count
+            ''', (user_id, table_name, int(time.time()), pushed_version, pulled_at, conflicts))
 
-    def _queue_sync(self, table_name: str, user_id: str):
-        """Queue data for sync when online"""
+    def get_pending_changes(self, user_id: str) -> Dict[str, int]:
+        """Local rows per table that have not been sent to the remote store yet"""
         try:
             cursor = self.sqlite_conn.cursor()
-            current_time = int(time.time())
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO sync_metadata 
-                (user_id, table_name, last_sync)
-                VALUES (?, ?, ?)
-            ''', (user_id, table_name, current_time))
-            
-            self.sqlite_conn.commit()
+            pending = {}
+            for table_name in SYNC_TABLES:
+                pushed_version, _ = self._get_sync_watermarks(user_id, table_name)
+                cursor.execute(f'''
+                    SELECT COUNT(*) FROM {table_name}
+                    WHERE user_id = ? AND sync_version > ?
+                ''', (user_id, pushed_version))
+                pending[table_name] = cursor.fetchone()[0]
+            return pending
             
         except Exception as e:
-            self.logger.error(f"Failed to queue sync: {e}")
+            self.logger.error(f"Failed to count pending changes: {e}")
+            return {}
 
-    def force_sync(self, user_id: str) -> bool:
-        """Force immediate sync with Firebase"""
-        if not self.is_online or not self.firestore_db:
+    def force_sync(self, user_id: str, timeout: Optional[float] = 30.0) -> bool:
+        """Sync immediately on the background worker and wait for the result"""
+        if not self.firestore_db:
             return False
         
-        try:
-            with self.sync_lock:
-                self._sync_player_data(user_id)
-                self._sync_inventory(user_id)
-                self._sync_stage_progress(user_id)
-                
-                self.last_sync_time = int(time.time())
-                self.logger.info("Force sync completed")
-                return True
-                
-        except Exception as e:
-            self.logger.error(f"Force sync failed: {e}")
-            return False
+        self.sync_worker.request(user_id, delay=0)
+        if self.sync_worker.flush(timeout):
+            self.logger.info("Force sync completed")
+            return True
+        
+        self.logger.error("Force sync failed")
+        return False
 
     def get_sync_status(self, user_id: str) -> Dict[str, Any]:
         """Get sync status information"""
@@ -718,12 +1135,16 @@ class DatabaseManager:
             
             results = cursor.fetchall()
             sync_status = {row['table_name']: row['last_sync'] for row in results}
+            pending_changes = self.get_pending_changes(user_id)
             
             return {
                 'is_online': self.is_online,
                 'last_sync_time': self.last_sync_time,
                 'table_sync_times': sync_status,
-                'pending_syncs': len([t for t in sync_status.values() if t > self.last_sync_time])
+                'pending_changes': pending_changes,
+                'pending_syncs': sum(pending_changes.values()),
+                'auto_sync_enabled': self.auto_sync_enabled,
+                'worker': self.sync_worker.get_status() if self.sync_worker else {}
             }
             
         except Exception as e:
@@ -733,8 +1154,12 @@ class DatabaseManager:
     def cleanup(self):
         """Cleanup database connections"""
         try:
-            if self.sqlite_conn:
-                self.sqlite_conn.close()
+            # Unsynced changes stay marked in SQLite for the next session
+            if self.sync_worker:
+                self.sync_worker.close(timeout=5.0)
+            
+            if self.connections:
+                self.connections.close_all()
                 
             self.logger.info("DatabaseManager cleaned up")
             
@@ -742,45 +1167,157 @@ class DatabaseManager:
             self.logger.error(f"Cleanup failed: {e}")
 
 
+class MockServiceUnavailable(ConnectionError):
+    """Simulated remote store failure raised by MockFirestore"""
+
+
 class MockFirestore:
-    """Mock Firestore for development/testing"""
+    """In-memory Firestore stand-in for development, testing and benchmarks
+    
+    Documents are stored as JSON copies, so callers never share state with
+    the store. Every call that would be a network round-trip (document get
+    and set, query get, batch commit) waits `latency` seconds plus its
+    payload size over `bandwidth` bytes per second, fails with
+    MockServiceUnavailable at `error_rate`, and is counted in `stats`.
+    """
     
-    def __init__(self):
+    def __init__(self, latency: float = 0.0, bandwidth: Optional[float] = None,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
         self.data = {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._last_commit_us = 0
+        self.reset_stats()
         
     def collection(self, collection_name):
-        return MockCollection(self.data, collection_name)
+        return MockCollection(self, collection_name)
+    
+    def batch(self):
+        return MockWriteBatch(self)
+    
+    def reset_stats(self):
+        """Zero the request counters"""
+        with self._lock:
+            self.stats = {
+                'round_trips': 0,
+                'document_gets': 0,
+                'document_sets': 0,
+                'queries': 0,
+                'batch_commits': 0,
+                'documents_read': 0,
+                'documents_written': 0,
+                'bytes_sent': 0,
+                'bytes_received': 0,
+                'errors': 0
+            }
+    
+    def _round_trip(self, request: str, bytes_sent: int = 0, bytes_received: int = 0,
+                    documents_read: int = 0, documents_written: int = 0):
+        """Count one request and apply simulated latency, bandwidth and failures"""
+        with self._lock:
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            self.stats['round_trips'] += 1
+            self.stats[request] += 1
+            self.stats['bytes_sent'] += bytes_sent
+            if failed:
+                self.stats['errors'] += 1
+            else:
+                self.stats['bytes_received'] += bytes_received
+                self.stats['documents_read'] += documents_read
+                self.stats['documents_written'] += documents_written
+        
+        delay = self.latency
+        if self.bandwidth:
+            delay += (bytes_sent + bytes_received) / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+        
+        if failed:
+            raise MockServiceUnavailable(f"Simulated remote failure ({request})")
+    
+    def _apply(self, writes):
+        """Store (document, data) writes at one strictly increasing commit time
+        
+        SERVER_TIMESTAMP fields get the commit time, which is taken when the
+        writes become visible to queries, as a real server would do. Like
+        Firestore timestamps it has microsecond precision.
+        """
+        with self._lock:
+            self._last_commit_us = max(int(time.time() * 1_000_000), self._last_commit_us + 1)
+            commit_time = self._last_commit_us / 1_000_000
+            for document, data in writes:
+                payload = self._encode(self._resolve(data, commit_time))
+                document.collection_data[document.doc_id] = json.loads(payload)
+    
+    @staticmethod
+    def _resolve(data, commit_time: float):
+        return {key: commit_time if value is SERVER_TIMESTAMP else value for key, value in data.items()}
+    
+    @staticmethod
+    def _encode(data) -> str:
+        return json.dumps(data, separators=(',', ':'), default=str)
+
+
+class MockWriteBatch:
+    """Mock Firestore write batch, applied atomically in one round-trip on commit"""
+    
+    def __init__(self, store):
+        self.store = store
+        self.writes = []
+    
+    def set(self, document, data):
+        if len(self.writes) >= MAX_BATCH_WRITES:
+            raise ValueError(f"A write batch holds at most {MAX_BATCH_WRITES} operations")
+        self.writes.append((document, dict(data)))
+    
+    def commit(self):
+        writes, self.writes = self.writes, []
+        payloads = [self.store._encode(self.store._resolve(data, time.time())) for _, data in writes]
+        self.store._round_trip('batch_commits', bytes_sent=sum(len(payload) for payload in payloads),
+                               documents_written=len(writes))
+        self.store._apply(writes)
+        return [document for document, _ in writes]
 
 
 class MockCollection:
     """Mock Firestore collection"""
     
-    def __init__(self, data, collection_name):
-        self.data = data
+    def __init__(self, store, collection_name):
+        self.store = store
+        self.data = store.data
         self.collection_name = collection_name
         
         if collection_name not in self.data:
             self.data[collection_name] = {}
     
     def document(self, doc_id):
-        return MockDocument(self.data[self.collection_name], doc_id)
+        return MockDocument(self.store, self.data[self.collection_name], doc_id)
     
     def where(self, field, operator, value):
-        return MockQuery(self.data[self.collection_name], field, operator, value)
+        return MockQuery(self.store, self.data[self.collection_name], [(field, operator, value)])
 
 
 class MockDocument:
     """Mock Firestore document"""
     
-    def __init__(self, collection_data, doc_id):
+    def __init__(self, store, collection_data, doc_id):
+        self.store = store
         self.collection_data = collection_data
         self.doc_id = doc_id
     
     def get(self):
-        return MockDocumentSnapshot(self.collection_data, self.doc_id)
+        found = self.doc_id in self.collection_data
+        payload = self.store._encode(self.collection_data[self.doc_id]) if found else ''
+        self.store._round_trip('document_gets', bytes_received=len(payload), documents_read=int(found))
+        return MockDocumentSnapshot({self.doc_id: json.loads(payload)} if found else {}, self.doc_id)
     
     def set(self, data):
-        self.collection_data[self.doc_id] = data
+        payload = self.store._encode(self.store._resolve(data, time.time()))
+        self.store._round_trip('document_sets', bytes_sent=len(payload), documents_written=1)
+        self.store._apply([(self, data)])
 
 
 class MockDocumentSnapshot:
@@ -801,15 +1338,34 @@ class MockDocumentSnapshot:
 class MockQuery:
     """Mock Firestore query"""
     
-    def __init__(self, collection_data, field, operator, value):
+    OPERATORS = {
+        '==': lambda a, b: a == b,
+        '>': lambda a, b: a > b,
+        '>=': lambda a, b: a >= b,
+        '<': lambda a, b: a < b,
+        '<=': lambda a, b: a <= b
+    }
+    
+    def __init__(self, store, collection_data, filters):
+        self.store = store
         self.collection_data = collection_data
-        self.field = field
-        self.operator = operator
-        self.value = value
+        self.filters = filters
+    
+    def where(self, field, operator, value):
+        return MockQuery(self.store, self.collection_data, self.filters + [(field, operator, value)])
     
     def get(self):
-        results = []
-        for doc_id, doc_data in self.collection_data.items():
-            if self.field in doc_data and doc_data[self.field] == self.value:
-                results.append(MockDocumentSnapshot({doc_id: doc_data}, doc_id))
-        return results
\ No newline at end of file
+        # Timestamps are stored as epoch seconds
+        filters = [(field, operator, value.timestamp() if isinstance(value, datetime) else value)
+                   for field, operator, value in self.filters]
+        matches = {}
+        with self.store._lock:
+            for doc_id, doc_data in self.collection_data.items():
+                if all(field in doc_data and self.OPERATORS[operator](doc_data[field], value)
+                       for field, operator, value in filters):
+                    matches[doc_id] = self.store._encode(doc_data)
+        
+        self.store._round_trip('queries', bytes_received=sum(len(payload) for payload in matches.values()),
+                               documents_read=len(matches))
+        return [MockDocumentSnapshot({doc_id: json.loads(payload)}, doc_id)
+                for doc_id, payload in matches.items()]
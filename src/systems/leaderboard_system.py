@@ -3,15 +3,23 @@ Leaderboard System for Kingdom of Aldoria
 Handles player rankings, seasonal competitions, and reward distribution
 """
 
+import os
+import gzip
 import json
 import time
+import shutil
 import sqlite3
 import logging
+import threading
+from bisect import bisect_left
+from itertools import islice
+from contextlib import ExitStack
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple, Any, Iterable, Union, Callable
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 import math
+from .sqlite_connections import SQLiteConnectionPool
 
 class LeaderboardType(Enum):
     POWER_LEVEL = "power_level"           # Total player power (level + gear)
@@ -28,6 +36,11 @@ class RewardTier(Enum):
     GOLD = "gold"            # Ranks 21-50
     SILVER = "silver"        # Ranks 51-100
 
+class PartitionMode(Enum):
+    NONE = "none"                # Everything in the main database file
+    SEASON = "season"            # One SQLite file per season
+    SEASON_TYPE = "season_type"  # One SQLite file per season and leaderboard type
+
 @dataclass
 class LeaderboardEntry:
     user_id: str
@@ -49,6 +62,33 @@ class LeaderboardReward:
     rarity: str = "common"
     description: str = ""
 
+@dataclass
+class ScoreUpdate:
+    user_id: str
+    leaderboard_type: Union[LeaderboardType, str]
+    score_change: int
+    username: Optional[str] = None      # None keeps the stored name (user_id for new rows)
+    player_level: Optional[int] = None  # None keeps the stored level
+    avatar_url: Optional[str] = None    # None keeps the stored avatar
+    season_id: Optional[str] = None     # None applies to the current season
+    
+    def merge(self, other: "ScoreUpdate"):
+        """Fold a later update for the same player and leaderboard into this one"""
+        self.score_change += other.score_change
+        if other.username is not None:
+            self.username = other.username
+        if other.player_level is not None:
+            self.player_level = other.player_level
+        if other.avatar_url is not None:
+            self.avatar_url = other.avatar_url
+
+@dataclass
+class BoardStats:
+    """Running aggregates for one leaderboard/season"""
+    players: int = 0
+    score_total: int = 0
+    top_score: int = 0
+
 @dataclass
 class SeasonInfo:
     season_id: str
@@ -58,13 +98,539 @@ class SeasonInfo:
     is_active: bool
     rewards_distributed: bool = False
 
+class RankIndex:
+    """In-memory order-statistic index for one leaderboard/season.
+
+    Keys sort exactly like ``ORDER BY score DESC, last_updated ASC, user_id ASC``
+    so a key's position in sorted order is its ``rank_position``. Keys are kept
+    in sorted blocks of at most ``2 * BLOCK_SIZE`` with a Fenwick tree over the
+    block lengths, so rank lookups take O(log N) and an insert or remove only
+    shifts one block instead of the whole board.
+    """
+
+    BLOCK_SIZE = 512
+
+    def __init__(self):
+        self._blocks: List[List[Tuple[int, float, str]]] = []
+        self._maxes: List[Tuple[int, float, str]] = []
+        self._tree: List[int] = [0]
+        self._size = 0
+        self._by_user: Dict[str, Tuple[int, float, str]] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._by_user
+
+    def load(self, rows: List[Tuple[str, int, float]]):
+        """Replace the index contents with (user_id, score, last_updated) rows"""
+        keys = sorted((-score, last_updated, user_id) for user_id, score, last_updated in rows)
+        self._blocks = [keys[i:i + self.BLOCK_SIZE] for i in range(0, len(keys), self.BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._size = len(keys)
+        self._by_user = {key[2]: key for key in keys}
+        self._rebuild_tree()
+
+    def _rebuild_tree(self):
+        """Rebuild the Fenwick tree after blocks were split or dropped"""
+        tree = [0] * (len(self._blocks) + 1)
+        for i, block in enumerate(self._blocks, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, block: int, delta: int):
+        i = block + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _keys_before(self, block: int) -> int:
+        """Number of keys in the blocks before ``block``"""
+        total = 0
+        i = block
+        while i:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, key: Tuple[int, float, str]) -> Tuple[int, int]:
+        """Block and offset of a stored key"""
+        block = bisect_left(self._maxes, key)
+        return block, bisect_left(self._blocks[block], key)
+
+    def score_of(self, user_id: str) -> int:
+        key = self._by_user.get(user_id)
+        return -key[0] if key else 0
+
+    def rank_of(self, user_id: str) -> int:
+        """1-based rank of a user, or 0 if the user is not ranked"""
+        key = self._by_user.get(user_id)
+        if key is None:
+            return 0
+        block, offset = self._find(key)
+        return self._keys_before(block) + offset + 1
+
+    def user_at(self, rank: int) -> Optional[str]:
+        if not 1 <= rank <= self._size:
+            return None
+        # Walk down the Fenwick tree to the block holding the rank
+        block = 0
+        remaining = rank
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = block + step
+            if nxt < len(self._tree) and self._tree[nxt] < remaining:
+                block = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return self._blocks[block][remaining - 1][2]
+
+    def top_score(self) -> int:
+        return -self._blocks[0][0][0] if self._blocks else 0
+
+    def remove(self, user_id: str) -> int:
+        """Remove a user and return the rank they held (0 if absent)"""
+        key = self._by_user.pop(user_id, None)
+        if key is None:
+            return 0
+        block, offset = self._find(key)
+        rank = self._keys_before(block) + offset + 1
+        keys = self._blocks[block]
+        del keys[offset]
+        self._size -= 1
+        if keys:
+            self._maxes[block] = keys[-1]
+            self._add(block, -1)
+        else:
+            del self._blocks[block]
+            del self._maxes[block]
+            self._rebuild_tree()
+        return rank
+
+    def insert(self, user_id: str, score: int, last_updated: float) -> int:
+        """Insert (or move) a user and return their new rank"""
+        self.remove(user_id)
+        key = (-score, last_updated, user_id)
+        self._by_user[user_id] = key
+        self._size += 1
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return 1
+
+        block = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        keys = self._blocks[block]
+        offset = bisect_left(keys, key)
+        keys.insert(offset, key)
+        self._maxes[block] = keys[-1]
+        rank = self._keys_before(block) + offset + 1
+        if len(keys) > 2 * self.BLOCK_SIZE:
+            # Split the full block in two; rebuilding the tree is O(blocks),
+            # once per BLOCK_SIZE inserts into the same block
+            self._blocks[block:block + 1] = [keys[:self.BLOCK_SIZE], keys[self.BLOCK_SIZE:]]
+            self._maxes[block:block + 1] = [keys[self.BLOCK_SIZE - 1], keys[-1]]
+            self._rebuild_tree()
+        else:
+            self._add(block, 1)
+        return rank
+
+class ScoreHistogram:
+    """Bucketed score counts for one leaderboard/season.
+
+    Scores below 16 get exact buckets; above that each power of two is split
+    into 8 buckets, so estimates stay within 12.5% of the true score while the
+    bucket count only grows with log2 of the highest score.
+    """
+
+    LINEAR_LIMIT = 16
+    SUB_BUCKETS = 8
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+
+    @classmethod
+    def bucket_of(cls, score: int) -> int:
+        score = max(0, int(score))
+        if score < cls.LINEAR_LIMIT:
+            return score
+        exponent = score.bit_length() - 1
+        return (cls.LINEAR_LIMIT + (exponent - 4) * cls.SUB_BUCKETS
+                + ((score >> (exponent - 3)) & (cls.SUB_BUCKETS - 1)))
+
+    @classmethod
+    def bucket_bounds(cls, bucket: int) -> Tuple[int, int]:
+        """Inclusive lower and exclusive upper score of a bucket"""
+        if bucket < cls.LINEAR_LIMIT:
+            return bucket, bucket + 1
+        exponent, sub_bucket = divmod(bucket - cls.LINEAR_LIMIT, cls.SUB_BUCKETS)
+        exponent += 4
+        width = 1 << (exponent - 3)
+        low = (1 << exponent) + sub_bucket * width
+        return low, low + width
+
+    @classmethod
+    def deltas_for(cls, moves: Iterable[Tuple[Optional[int], int]]) -> Dict[int, int]:
+        """Bucket count changes for (old_score or None, new_score) moves"""
+        deltas: Dict[int, int] = {}
+        for old_score, new_score in moves:
+            if old_score is not None:
+                bucket = cls.bucket_of(old_score)
+                deltas[bucket] = deltas.get(bucket, 0) - 1
+            bucket = cls.bucket_of(new_score)
+            deltas[bucket] = deltas.get(bucket, 0) + 1
+        return {bucket: delta for bucket, delta in deltas.items() if delta}
+
+    def apply(self, deltas: Dict[int, int]):
+        for bucket, delta in deltas.items():
+            count = self.counts.get(bucket, 0) + delta
+            if count > 0:
+                self.counts[bucket] = count
+            else:
+                self.counts.pop(bucket, None)
+            self.total += delta
+
+    def count_above(self, score: int) -> float:
+        """Estimated number of players with a strictly higher score"""
+        own_bucket = self.bucket_of(score)
+        above = 0.0
+        for bucket, count in self.counts.items():
+            if bucket > own_bucket:
+                above += count
+            elif bucket == own_bucket:
+                low, high = self.bucket_bounds(bucket)
+                # Assume scores spread evenly inside the bucket
+                above += count * (high - 1 - score) / (high - low)
+        return above
+
+    def score_at_rank(self, rank: int) -> int:
+        """Estimated score held by the player at a 1-based rank (0 past the end)"""
+        seen = 0
+        for bucket in sorted(self.counts, reverse=True):
+            count = self.counts[bucket]
+            if seen + count >= rank:
+                low, high = self.bucket_bounds(bucket)
+                position = rank - seen  # 1..count, counted from the top of the bucket
+                return int(low + (high - 1 - low) * (count - position) / count) if count > 1 else low
+            seen += count
+        return 0
+
+class ScoreWriteQueue:
+    """Write-behind buffer in front of LeaderboardManager score updates.
+
+    submit() only touches an in-memory dict, so gameplay code never waits on
+    SQLite. A worker thread drains the queue in batches through
+    update_player_scores_bulk, summing repeated deltas for the same player.
+    Failed batches are put back and retried with backoff.
+    """
+
+    def __init__(self, manager: "LeaderboardManager", batch_size: int = 500,
+                 flush_interval: float = 0.25, max_retry_delay: float = 5.0):
+        self.manager = manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retry_delay = max_retry_delay
+        self.logger = logging.getLogger(__name__)
+        
+        # Coalesced updates keyed by (user_id, leaderboard_type, season_id), oldest first
+        self._pending: Dict[Tuple[str, str, str], ScoreUpdate] = {}
+        self._queued_at: Dict[Tuple[str, str, str], float] = {}
+        self._in_flight: Dict[Tuple[str, str, str], ScoreUpdate] = {}
+        self._generation = 0  # Bumped whenever a batch commits
+        self._flush_requested = False
+        self._stopping = False
+        self._condition = threading.Condition()
+        
+        self.metrics = {
+            'updates_submitted': 0,
+            'entries_flushed': 0,
+            'batches_flushed': 0,
+            'failed_batches': 0,
+            'entries_dropped': 0,
+            'last_batch_size': 0,
+            'last_batch_ms': 0.0,
+            'last_batch_lag_seconds': 0.0
+        }
+        
+        self._worker = threading.Thread(target=self._run, name="leaderboard-score-queue", daemon=True)
+        self._worker.start()
+    
+    def submit(self, user_id: str, username: str, leaderboard_type: LeaderboardType,
+               score_change: int, season_id: str, player_level: int = 1, avatar_url: str = ""):
+        """Queue a score change earned in season_id; returns immediately"""
+        update = ScoreUpdate(user_id, LeaderboardType(leaderboard_type).value, score_change,
+                             username, player_level, avatar_url, season_id)
+        key = (user_id, update.leaderboard_type, season_id)
+        
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError("Score queue is closed")
+            
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = update
+                self._queued_at[key] = time.time()
+            else:
+                pending.merge(update)
+            
+            self.metrics['updates_submitted'] += 1
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+    
+    def pending_update(self, user_id: str, leaderboard_type: str, season_id: str) -> Optional[ScoreUpdate]:
+        """Combined not-yet-committed update for one player, or None"""
+        key = (user_id, leaderboard_type, season_id)
+        with self._condition:
+            return self._combined_pending(key)
+    
+    def _combined_pending(self, key: Tuple[str, str, str]) -> Optional[ScoreUpdate]:
+        in_flight = self._in_flight.get(key)
+        pending = self._pending.get(key)
+        if in_flight is None and pending is None:
+            return None
+        
+        combined = replace(in_flight or pending)
+        if in_flight is not None and pending is not None:
+            combined.merge(pending)
+        return combined
+    
+    def read_your_writes(self, user_id: str, leaderboard_type: str, season_id: str,
+                         fetch: Callable[[], Optional[LeaderboardEntry]]) -> Optional[LeaderboardEntry]:
+        """Overlay a player's queued delta onto a committed entry returned by fetch.
+        
+        The read is retried if a batch commits while it runs, so a delta is never
+        counted twice or missed. Rank stays the last committed rank.
+        """
+        key = (user_id, leaderboard_type, season_id)
+        for _ in range(3):
+            with self._condition:
+                generation = self._generation
+                pending = self._combined_pending(key)
+            
+            entry = fetch()
+            
+            with self._condition:
+                if self._generation == generation:
+                    break
+        
+        if pending is None or (entry is None and not pending.score_change):
+            return entry
+        
+        if entry is None:
+            # Not on the board yet; show the queued score without a rank
+            return LeaderboardEntry(
+                user_id=user_id,
+                username=pending.username or user_id,
+                rank=0,
+                score=max(0, pending.score_change),
+                previous_rank=0,
+                change=0,
+                avatar_url=pending.avatar_url or "",
+                level=pending.player_level or 1,
+                last_updated=time.time()
+            )
+        
+        return replace(entry, score=max(0, entry.score + pending.score_change))
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, lag and throughput counters"""
+        with self._condition:
+            oldest = next(iter(self._queued_at.values()), None)
+            metrics = dict(self.metrics)
+            metrics['queue_depth'] = len(self._pending)
+            metrics['in_flight'] = len(self._in_flight)
+            metrics['lag_seconds'] = round(time.time() - oldest, 3) if oldest else 0.0
+        return metrics
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything submitted so far is committed; False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self._flush_requested = False
+        return True
+    
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting updates, drain the queue and make the writes durable"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        
+        self._worker.join(timeout)
+        drained = not self._worker.is_alive() and not self._pending
+        
+        try:
+            self.manager._checkpoint()
+        except Exception as e:
+            self.logger.warning(f"Failed to checkpoint leaderboard database: {e}")
+        
+        if not drained:
+            self.logger.error(f"Score queue closed with {len(self._pending)} updates unflushed")
+        return drained
+    
+    def _take_batch(self) -> Dict[Tuple[str, str, str], ScoreUpdate]:
+        keys = list(islice(self._pending, self.batch_size))
+        return {key: self._pending.pop(key) for key in keys}
+    
+    def _requeue(self, batch: Dict[Tuple[str, str, str], ScoreUpdate],
+                 queued_at: Dict[Tuple[str, str, str], float]):
+        """Put a failed batch back ahead of anything submitted since"""
+        pending = dict(batch)
+        for key, update in self._pending.items():
+            if key in pending:
+                pending[key].merge(update)
+            else:
+                pending[key] = update
+        
+        restored = dict(queued_at)
+        for key, stamp in self._queued_at.items():
+            restored.setdefault(key, stamp)
+        
+        self._pending = pending
+        self._queued_at = restored
+    
+    def _run(self):
+        retry_delay = self.flush_interval
+        shutdown_failures = 0  # Failed flushes since close() was called
+        
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                
+                # Let a burst coalesce unless a full batch or a flush is waiting
+                if (len(self._pending) < self.batch_size and not self._stopping
+                        and not self._flush_requested):
+                    self._condition.wait(self.flush_interval)
+                
+                batch = self._take_batch()
+                queued_at = {key: self._queued_at.pop(key) for key in batch}
+                self._in_flight = batch
+            
+            result = self.manager.update_player_scores_bulk(list(batch.values()))
+            
+            with self._condition:
+                self._in_flight = {}
+                if result['success']:
+                    self._generation += 1
+                    self.metrics['entries_flushed'] += len(batch) - result['updates_dropped']
+                    self.metrics['entries_dropped'] += result['updates_dropped']
+                    self.metrics['batches_flushed'] += 1
+                    self.metrics['last_batch_size'] = len(batch)
+                    self.metrics['last_batch_ms'] = round(result['elapsed_ms'], 3)
+                    self.metrics['last_batch_lag_seconds'] = round(time.time() - min(queued_at.values()), 3)
+                    retry_delay = self.flush_interval
+                else:
+                    self._requeue(batch, queued_at)
+                    self.metrics['failed_batches'] += 1
+                self._condition.notify_all()
+            
+            if not result['success']:
+                if self._stopping:
+                    shutdown_failures += 1
+                    if shutdown_failures >= 5:
+                        self.logger.error("Giving up on score queue flush during shutdown")
+                        return
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.max_retry_delay)
+
 class LeaderboardManager:
-    def __init__(self, database_path: str = "database/leaderboards.db"):
+    # Reward tiers and the lowest rank that still earns them
+    _TIER_RANK_LIMITS = [
+        (RewardTier.LEGENDARY, 1),
+        (RewardTier.DIAMOND, 5),
+        (RewardTier.PLATINUM, 20),
+        (RewardTier.GOLD, 50),
+        (RewardTier.SILVER, 100)
+    ]
+    
+    # Upsert that keeps id/title/created_at; NULL username/level/avatar keep stored values
+    _UPSERT_ENTRY_SQL = '''
+        INSERT INTO leaderboard_entries 
+        (user_id, username, leaderboard_type, season_id, score, rank_position,
+         previous_rank, rank_generation, avatar_url, level, last_updated)
+        VALUES (:user_id, COALESCE(:username, :user_id), :leaderboard_type, :season_id,
+                :score, :rank_position, :previous_rank, :rank_generation,
+                COALESCE(:avatar_url, ''), COALESCE(:level, 1), :last_updated)
+        ON CONFLICT(user_id, leaderboard_type, season_id) DO UPDATE SET
+            username = COALESCE(:username, username),
+            score = excluded.score,
+            rank_position = excluded.rank_position,
+            previous_rank = excluded.previous_rank,
+            rank_generation = excluded.rank_generation,
+            avatar_url = COALESCE(:avatar_url, avatar_url),
+            level = COALESCE(:level, level),
+            last_updated = excluded.last_updated
+    '''
+    
+    # previous_rank is the rank before the board's latest rerank. Reranks only write
+    # the rows that move, so a row from an earlier rerank reads as unmoved
+    _ENTRY_COLUMNS = '''user_id, username, rank_position, score,
+                       CASE WHEN rank_generation = (
+                           SELECT MAX(latest.rank_generation) FROM leaderboard_entries AS latest
+                           WHERE latest.leaderboard_type = leaderboard_entries.leaderboard_type
+                             AND latest.season_id = leaderboard_entries.season_id
+                       ) THEN previous_rank ELSE rank_position END,
+                       avatar_url, level, title, last_updated'''
+    
+    def __init__(self, database_path: str = "database/leaderboards.db", top_cache_size: int = 100,
+                 reward_batch_size: int = 25, partition_mode: PartitionMode = PartitionMode.NONE):
         self.database_path = database_path
         self.logger = logging.getLogger(__name__)
         self.current_season = None
-        self._init_database()
-        self._load_current_season()
+        self._pool = SQLiteConnectionPool(database_path)
+        self.score_queue: Optional[ScoreWriteQueue] = None
+        
+        # Entry/histogram partitions keyed by (season_id, leaderboard_type or "*");
+        # seasons, rewards and the partition registry stay in the main database
+        self.partition_mode = PartitionMode(partition_mode)
+        self.partition_dir = os.path.splitext(database_path)[0] + "_partitions"
+        self._board_pools: Dict[Tuple[str, str], SQLiteConnectionPool] = {}
+        self._partition_lock = threading.Lock()
+        self._board_locks: Dict[Tuple[str, str], threading.RLock] = {}
+        
+        # Rank indexes keyed by (leaderboard_type, season_id), seeded lazily
+        self._rank_indexes: Dict[Tuple[str, str], RankIndex] = {}
+        self._histograms: Dict[Tuple[str, str], ScoreHistogram] = {}
+        self._rank_generations: Dict[Tuple[str, str], int] = {}
+        self._rank_lock = threading.RLock()
+        
+        # Running aggregates behind get_leaderboard_stats. Board stats change under
+        # the board lock; the main-database counters are loaded on first use and
+        # bumped by writers that hold _stats_lock across their transaction
+        self._board_stats: Dict[Tuple[str, str], BoardStats] = {}
+        self._counters: Optional[Dict[str, int]] = None
+        self._stats_lock = threading.Lock()
+        self._reconcile_thread: Optional[threading.Thread] = None
+        self._reconcile_stop = threading.Event()
+        
+        # Top-N page cache keyed by (leaderboard_type, season_id) -> (limit, entries)
+        self.top_cache_size = top_cache_size
+        self._top_cache: Dict[Tuple[str, str], Tuple[int, List[LeaderboardEntry]]] = {}
+        self._cache_generation: Dict[Tuple[str, str], int] = {}
+        self._rerank_from: Dict[Tuple[str, str], int] = {}
+        self._cache_lock = threading.Lock()
+        
+        # Season-end reward distribution runs in pages off the caller's thread;
+        # progress callback receives (season_id, leaderboard_type, distributed, total)
+        self.reward_batch_size = reward_batch_size
+        self.reward_progress_callback: Optional[Callable[[str, str, int, int], None]] = None
+        self._distribution_threads: List[threading.Thread] = []
+        self._distributing: set = set()
+        self._distribution_lock = threading.Lock()
         
         # Reward configurations for different tiers
         self.tier_rewards = {
@@ -103,91 +669,472 @@ class LeaderboardManager:
                 "title": "Silver Champion"
             }
         }
+        
+        self._init_database()
+        self._resume_partition_moves()
+        self._check_partition_layout()
+        self._load_current_season()
+        self._resume_reward_distribution()
     
     def _init_database(self):
         """Initialize leaderboard database tables"""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            with self._pool.transaction() as cursor:
+                # Create tables
+                self._create_board_tables(cursor)
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS seasons (
+                        season_id TEXT PRIMARY KEY,
+                        season_name TEXT NOT NULL,
+                        start_date REAL NOT NULL,
+                        end_date REAL NOT NULL,
+                        is_active INTEGER DEFAULT 1,
+                        rewards_distributed INTEGER DEFAULT 0,
+                        reward_checkpoint_type TEXT,
+                        reward_checkpoint_rank INTEGER DEFAULT 0,
+                        created_at REAL DEFAULT (strftime('%s', 'now'))
+                    )
+                ''')
+                
+                # Checkpoint columns for databases created before resumable distribution
+                cursor.execute('PRAGMA table_info(seasons)')
+                season_columns = {row[1] for row in cursor.fetchall()}
+                if 'reward_checkpoint_type' not in season_columns:
+                    cursor.execute('ALTER TABLE seasons ADD COLUMN reward_checkpoint_type TEXT')
+                if 'reward_checkpoint_rank' not in season_columns:
+                    cursor.execute('ALTER TABLE seasons ADD COLUMN reward_checkpoint_rank INTEGER DEFAULT 0')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS leaderboard_rewards (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id TEXT NOT NULL,
+                        season_id TEXT NOT NULL,
+                        leaderboard_type TEXT NOT NULL,
+                        rank_achieved INTEGER NOT NULL,
+                        tier TEXT NOT NULL,
+                        rewards TEXT NOT NULL,  -- JSON string
+                        claimed INTEGER DEFAULT 0,
+                        claim_date REAL,
+                        created_at REAL DEFAULT (strftime('%s', 'now'))
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS leaderboard_partitions (
+                        season_id TEXT NOT NULL,
+                        leaderboard_type TEXT NOT NULL,  -- '*' when partitioned by season only
+                        file_path TEXT NOT NULL,
+                        archived INTEGER DEFAULT 0,
+                        created_at REAL DEFAULT (strftime('%s', 'now')),
+                        PRIMARY KEY (season_id, leaderboard_type)
+                    )
+                ''')
+                
+                # Partitions still being filled; a row here means a move may be half done
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS partition_moves (
+                        season_id TEXT NOT NULL,
+                        leaderboard_type TEXT NOT NULL,
+                        file_path TEXT NOT NULL,
+                        started_at REAL DEFAULT (strftime('%s', 'now')),
+                        PRIMARY KEY (season_id, leaderboard_type)
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS player_stats (
+                        user_id TEXT PRIMARY KEY,
+                        power_level INTEGER DEFAULT 0,
+                        stages_completed INTEGER DEFAULT 0,
+                        boss_kills INTEGER DEFAULT 0,
+                        arena_wins INTEGER DEFAULT 0,
+                        weekly_points INTEGER DEFAULT 0,
+                        monthly_points INTEGER DEFAULT 0,
+                        last_weekly_reset REAL DEFAULT 0,
+                        last_monthly_reset REAL DEFAULT 0,
+                        last_updated REAL DEFAULT (strftime('%s', 'now'))
+                    )
+                ''')
+                
+                # Create indexes for performance
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_rewards_user ON leaderboard_rewards(user_id, claimed)')
+            
+        except Exception as e:
+            self.logger.error(f"Failed to initialize leaderboard database: {e}")
+    
+    def _create_board_tables(self, cursor: sqlite3.Cursor):
+        """Create the entry and histogram tables (main database or a partition)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS leaderboard_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                username TEXT NOT NULL,
+                leaderboard_type TEXT NOT NULL,
+                season_id TEXT NOT NULL,
+                score INTEGER DEFAULT 0,
+                rank_position INTEGER DEFAULT 0,
+                previous_rank INTEGER DEFAULT 0,
+                rank_generation INTEGER DEFAULT 0,
+                avatar_url TEXT DEFAULT '',
+                level INTEGER DEFAULT 1,
+                title TEXT DEFAULT '',
+                last_updated REAL DEFAULT 0,
+                created_at REAL DEFAULT (strftime('%s', 'now')),
+                UNIQUE(user_id, leaderboard_type, season_id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS score_histograms (
+                leaderboard_type TEXT NOT NULL,
+                season_id TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                player_count INTEGER DEFAULT 0,
+                PRIMARY KEY (leaderboard_type, season_id, bucket)
+            )
+        ''')
+        
+        # Rerank generation column for boards created before it existed
+        cursor.execute('PRAGMA table_info(leaderboard_entries)')
+        if 'rank_generation' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute('ALTER TABLE leaderboard_entries ADD COLUMN rank_generation INTEGER DEFAULT 0')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_leaderboard_score ON leaderboard_entries(leaderboard_type, season_id, score DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_leaderboard_rank ON leaderboard_entries(leaderboard_type, season_id, rank_position)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_season ON leaderboard_entries(user_id, season_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_leaderboard_generation ON leaderboard_entries(leaderboard_type, season_id, rank_generation)')
+    
+    def _partition_key(self, leaderboard_type: str, season_id: str) -> Tuple[str, str]:
+        if self.partition_mode == PartitionMode.SEASON_TYPE:
+            return (season_id, leaderboard_type)
+        return (season_id, "*")
+    
+    def _partition_path(self, partition_key: Tuple[str, str]) -> str:
+        season_id, leaderboard_type = partition_key
+        name = season_id if leaderboard_type == "*" else f"{season_id}_{leaderboard_type}"
+        return os.path.join(self.partition_dir, f"{name}.db")
+    
+    def _board_pool(self, leaderboard_type: str, season_id: Optional[str] = None) -> SQLiteConnectionPool:
+        """Connection pool holding a leaderboard's entries and histogram.
+        
+        Partition files are created (and any rows for them moved out of the main
+        database) on first use. Each partition has its own SQLite file lock, so
+        writers on different partitions never wait for each other.
+        """
+        if self.partition_mode == PartitionMode.NONE:
+            return self._pool
+        
+        season_id = season_id or self.current_season.season_id
+        key = self._partition_key(leaderboard_type, season_id)
+        pool = self._board_pools.get(key)
+        if pool is not None:
+            return pool
+        
+        with self._partition_lock:
+            pool = self._board_pools.get(key)
+            if pool is not None:
+                return pool
             
-            # Create tables
+            cursor = self._pool.connection().cursor()
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS leaderboard_entries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    username TEXT NOT NULL,
-                    leaderboard_type TEXT NOT NULL,
-                    season_id TEXT NOT NULL,
-                    score INTEGER DEFAULT 0,
-                    rank_position INTEGER DEFAULT 0,
-                    previous_rank INTEGER DEFAULT 0,
-                    avatar_url TEXT DEFAULT '',
-                    level INTEGER DEFAULT 1,
-                    title TEXT DEFAULT '',
-                    last_updated REAL DEFAULT 0,
-                    created_at REAL DEFAULT (strftime('%s', 'now')),
-                    UNIQUE(user_id, leaderboard_type, season_id)
-                )
-            ''')
+                SELECT file_path, archived FROM leaderboard_partitions
+                WHERE season_id = ? AND leaderboard_type = ?
+            ''', key)
+            result = cursor.fetchone()
+            if result and result[1]:
+                raise RuntimeError(f"Leaderboard partition {key} is archived; restore_season() it first")
+            
+            path = result[0] if result else self._partition_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pool = SQLiteConnectionPool(path)
+            with pool.transaction() as board_cursor:
+                self._create_board_tables(board_cursor)
             
+            if not result:
+                self._fill_partition(pool, key)
+            else:
+                # A layout switch cut short by a crash can leave this season's
+                # rows in live partitions of the other layout
+                cursor.execute('''
+                    SELECT 1 FROM leaderboard_partitions
+                    WHERE season_id = ? AND leaderboard_type != ? AND archived = 0
+                      AND (? = '*' OR leaderboard_type = '*')
+                    LIMIT 1
+                ''', key + (key[1],))
+                if cursor.fetchone():
+                    self._fill_partition(pool, key)
+            
+            self._board_pools[key] = pool
+            return pool
+    
+    def _fill_partition(self, pool: SQLiteConnectionPool, partition_key: Tuple[str, str]):
+        """Move a partition's rows into it from every other source and register it.
+        
+        Rows are copied into the partition and then deleted from their source,
+        which are separate commits in separate files. A partition_moves row
+        covers the whole move: it is written first and removed in the same
+        commit that registers the partition, so a crash part way through is
+        finished by _resume_partition_moves() on the next startup.
+        """
+        with self._pool.transaction() as cursor:
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS seasons (
-                    season_id TEXT PRIMARY KEY,
-                    season_name TEXT NOT NULL,
-                    start_date REAL NOT NULL,
-                    end_date REAL NOT NULL,
-                    is_active INTEGER DEFAULT 1,
-                    rewards_distributed INTEGER DEFAULT 0,
-                    created_at REAL DEFAULT (strftime('%s', 'now'))
+                INSERT OR REPLACE INTO partition_moves (season_id, leaderboard_type, file_path)
+                VALUES (?, ?, ?)
+            ''', partition_key + (pool.database_path,))
+        
+        self._migrate_into_partition(pool, partition_key)
+        
+        with self._stats_lock:
+            with self._pool.transaction() as cursor:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO leaderboard_partitions (season_id, leaderboard_type, file_path)
+                    VALUES (?, ?, ?)
+                ''', partition_key + (pool.database_path,))
+                created = cursor.rowcount
+                cursor.execute('''
+                    DELETE FROM partition_moves WHERE season_id = ? AND leaderboard_type = ?
+                ''', partition_key)
+            self._bump_counters(partitions=created)
+    
+    def _resume_partition_moves(self):
+        """Finish partition moves interrupted by a crash.
+        
+        Runs before anything reads board rows, whatever the partition_mode, so
+        rows copied into a partition but not yet deleted from their source are
+        never seen (or counted) twice.
+        """
+        try:
+            cursor = self._pool.connection().cursor()
+            cursor.execute('SELECT season_id, leaderboard_type, file_path FROM partition_moves')
+            
+            for season_id, leaderboard_type, path in cursor.fetchall():
+                key = (season_id, leaderboard_type)
+                self.logger.info(f"Resuming interrupted move into partition {key}")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                pool = SQLiteConnectionPool(path)
+                try:
+                    with pool.transaction() as board_cursor:
+                        self._create_board_tables(board_cursor)
+                    self._fill_partition(pool, key)
+                finally:
+                    pool.close_all()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to resume partition moves: {e}")
+    
+    def _check_partition_layout(self):
+        """Refuse unpartitioned storage while live partitions hold board rows"""
+        if self.partition_mode != PartitionMode.NONE:
+            return
+        
+        cursor = self._pool.connection().cursor()
+        cursor.execute('SELECT COUNT(*) FROM leaderboard_partitions WHERE archived = 0')
+        partitions = cursor.fetchone()[0]
+        if partitions:
+            raise ValueError(
+                f"{self.database_path} has {partitions} leaderboard partition(s); "
+                f"open it with PartitionMode.SEASON or PartitionMode.SEASON_TYPE"
+            )
+    
+    def _migrate_into_partition(self, pool: SQLiteConnectionPool, partition_key: Tuple[str, str]):
+        """Move a board's existing rows into a new partition.
+        
+        Rows come from the main database (written before partitioning) and from
+        the season's partitions in the other layout (written under a different
+        partition_mode). Source partitions left empty are dropped.
+        """
+        season_id, leaderboard_type = partition_key
+        type_filter = "" if leaderboard_type == "*" else " AND leaderboard_type = ?"
+        params = (season_id,) if leaderboard_type == "*" else (season_id, leaderboard_type)
+        
+        self._move_board_rows(self._pool, pool, type_filter, params, partition_key)
+        
+        # A season-wide "*" partition holds every type; a per-type one only its own
+        cursor = self._pool.connection().cursor()
+        cursor.execute('''
+            SELECT leaderboard_type, file_path, archived FROM leaderboard_partitions
+            WHERE season_id = ? AND leaderboard_type != ?
+        ''', (season_id, leaderboard_type))
+        for source_type, path, archived in cursor.fetchall():
+            if leaderboard_type != "*" and source_type != "*":
+                continue
+            if archived:
+                raise RuntimeError(f"Leaderboard partition {(season_id, source_type)} is archived; restore_season() it first")
+            
+            source = SQLiteConnectionPool(path)
+            try:
+                self._move_board_rows(source, pool, type_filter, params, partition_key)
+                source_cursor = source.connection().cursor()
+                empty = True
+                for table in ("leaderboard_entries", "score_histograms"):
+                    source_cursor.execute(f'SELECT 1 FROM {table} LIMIT 1')
+                    empty = empty and source_cursor.fetchone() is None
+            finally:
+                source.close_all()
+            
+            if empty:
+                with self._stats_lock:
+                    with self._pool.transaction() as main_cursor:
+                        main_cursor.execute('''
+                            DELETE FROM leaderboard_partitions
+                            WHERE season_id = ? AND leaderboard_type = ?
+                        ''', (season_id, source_type))
+                        dropped = main_cursor.rowcount
+                    self._bump_counters(partitions=-dropped)
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+                self.logger.info(f"Dropped empty partition {(season_id, source_type)}")
+    
+    def _move_board_rows(self, source: SQLiteConnectionPool, target: SQLiteConnectionPool,
+                         type_filter: str, params: Tuple[str, ...], partition_key: Tuple[str, str]):
+        """Copy matching entry and histogram rows into target, then delete them from source.
+        
+        Rows are matched on their natural key, not the per-file id, so the copy
+        skips rows target already has: running this again after a crash between
+        the two commits only finishes the delete, and partitions whose ids
+        overlap merge without losing rows.
+        """
+        cursor = source.connection().cursor()
+        for table in ("leaderboard_entries", "score_histograms"):
+            cursor.execute(f'SELECT * FROM {table} WHERE season_id = ?{type_filter}', params)
+            keep = [i for i, column in enumerate(cursor.description) if column[0] != "id"]
+            columns = [cursor.description[i][0] for i in keep]
+            rows = [tuple(row[i] for i in keep) for row in cursor.fetchall()]
+            if not rows:
+                continue
+            
+            with target.transaction() as board_cursor:
+                board_cursor.executemany(
+                    f'INSERT OR IGNORE INTO {table} ({", ".join(columns)}) '
+                    f'VALUES ({", ".join("?" * len(columns))})', rows
                 )
-            ''')
+            with source.transaction() as source_cursor:
+                source_cursor.execute(f'DELETE FROM {table} WHERE season_id = ?{type_filter}', params)
             
+            self.logger.info(f"Moved {len(rows)} {table} rows into partition {partition_key}")
+    
+    def _season_board_pools(self, season_id: str) -> List[SQLiteConnectionPool]:
+        """Distinct pools holding any leaderboard of a season"""
+        pools = []
+        for lb_type in LeaderboardType:
+            pool = self._board_pool(lb_type.value, season_id)
+            if pool not in pools:
+                pools.append(pool)
+        return pools
+    
+    def _board_lock(self, leaderboard_type: str, season_id: str) -> threading.RLock:
+        """Per-leaderboard lock guarding its rank index and histogram during writes"""
+        key = (leaderboard_type, season_id)
+        lock = self._board_locks.get(key)
+        if lock is None:
+            with self._partition_lock:
+                lock = self._board_locks.setdefault(key, threading.RLock())
+        return lock
+    
+    def archive_season(self, season_id: str, compress: bool = True) -> bool:
+        """Detach an ended season's partitions and optionally gzip them.
+        
+        Only seasons whose rewards have been distributed can be archived.
+        """
+        if self.partition_mode == PartitionMode.NONE:
+            self.logger.warning("archive_season requires partitioned storage")
+            return False
+        
+        try:
+            cursor = self._pool.connection().cursor()
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS leaderboard_rewards (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    season_id TEXT NOT NULL,
-                    leaderboard_type TEXT NOT NULL,
-                    rank_achieved INTEGER NOT NULL,
-                    tier TEXT NOT NULL,
-                    rewards TEXT NOT NULL,  -- JSON string
-                    claimed INTEGER DEFAULT 0,
-                    claim_date REAL,
-                    created_at REAL DEFAULT (strftime('%s', 'now'))
-                )
-            ''')
+                SELECT is_active, rewards_distributed FROM seasons WHERE season_id = ?
+            ''', (season_id,))
+            result = cursor.fetchone()
+            if not result or result[0] or not result[1]:
+                self.logger.warning(f"Season {season_id} is still active or awaiting rewards")
+                return False
             
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS player_stats (
-                    user_id TEXT PRIMARY KEY,
-                    power_level INTEGER DEFAULT 0,
-                    stages_completed INTEGER DEFAULT 0,
-                    boss_kills INTEGER DEFAULT 0,
-                    arena_wins INTEGER DEFAULT 0,
-                    weekly_points INTEGER DEFAULT 0,
-                    monthly_points INTEGER DEFAULT 0,
-                    last_weekly_reset REAL DEFAULT 0,
-                    last_monthly_reset REAL DEFAULT 0,
-                    last_updated REAL DEFAULT (strftime('%s', 'now'))
-                )
-            ''')
+                SELECT leaderboard_type, file_path FROM leaderboard_partitions
+                WHERE season_id = ? AND archived = 0
+            ''', (season_id,))
+            partitions = cursor.fetchall()
+            
+            for leaderboard_type, path in partitions:
+                with self._partition_lock:
+                    pool = self._board_pools.pop((season_id, leaderboard_type), None)
+                if pool is not None:
+                    pool.checkpoint()
+                    pool.close_all()
+                
+                if compress and os.path.exists(path):
+                    with open(path, 'rb') as source, gzip.open(path + ".gz", 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(path + suffix):
+                            os.remove(path + suffix)
+                
+                with self._stats_lock:
+                    with self._pool.transaction() as cursor:
+                        cursor.execute('''
+                            UPDATE leaderboard_partitions SET archived = ?
+                            WHERE season_id = ? AND leaderboard_type = ?
+                        ''', (2 if compress else 1, season_id, leaderboard_type))
+                    self._bump_counters(archived_partitions=1)
+            
+            with self._rank_lock:
+                for key in [key for key in self._rank_indexes if key[1] == season_id]:
+                    del self._rank_indexes[key]
+                for key in [key for key in self._histograms if key[1] == season_id]:
+                    del self._histograms[key]
+                for key in [key for key in self._board_stats if key[1] == season_id]:
+                    del self._board_stats[key]
+                for key in [key for key in self._rank_generations if key[1] == season_id]:
+                    del self._rank_generations[key]
+            
+            self.logger.info(f"Archived {len(partitions)} partition(s) for {season_id}")
+            return True
             
-            # Create indexes for performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_leaderboard_score ON leaderboard_entries(leaderboard_type, season_id, score DESC)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_season ON leaderboard_entries(user_id, season_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_rewards_user ON leaderboard_rewards(user_id, claimed)')
+        except Exception as e:
+            self.logger.error(f"Failed to archive season {season_id}: {e}")
+            return False
+    
+    def restore_season(self, season_id: str) -> bool:
+        """Decompress and reattach an archived season's partitions"""
+        try:
+            cursor = self._pool.connection().cursor()
+            cursor.execute('''
+                SELECT leaderboard_type, file_path, archived FROM leaderboard_partitions
+                WHERE season_id = ? AND archived > 0
+            ''', (season_id,))
+            
+            for leaderboard_type, path, archived in cursor.fetchall():
+                if archived == 2:
+                    with gzip.open(path + ".gz", 'rb') as source, open(path, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                    os.remove(path + ".gz")
+                
+                with self._stats_lock:
+                    with self._pool.transaction() as write_cursor:
+                        write_cursor.execute('''
+                            UPDATE leaderboard_partitions SET archived = 0
+                            WHERE season_id = ? AND leaderboard_type = ?
+                        ''', (season_id, leaderboard_type))
+                    self._bump_counters(archived_partitions=-1)
             
-            conn.commit()
-            conn.close()
+            return True
             
         except Exception as e:
-            self.logger.error(f"Failed to initialize leaderboard database: {e}")
+            self.logger.error(f"Failed to restore season {season_id}: {e}")
+            return False
+    
+    def _checkpoint(self):
+        """Checkpoint the main database and every open partition"""
+        for pool in [self._pool] + list(self._board_pools.values()):
+            pool.checkpoint()
     
     def _load_current_season(self):
         """Load or create the current active season"""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cursor = self._pool.connection().cursor()
             
             # Check for active season
             cursor.execute('''
@@ -218,8 +1165,6 @@ class LeaderboardManager:
                 # Create new season
                 self._create_new_season()
             
-            conn.close()
-            
         except Exception as e:
             self.logger.error(f"Failed to load current season: {e}")
             self._create_new_season()
@@ -240,210 +1185,852 @@ class LeaderboardManager:
                 is_active=True
             )
             
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Deactivate old seasons
-            cursor.execute('UPDATE seasons SET is_active = 0')
-            
-            # Create new season
-            cursor.execute('''
-                INSERT INTO seasons (season_id, season_name, start_date, end_date, is_active)
-                VALUES (?, ?, ?, ?, 1)
-            ''', (season_id, season_name, start_date.timestamp(), end_date.timestamp()))
-            
-            conn.commit()
-            conn.close()
+            with self._stats_lock:
+                with self._pool.transaction() as cursor:
+                    # Deactivate old seasons
+                    cursor.execute('UPDATE seasons SET is_active = 0')
+                    
+                    # Create new season
+                    cursor.execute('''
+                        INSERT INTO seasons (season_id, season_name, start_date, end_date, is_active)
+                        VALUES (?, ?, ?, ?, 1)
+                    ''', (season_id, season_name, start_date.timestamp(), end_date.timestamp()))
+                self._bump_counters(total_seasons=1)
+            
+            # Indexes and pages for previous seasons are no longer read or written
+            with self._rank_lock:
+                self._rank_indexes = {
+                    key: index for key, index in self._rank_indexes.items()
+                    if key[1] == season_id
+                }
+                self._histograms = {
+                    key: histogram for key, histogram in self._histograms.items()
+                    if key[1] == season_id
+                }
+                self._board_stats = {
+                    key: board_stats for key, board_stats in self._board_stats.items()
+                    if key[1] == season_id
+                }
+                self._rank_generations = {
+                    key: generation for key, generation in self._rank_generations.items()
+                    if key[1] == season_id
+                }
+            self._invalidate_top_cache()
             
             self.logger.info(f"Created new season: {season_name}")
             
         except Exception as e:
             self.logger.error(f"Failed to create new season: {e}")
     
-    def _end_season(self):
-        """End the current season and distribute rewards"""
+    def _end_season(self, background: bool = True):
+        """End the current season and distribute rewards.
+        
+        The next season is opened first, so live score updates move on to it
+        straight away while rewards for the ended season are handed out in
+        checkpointed batches (on a worker thread unless background is False).
+        """
         if not self.current_season or self.current_season.rewards_distributed:
             return
         
         try:
-            self.logger.info(f"Ending season: {self.current_season.season_name}")
-            
-            # Calculate and distribute rewards for all leaderboard types
-            for leaderboard_type in LeaderboardType:
-                self._distribute_season_rewards(leaderboard_type.value)
+            ended_season = self.current_season
+            self.logger.info(f"Ending season: {ended_season.season_name}")
             
-            # Mark season as ended and rewards distributed
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                UPDATE seasons 
-                SET is_active = 0, rewards_distributed = 1 
-                WHERE season_id = ?
-            ''', (self.current_season.season_id,))
-            
-            conn.commit()
-            conn.close()
+            # Mark season as ended and start its distribution checkpoint
+            with self._pool.transaction() as cursor:
+                cursor.execute('''
+                    UPDATE seasons 
+                    SET is_active = 0, reward_checkpoint_type = ?, reward_checkpoint_rank = 0
+                    WHERE season_id = ?
+                ''', (list(LeaderboardType)[0].value, ended_season.season_id))
             
             # Create new season
             self._create_new_season()
             
+            if background:
+                self._start_reward_distribution([ended_season.season_id])
+            else:
+                self._distribute_ended_season(ended_season.season_id)
+            
         except Exception as e:
             self.logger.error(f"Failed to end season: {e}")
     
-    def update_player_score(self, user_id: str, username: str, leaderboard_type: LeaderboardType, 
-                           score_change: int, player_level: int = 1, avatar_url: str = ""):
-        """Update a player's score on a specific leaderboard"""
+    def _resume_reward_distribution(self):
+        """Finish distributions interrupted by a crash or shutdown"""
         try:
-            if not self.current_season:
-                self._create_new_season()
+            cursor = self._pool.connection().cursor()
+            cursor.execute('''
+                SELECT season_id FROM seasons
+                WHERE is_active = 0 AND rewards_distributed = 0
+                  AND reward_checkpoint_type IS NOT NULL
+                ORDER BY end_date ASC
+            ''')
             
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            season_ids = [row[0] for row in cursor.fetchall()]
+            if season_ids:
+                self.logger.info(f"Resuming reward distribution for {len(season_ids)} season(s)")
+                self._start_reward_distribution(season_ids)
             
-            # Get current entry
+        except Exception as e:
+            self.logger.error(f"Failed to resume reward distribution: {e}")
+    
+    def _start_reward_distribution(self, season_ids: List[str]):
+        """Distribute rewards for ended seasons on a background thread"""
+        def run():
+            for season_id in season_ids:
+                self._distribute_ended_season(season_id)
+        
+        thread = threading.Thread(target=run, name="leaderboard-rewards", daemon=True)
+        self._distribution_threads = [t for t in self._distribution_threads if t.is_alive()]
+        self._distribution_threads.append(thread)
+        thread.start()
+    
+    def wait_for_reward_distribution(self, timeout: Optional[float] = None) -> bool:
+        """Block until background reward distribution finishes; False on timeout"""
+        deadline = None if timeout is None else time.time() + timeout
+        for thread in list(self._distribution_threads):
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            thread.join(remaining)
+        return not any(thread.is_alive() for thread in self._distribution_threads)
+    
+    def _distribute_ended_season(self, season_id: str) -> bool:
+        """Distribute rewards for every leaderboard of an ended season, resuming from its checkpoint"""
+        with self._distribution_lock:
+            if season_id in self._distributing:
+                return False
+            self._distributing.add(season_id)
+        
+        try:
+            cursor = self._pool.connection().cursor()
             cursor.execute('''
-                SELECT score, rank_position FROM leaderboard_entries
-                WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
-            ''', (user_id, leaderboard_type.value, self.current_season.season_id))
+                SELECT reward_checkpoint_type, reward_checkpoint_rank, rewards_distributed
+                FROM seasons WHERE season_id = ?
+            ''', (season_id,))
             
             result = cursor.fetchone()
-            current_score = result[0] if result else 0
-            previous_rank = result[1] if result else 0
+            if not result or result[2]:
+                return False
             
-            new_score = max(0, current_score + score_change)
+            checkpoint_type, checkpoint_rank, _ = result
+            leaderboard_types = [lb_type.value for lb_type in LeaderboardType]
+            start = leaderboard_types.index(checkpoint_type) if checkpoint_type in leaderboard_types else 0
             
-            # Update or insert entry
-            cursor.execute('''
-                INSERT OR REPLACE INTO leaderboard_entries 
-                (user_id, username, leaderboard_type, season_id, score, previous_rank, 
-                 avatar_url, level, last_updated)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, username, leaderboard_type.value, self.current_season.season_id,
-                  new_score, previous_rank, avatar_url, player_level, time.time()))
+            for position, leaderboard_type in enumerate(leaderboard_types[start:]):
+                after_rank = (checkpoint_rank or 0) if position == 0 else 0
+                self._distribute_season_rewards(leaderboard_type, season_id, after_rank)
             
-            conn.commit()
+            with self._pool.transaction() as cursor:
+                cursor.execute('''
+                    UPDATE seasons 
+                    SET rewards_distributed = 1, reward_checkpoint_type = NULL, reward_checkpoint_rank = 0
+                    WHERE season_id = ?
+                ''', (season_id,))
             
-            # Recalculate rankings for this leaderboard
-            self._recalculate_rankings(leaderboard_type.value)
+            self.logger.info(f"Finished reward distribution for {season_id}")
+            return True
+            
+        except Exception as e:
+            # The checkpoint is left in place so the next start resumes from it
+            self.logger.error(f"Failed to distribute rewards for {season_id}: {e}")
+            return False
+        finally:
+            with self._distribution_lock:
+                self._distributing.discard(season_id)
+    
+    def update_player_score(self, user_id: str, username: str, leaderboard_type: LeaderboardType, 
+                           score_change: int, player_level: int = 1, avatar_url: str = ""):
+        """Update a player's score on a specific leaderboard"""
+        try:
+            if not self.current_season:
+                self._create_new_season()
             
-            conn.close()
+            season_id = self.current_season.season_id
+            lb_type = leaderboard_type.value
+            pool = self._board_pool(lb_type, season_id)
+            
+            with self._board_lock(lb_type, season_id):
+                try:
+                    with pool.transaction() as cursor:
+                        seeded = (lb_type, season_id) not in self._rank_indexes
+                        index = self._get_rank_index(cursor, lb_type)
+                        
+                        current_score = index.score_of(user_id)
+                        new_score = max(0, current_score + score_change)
+                        now = time.time()
+                        
+                        # Moving the key in the index gives both ranks in O(log N)
+                        previous_rank = index.remove(user_id)
+                        new_rank = index.insert(user_id, new_score, now)
+                        generation = self._next_rank_generation(lb_type, season_id)
+                        
+                        self._shift_ranks(cursor, lb_type, previous_rank, new_rank, generation)
+                        score_moves = [(current_score if previous_rank else None, new_score)]
+                        self._update_histogram(cursor, lb_type, score_moves)
+                        self._update_board_stats(lb_type, index, score_moves)
+                        
+                        cursor.execute(self._UPSERT_ENTRY_SQL, {
+                            'user_id': user_id, 'username': username,
+                            'leaderboard_type': lb_type, 'season_id': season_id,
+                            'score': new_score, 'rank_position': new_rank,
+                            'previous_rank': previous_rank, 'rank_generation': generation,
+                            'avatar_url': avatar_url, 'level': player_level, 'last_updated': now
+                        })
+                except Exception:
+                    # Index and table may now disagree; reseed on next use
+                    self._drop_board_state(lb_type, season_id)
+                    raise
+                
+                # Seeding may have repaired ranks anywhere on the board
+                touched_rank = 1 if seeded else min(previous_rank or new_rank, new_rank)
+                self._invalidate_after_rerank(lb_type, season_id, touched_rank)
             
             self.logger.info(f"Updated {username} score on {leaderboard_type.value}: +{score_change}")
             
         except Exception as e:
             self.logger.error(f"Failed to update player score: {e}")
     
-    def _recalculate_rankings(self, leaderboard_type: str):
-        """Recalculate all rankings for a specific leaderboard"""
+    def queue_score_update(self, user_id: str, username: str, leaderboard_type: LeaderboardType,
+                           score_change: int, player_level: int = 1, avatar_url: str = ""):
+        """Queue a score update on the write-behind queue without waiting for the database.
+        
+        The update counts towards the season that is current now; if that season has
+        ended by the time the queue flushes, it is dropped. get_player_ranking still
+        reflects the queued change for the player.
+        """
+        if not self.current_season:
+            self._create_new_season()
+        if self.score_queue is None:
+            self.start_score_queue()
+        self.score_queue.submit(user_id, username, leaderboard_type, score_change,
+                                self.current_season.season_id, player_level, avatar_url)
+    
+    def start_score_queue(self, batch_size: int = 500, flush_interval: float = 0.25) -> ScoreWriteQueue:
+        """Start the write-behind score queue (idempotent)"""
+        if self.score_queue is None:
+            self.score_queue = ScoreWriteQueue(self, batch_size, flush_interval)
+        return self.score_queue
+    
+    def update_player_scores_bulk(self, updates: Iterable[Union[ScoreUpdate, Tuple]]) -> Dict[str, Any]:
+        """Apply a burst of score changes in one transaction.
+        
+        Accepts ScoreUpdate objects or (user_id, leaderboard_type, score_change[, username,
+        player_level, avatar_url, season_id]) tuples. Deltas for the same user and
+        leaderboard are summed, and each affected leaderboard is reranked once. Updates
+        earned in a season that has since ended are dropped. Returns batch timing and
+        counts so callers can size their batches.
+        """
+        started = time.perf_counter()
+        result = {
+            'success': False,
+            'updates_received': 0,
+            'updates_dropped': 0,
+            'players_updated': 0,
+            'leaderboards_updated': 0,
+            'rows_reranked': 0,
+            'elapsed_ms': 0.0
+        }
+        
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            if not self.current_season:
+                self._create_new_season()
+            
+            season_id = self.current_season.season_id
             
-            # Get all entries sorted by score
+            # Coalesce deltas per (user, leaderboard)
+            coalesced: Dict[Tuple[str, str], ScoreUpdate] = {}
+            for update in updates:
+                if not isinstance(update, ScoreUpdate):
+                    update = ScoreUpdate(*update)
+                result['updates_received'] += 1
+                
+                if update.season_id not in (None, season_id):
+                    result['updates_dropped'] += 1
+                    continue
+                
+                lb_type = LeaderboardType(update.leaderboard_type).value
+                pending = coalesced.get((update.user_id, lb_type))
+                if pending is None:
+                    coalesced[(update.user_id, lb_type)] = ScoreUpdate(
+                        update.user_id, lb_type, update.score_change,
+                        update.username, update.player_level, update.avatar_url
+                    )
+                else:
+                    pending.merge(update)
+            
+            by_board: Dict[str, List[ScoreUpdate]] = {}
+            for update in coalesced.values():
+                by_board.setdefault(update.leaderboard_type, []).append(update)
+            
+            # One transaction per storage file; a single one unless partitioned
+            by_pool: Dict[int, Tuple[SQLiteConnectionPool, List[str]]] = {}
+            for lb_type in sorted(by_board):
+                pool = self._board_pool(lb_type, season_id)
+                by_pool.setdefault(id(pool), (pool, []))[1].append(lb_type)
+            
+            with ExitStack() as locks:
+                for lb_type in sorted(by_board):
+                    locks.enter_context(self._board_lock(lb_type, season_id))
+                
+                for pool, lb_types in by_pool.values():
+                    try:
+                        touched_ranks = {}
+                        with pool.transaction() as cursor:
+                            for lb_type in lb_types:
+                                rows_written, touched_ranks[lb_type] = self._apply_board_updates(
+                                    cursor, lb_type, by_board[lb_type]
+                                )
+                                result['rows_reranked'] += rows_written
+                    except Exception:
+                        for lb_type in lb_types:
+                            self._drop_board_state(lb_type, season_id)
+                        raise
+                    
+                    for lb_type, touched_rank in touched_ranks.items():
+                        self._invalidate_after_rerank(lb_type, season_id, touched_rank)
+            
+            result['players_updated'] = len(coalesced)
+            result['leaderboards_updated'] = len(by_board)
+            result['success'] = True
+            
+            if result['updates_dropped']:
+                self.logger.warning(f"Dropped {result['updates_dropped']} score updates for ended seasons")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to apply bulk score updates: {e}")
+        
+        result['elapsed_ms'] = (time.perf_counter() - started) * 1000
+        self.logger.info(
+            f"Bulk score update: {result['updates_received']} updates -> "
+            f"{result['players_updated']} players on {result['leaderboards_updated']} leaderboards "
+            f"in {result['elapsed_ms']:.1f}ms"
+        )
+        return result
+    
+    def _apply_board_updates(self, cursor: sqlite3.Cursor, leaderboard_type: str,
+                             updates: List[ScoreUpdate]) -> Tuple[int, int]:
+        """Apply coalesced updates to one leaderboard and rerank it once.
+        
+        Only players ranked between the highest and lowest position any updated
+        player held before or after the batch can move, so just that window is
+        compared and rewritten. Returns the number of rows written and the best
+        rank that changed.
+        """
+        season_id = self.current_season.season_id
+        seeded = (leaderboard_type, season_id) not in self._rank_indexes
+        index = self._get_rank_index(cursor, leaderboard_type)
+        
+        old_size = len(index)
+        old_ranks = {update.user_id: index.rank_of(update.user_id) for update in updates}
+        
+        now = time.time()
+        score_moves = []
+        for update in updates:
+            old_score = index.score_of(update.user_id) if old_ranks[update.user_id] else None
+            new_score = max(0, (old_score or 0) + update.score_change)
+            index.insert(update.user_id, new_score, now)
+            score_moves.append((old_score, new_score))
+        
+        self._update_histogram(cursor, leaderboard_type, score_moves)
+        self._update_board_stats(leaderboard_type, index, score_moves)
+        
+        new_ranks = {user_id: index.rank_of(user_id) for user_id in old_ranks}
+        generation = self._next_rank_generation(leaderboard_type, season_id)
+        
+        positions = [rank for rank in old_ranks.values() if rank] + list(new_ranks.values())
+        low, high = min(positions), max(positions)
+        if not all(old_ranks.values()):
+            # New entries push down everyone below their position
+            high = max(high, old_size)
+        
+        cursor.execute('''
+            SELECT user_id, rank_position FROM leaderboard_entries
+            WHERE leaderboard_type = ? AND season_id = ? AND rank_position BETWEEN ? AND ?
+        ''', (leaderboard_type, season_id, low, high))
+        
+        moved = []
+        for user_id, old_rank in cursor.fetchall():
+            if user_id in old_ranks:
+                continue
+            new_rank = index.rank_of(user_id)
+            if new_rank != old_rank:
+                moved.append((new_rank, old_rank, generation, user_id, leaderboard_type, season_id))
+        
+        cursor.executemany('''
+            UPDATE leaderboard_entries 
+            SET rank_position = ?, previous_rank = ?, rank_generation = ?
+            WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
+        ''', moved)
+        
+        cursor.executemany(self._UPSERT_ENTRY_SQL, [
+            {
+                'user_id': update.user_id, 'username': update.username,
+                'leaderboard_type': leaderboard_type, 'season_id': season_id,
+                'score': index.score_of(update.user_id),
+                'rank_position': new_ranks[update.user_id],
+                'previous_rank': old_ranks[update.user_id],
+                'rank_generation': generation,
+                'avatar_url': update.avatar_url, 'level': update.player_level,
+                'last_updated': now
+            }
+            for update in updates
+        ])
+        
+        return len(moved) + len(updates), 1 if seeded else low
+    
+    def _drop_board_state(self, leaderboard_type: str, season_id: str):
+        """Forget in-memory state for a leaderboard after a failed write"""
+        with self._rank_lock:
+            self._rank_indexes.pop((leaderboard_type, season_id), None)
+            self._histograms.pop((leaderboard_type, season_id), None)
+            self._board_stats.pop((leaderboard_type, season_id), None)
+            self._rank_generations.pop((leaderboard_type, season_id), None)
+        self._invalidate_top_cache(leaderboard_type)
+    
+    def _update_histogram(self, cursor: sqlite3.Cursor, leaderboard_type: str,
+                          moves: List[Tuple[Optional[int], int]]):
+        """Move players between histogram buckets in memory and in score_histograms"""
+        season_id = self.current_season.season_id
+        deltas = ScoreHistogram.deltas_for(moves)
+        if not deltas:
+            return
+        
+        cursor.executemany('''
+            INSERT INTO score_histograms (leaderboard_type, season_id, bucket, player_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(leaderboard_type, season_id, bucket) DO UPDATE SET
+                player_count = player_count + excluded.player_count
+        ''', [(leaderboard_type, season_id, bucket, delta) for bucket, delta in deltas.items()])
+        
+        histogram = self._histograms.get((leaderboard_type, season_id))
+        if histogram is not None:
+            histogram.apply(deltas)
+    
+    def _update_board_stats(self, leaderboard_type: str, index: RankIndex,
+                            moves: List[Tuple[Optional[int], int]]):
+        """Fold score moves into a leaderboard's running aggregates (if loaded)"""
+        board_stats = self._board_stats.get((leaderboard_type, self.current_season.season_id))
+        if board_stats is None:
+            return
+        
+        for old_score, new_score in moves:
+            if old_score is None:
+                board_stats.players += 1
+            board_stats.score_total += new_score - (old_score or 0)
+        board_stats.top_score = index.top_score()
+    
+    def _get_board_stats(self, leaderboard_type: str) -> BoardStats:
+        """Return a leaderboard's running aggregates, counting them once if needed"""
+        season_id = self.current_season.season_id
+        key = (leaderboard_type, season_id)
+        
+        with self._board_lock(leaderboard_type, season_id):
+            board_stats = self._board_stats.get(key)
+            if board_stats is None:
+                board_stats = self._count_board_stats(leaderboard_type, season_id)
+                self._board_stats[key] = board_stats
+            return board_stats
+    
+    def _count_board_stats(self, leaderboard_type: str, season_id: str) -> BoardStats:
+        cursor = self._board_pool(leaderboard_type, season_id).connection().cursor()
+        cursor.execute('''
+            SELECT COUNT(*), COALESCE(SUM(score), 0), COALESCE(MAX(score), 0)
+            FROM leaderboard_entries
+            WHERE leaderboard_type = ? AND season_id = ?
+        ''', (leaderboard_type, season_id))
+        return BoardStats(*cursor.fetchone())
+    
+    def _count_counters(self) -> Dict[str, int]:
+        """Recount the main-database aggregates from their tables"""
+        cursor = self._pool.connection().cursor()
+        cursor.execute('''
+            SELECT COALESCE(SUM(claimed = 1), 0), COALESCE(SUM(claimed = 0), 0)
+            FROM leaderboard_rewards
+        ''')
+        claimed, pending = cursor.fetchone()
+        cursor.execute('SELECT COUNT(*) FROM seasons')
+        seasons = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(archived > 0), 0) FROM leaderboard_partitions')
+        partitions, archived = cursor.fetchone()
+        
+        return {
+            'rewards_claimed': claimed,
+            'rewards_pending': pending,
+            'total_seasons': seasons,
+            'partitions': partitions,
+            'archived_partitions': archived
+        }
+    
+    def _bump_counters(self, **deltas: int):
+        """Adjust the main-database aggregates; callers hold _stats_lock"""
+        if self._counters is None:
+            return
+        for name, delta in deltas.items():
+            self._counters[name] += delta
+    
+    def _get_histogram(self, leaderboard_type: str) -> ScoreHistogram:
+        """Return the score histogram for a leaderboard, loading it from score_histograms"""
+        season_id = self.current_season.season_id
+        key = (leaderboard_type, season_id)
+        
+        with self._board_lock(leaderboard_type, season_id):
+            histogram = self._histograms.get(key)
+            if histogram is not None:
+                return histogram
+            
+            cursor = self._board_pool(leaderboard_type, season_id).connection().cursor()
             cursor.execute('''
-                SELECT user_id, score, rank_position FROM leaderboard_entries
-                WHERE leaderboard_type = ? AND season_id = ?
-                ORDER BY score DESC, last_updated ASC
-            ''', (leaderboard_type, self.current_season.season_id))
+                SELECT bucket, player_count FROM score_histograms
+                WHERE leaderboard_type = ? AND season_id = ? AND player_count > 0
+            ''', key)
+            rows = cursor.fetchall()
+            
+            if rows:
+                histogram = ScoreHistogram(dict(rows))
+                self._histograms[key] = histogram
+                return histogram
+            
+            # Nothing stored yet (new board or pre-histogram data): one rebuild fills it
+            self._recalculate_rankings(leaderboard_type)
+            return self._histograms.get(key, ScoreHistogram())
+    
+    def get_player_percentile(self, user_id: str, leaderboard_type: LeaderboardType) -> Optional[float]:
+        """Estimate how far up a leaderboard a player is, as a "top X%" figure.
+        
+        Reads the player's own row and the score histogram only; the estimate is
+        exact for scores below 16 and within one histogram bucket above that.
+        """
+        try:
+            if not self.current_season:
+                return None
             
-            entries = cursor.fetchall()
+            cursor = self._board_pool(leaderboard_type.value).connection().cursor()
+            cursor.execute('''
+                SELECT score FROM leaderboard_entries
+                WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
+            ''', (user_id, leaderboard_type.value, self.current_season.season_id))
             
-            # Update rankings
-            for rank, (user_id, score, old_rank) in enumerate(entries, 1):
-                cursor.execute('''
-                    UPDATE leaderboard_entries 
-                    SET rank_position = ?, previous_rank = ?
-                    WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
-                ''', (rank, old_rank, user_id, leaderboard_type, self.current_season.season_id))
+            result = cursor.fetchone()
+            if not result:
+                return None
+            
+            histogram = self._get_histogram(leaderboard_type.value)
+            if histogram.total <= 0:
+                return None
             
-            conn.commit()
-            conn.close()
+            top_percent = (histogram.count_above(result[0]) + 1) / histogram.total * 100
+            return round(min(100.0, top_percent), 2)
             
         except Exception as e:
-            self.logger.error(f"Failed to recalculate rankings: {e}")
+            self.logger.error(f"Failed to get player percentile: {e}")
+            return None
+    
+    def get_tier_cutoffs(self, leaderboard_type: LeaderboardType) -> Dict[str, int]:
+        """Estimate the minimum score currently needed for each reward tier.
+        
+        Tiers deeper than the number of players on the board have a cutoff of 0.
+        """
+        try:
+            if not self.current_season:
+                return {}
+            
+            histogram = self._get_histogram(leaderboard_type.value)
+            return {
+                tier.value: histogram.score_at_rank(rank_limit)
+                for tier, rank_limit in self._TIER_RANK_LIMITS
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get tier cutoffs: {e}")
+            return {}
+    
+    def _get_rank_index(self, cursor: sqlite3.Cursor, leaderboard_type: str) -> RankIndex:
+        """Return the rank index for a leaderboard, seeding it from the database if needed"""
+        key = (leaderboard_type, self.current_season.season_id)
+        index = self._rank_indexes.get(key)
+        if index is None:
+            index = self._recalculate_rankings(leaderboard_type, cursor)
+        return index
+    
+    def _shift_ranks(self, cursor: sqlite3.Cursor, leaderboard_type: str, old_rank: int,
+                     new_rank: int, generation: int):
+        """Shift the rows between a player's old and new rank by one position.
+        
+        This is one range UPDATE over every row between the two ranks, so a new
+        entry or a large jump near the top rewrites up to the whole board.
+        """
+        season_id = self.current_season.season_id
+        
+        if old_rank == new_rank:
+            return
+        
+        if old_rank == 0:
+            # New entry pushes everyone from new_rank downwards
+            cursor.execute('''
+                UPDATE leaderboard_entries
+                SET previous_rank = rank_position, rank_position = rank_position + 1,
+                    rank_generation = ?
+                WHERE leaderboard_type = ? AND season_id = ? AND rank_position >= ?
+            ''', (generation, leaderboard_type, season_id, new_rank))
+        elif new_rank < old_rank:
+            # Player moved up; the players they passed drop one place
+            cursor.execute('''
+                UPDATE leaderboard_entries
+                SET previous_rank = rank_position, rank_position = rank_position + 1,
+                    rank_generation = ?
+                WHERE leaderboard_type = ? AND season_id = ?
+                  AND rank_position >= ? AND rank_position < ?
+            ''', (generation, leaderboard_type, season_id, new_rank, old_rank))
+        else:
+            # Player moved down; the players who passed them rise one place
+            cursor.execute('''
+                UPDATE leaderboard_entries
+                SET previous_rank = rank_position, rank_position = rank_position - 1,
+                    rank_generation = ?
+                WHERE leaderboard_type = ? AND season_id = ?
+                  AND rank_position > ? AND rank_position <= ?
+            ''', (generation, leaderboard_type, season_id, old_rank, new_rank))
+    
+    def _next_rank_generation(self, leaderboard_type: str, season_id: str) -> int:
+        """Start a new rerank of a seeded leaderboard and return its generation"""
+        with self._rank_lock:
+            generation = self._rank_generations[(leaderboard_type, season_id)] + 1
+            self._rank_generations[(leaderboard_type, season_id)] = generation
+        return generation
+    
+    def _recalculate_rankings(self, leaderboard_type: str, cursor: Optional[sqlite3.Cursor] = None) -> RankIndex:
+        """Rebuild the rank index for a leaderboard from the database.
+        
+        Only rows whose stored rank disagrees with the rebuilt order are written.
+        Without a cursor the rebuild runs in its own transaction.
+        """
+        if cursor is None:
+            try:
+                pool = self._board_pool(leaderboard_type)
+                with self._board_lock(leaderboard_type, self.current_season.season_id), \
+                        pool.transaction() as own_cursor:
+                    index = self._recalculate_rankings(leaderboard_type, own_cursor)
+                self._invalidate_after_rerank(leaderboard_type, self.current_season.season_id, 1)
+                return index
+            except Exception as e:
+                self.logger.error(f"Failed to recalculate rankings: {e}")
+                return RankIndex()
+        
+        season_id = self.current_season.season_id
+        
+        # Get all entries sorted by score
+        cursor.execute('''
+            SELECT user_id, score, last_updated, rank_position FROM leaderboard_entries
+            WHERE leaderboard_type = ? AND season_id = ?
+            ORDER BY score DESC, last_updated ASC, user_id ASC
+        ''', (leaderboard_type, season_id))
+        
+        entries = cursor.fetchall()
+        index = RankIndex()
+        index.load([(user_id, score, updated) for user_id, score, updated, _ in entries])
+        
+        cursor.execute('''
+            SELECT MAX(rank_generation) FROM leaderboard_entries
+            WHERE leaderboard_type = ? AND season_id = ?
+        ''', (leaderboard_type, season_id))
+        generation = cursor.fetchone()[0] or 0
+        
+        # Update rankings that are out of place, as a rerank of their own
+        moved = [
+            (rank, old_rank, generation + 1, user_id, leaderboard_type, season_id)
+            for rank, (user_id, _, _, old_rank) in enumerate(entries, 1)
+            if rank != old_rank
+        ]
+        if moved:
+            generation += 1
+        cursor.executemany('''
+            UPDATE leaderboard_entries 
+            SET rank_position = ?, previous_rank = ?, rank_generation = ?
+            WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
+        ''', moved)
+        
+        # Rebuild the histogram from the same scan
+        histogram = ScoreHistogram()
+        histogram.apply(ScoreHistogram.deltas_for((None, score) for _, score, _, _ in entries))
+        cursor.execute('''
+            DELETE FROM score_histograms WHERE leaderboard_type = ? AND season_id = ?
+        ''', (leaderboard_type, season_id))
+        cursor.executemany('''
+            INSERT INTO score_histograms (leaderboard_type, season_id, bucket, player_count)
+            VALUES (?, ?, ?, ?)
+        ''', [(leaderboard_type, season_id, bucket, count) for bucket, count in histogram.counts.items()])
+        
+        board_stats = BoardStats(
+            players=len(entries),
+            score_total=sum(score for _, score, _, _ in entries),
+            top_score=entries[0][1] if entries else 0
+        )
+        
+        with self._rank_lock:
+            self._rank_indexes[(leaderboard_type, season_id)] = index
+            self._histograms[(leaderboard_type, season_id)] = histogram
+            self._board_stats[(leaderboard_type, season_id)] = board_stats
+            self._rank_generations[(leaderboard_type, season_id)] = generation
+        
+        return index
+    
+    def _entry_from_row(self, row: Tuple) -> LeaderboardEntry:
+        """Build a LeaderboardEntry from a row selected with _ENTRY_COLUMNS"""
+        user_id, username, rank, score, prev_rank, avatar, level, title, updated = row
+        
+        # Calculate rank change
+        change = prev_rank - rank if prev_rank > 0 else 0
+        
+        return LeaderboardEntry(
+            user_id=user_id,
+            username=username,
+            rank=rank,
+            score=score,
+            previous_rank=prev_rank,
+            change=change,
+            avatar_url=avatar,
+            level=level,
+            title=title,
+            last_updated=updated
+        )
+    
+    def _invalidate_top_cache(self, leaderboard_type: Optional[str] = None, from_rank: int = 1):
+        """Drop cached top-N pages that include any rank at or below from_rank.
+        
+        Called after a write commits. A rank of 0 (no position) never touches the cache;
+        with no leaderboard type every cached page is dropped.
+        """
+        with self._cache_lock:
+            for key in list(self._top_cache):
+                if leaderboard_type is not None and key[0] != leaderboard_type:
+                    continue
+                cached_limit = self._top_cache[key][0]
+                if leaderboard_type is None or 0 < from_rank <= cached_limit:
+                    del self._top_cache[key]
+                    self._cache_generation[key] = self._cache_generation.get(key, 0) + 1
+    
+    def _invalidate_after_rerank(self, leaderboard_type: str, season_id: str, from_rank: int):
+        """Drop cached pages after a rerank that moved ranks from from_rank down.
+        
+        Rows the previous rerank moved read as unmoved once this one commits, so
+        pages covering either range are dropped.
+        """
+        key = (leaderboard_type, season_id)
+        with self._cache_lock:
+            previous = self._rerank_from.get(key, 1)
+            self._rerank_from[key] = from_rank
+        self._invalidate_top_cache(leaderboard_type, min(previous, from_rank))
     
     def get_leaderboard(self, leaderboard_type: LeaderboardType, limit: int = 100) -> List[LeaderboardEntry]:
-        """Get leaderboard entries for a specific type"""
+        """Get leaderboard entries for a specific type.
+        
+        Pages of up to top_cache_size entries are served from a per-season cache that
+        writes invalidate only when they change a rank inside the cached page. Cached
+        entries are shared between callers and should be treated as read-only.
+        """
         try:
             if not self.current_season:
                 return []
             
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            key = (leaderboard_type.value, self.current_season.season_id)
             
-            cursor.execute('''
-                SELECT user_id, username, rank_position, score, previous_rank, 
-                       avatar_url, level, title, last_updated
+            with self._cache_lock:
+                cached = self._top_cache.get(key)
+                generation = self._cache_generation.get(key, 0)
+            if cached and limit <= cached[0]:
+                return cached[1][:limit]
+            
+            fetch_limit = max(limit, self.top_cache_size)
+            cursor = self._board_pool(key[0], key[1]).connection().cursor()
+            
+            cursor.execute(f'''
+                SELECT {self._ENTRY_COLUMNS}
                 FROM leaderboard_entries
                 WHERE leaderboard_type = ? AND season_id = ?
                 ORDER BY rank_position ASC
                 LIMIT ?
-            ''', (leaderboard_type.value, self.current_season.season_id, limit))
+            ''', key + (fetch_limit,))
             
-            entries = []
-            for row in cursor.fetchall():
-                user_id, username, rank, score, prev_rank, avatar, level, title, updated = row
-                
-                # Calculate rank change
-                change = prev_rank - rank if prev_rank > 0 else 0
-                
-                entry = LeaderboardEntry(
-                    user_id=user_id,
-                    username=username,
-                    rank=rank,
-                    score=score,
-                    previous_rank=prev_rank,
-                    change=change,
-                    avatar_url=avatar,
-                    level=level,
-                    title=title,
-                    last_updated=updated
-                )
-                entries.append(entry)
+            entries = [self._entry_from_row(row) for row in cursor.fetchall()]
             
-            conn.close()
-            return entries
+            with self._cache_lock:
+                # A write committed while we were reading; don't cache a stale page
+                if self._cache_generation.get(key, 0) == generation:
+                    self._top_cache[key] = (fetch_limit, entries)
+            
+            return entries[:limit]
             
         except Exception as e:
             self.logger.error(f"Failed to get leaderboard: {e}")
             return []
     
+    def get_leaderboard_neighborhood(self, user_id: str, leaderboard_type: LeaderboardType,
+                                     radius: int = 5) -> List[LeaderboardEntry]:
+        """Get the players ranked up to `radius` places above and below a player.
+        
+        Uses the rank index range, so the cost depends on the radius rather than on
+        the size of the leaderboard. Returns an empty list for unranked players.
+        """
+        try:
+            if not self.current_season:
+                return []
+            
+            season_id = self.current_season.season_id
+            cursor = self._board_pool(leaderboard_type.value, season_id).connection().cursor()
+            
+            cursor.execute('''
+                SELECT rank_position FROM leaderboard_entries
+                WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
+            ''', (user_id, leaderboard_type.value, season_id))
+            
+            result = cursor.fetchone()
+            if not result or result[0] <= 0:
+                return []
+            
+            rank = result[0]
+            cursor.execute(f'''
+                SELECT {self._ENTRY_COLUMNS}
+                FROM leaderboard_entries
+                WHERE leaderboard_type = ? AND season_id = ? AND rank_position BETWEEN ? AND ?
+                ORDER BY rank_position ASC
+            ''', (leaderboard_type.value, season_id, max(1, rank - radius), rank + radius))
+            
+            return [self._entry_from_row(row) for row in cursor.fetchall()]
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get leaderboard neighborhood: {e}")
+            return []
+    
     def get_player_ranking(self, user_id: str, leaderboard_type: LeaderboardType) -> Optional[LeaderboardEntry]:
-        """Get a specific player's ranking on a leaderboard"""
+        """Get a specific player's ranking on a leaderboard.
+        
+        Score changes still waiting on the write-behind queue are included in the
+        score; the rank is the last committed one.
+        """
+        if self.score_queue is not None and self.current_season:
+            return self.score_queue.read_your_writes(
+                user_id, leaderboard_type.value, self.current_season.season_id,
+                lambda: self._fetch_player_ranking(user_id, leaderboard_type)
+            )
+        return self._fetch_player_ranking(user_id, leaderboard_type)
+    
+    def _fetch_player_ranking(self, user_id: str, leaderboard_type: LeaderboardType) -> Optional[LeaderboardEntry]:
+        """Read a player's committed ranking from the database"""
         try:
             if not self.current_season:
                 return None
             
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cursor = self._board_pool(leaderboard_type.value).connection().cursor()
             
-            cursor.execute('''
-                SELECT user_id, username, rank_position, score, previous_rank, 
-                       avatar_url, level, title, last_updated
+            cursor.execute(f'''
+                SELECT {self._ENTRY_COLUMNS}
                 FROM leaderboard_entries
                 WHERE user_id = ? AND leaderboard_type = ? AND season_id = ?
             ''', (user_id, leaderboard_type.value, self.current_season.season_id))
             
             result = cursor.fetchone()
-            conn.close()
             
             if result:
-                user_id, username, rank, score, prev_rank, avatar, level, title, updated = result
-                change = prev_rank - rank if prev_rank > 0 else 0
-                
-                return LeaderboardEntry(
-                    user_id=user_id,
-                    username=username,
-                    rank=rank,
-                    score=score,
-                    previous_rank=prev_rank,
-                    change=change,
-                    avatar_url=avatar,
-                    level=level,
-                    title=title,
-                    last_updated=updated
-                )
+                return self._entry_from_row(result)
             
             return None
             
@@ -453,18 +2040,10 @@ class LeaderboardManager:
     
     def _get_reward_tier(self, rank: int) -> RewardTier:
         """Determine reward tier based on ranking"""
-        if rank == 1:
-            return RewardTier.LEGENDARY
-        elif rank <= 5:
-            return RewardTier.DIAMOND
-        elif rank <= 20:
-            return RewardTier.PLATINUM
-        elif rank <= 50:
-            return RewardTier.GOLD
-        elif rank <= 100:
-            return RewardTier.SILVER
-        else:
-            return None
+        for tier, rank_limit in self._TIER_RANK_LIMITS:
+            if rank <= rank_limit:
+                return tier
+        return None
     
     def _calculate_rewards(self, tier: RewardTier, rank: int) -> List[LeaderboardReward]:
         """Calculate rewards for a specific tier and rank"""
@@ -533,51 +2112,82 @@ class LeaderboardManager:
         
         return rewards
     
-    def _distribute_season_rewards(self, leaderboard_type: str):
-        """Distribute rewards for top 100 players in a leaderboard"""
-        try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Get top 100 players
+    def _distribute_season_rewards(self, leaderboard_type: str, season_id: Optional[str] = None,
+                                   after_rank: int = 0) -> int:
+        """Distribute rewards for top 100 players in a leaderboard.
+        
+        Ranked entries are read in keyset pages of reward_batch_size. Each page
+        is inserted in its own short transaction together with the season's
+        checkpoint, so a crash resumes after the last stored page and live writers
+        never wait on the whole distribution. Returns the number of players paged.
+        """
+        season_id = season_id or self.current_season.season_id
+        max_rank = self._TIER_RANK_LIMITS[-1][1]
+        cursor = self._board_pool(leaderboard_type, season_id).connection().cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM leaderboard_entries
+            WHERE leaderboard_type = ? AND season_id = ? AND rank_position BETWEEN 1 AND ?
+        ''', (leaderboard_type, season_id, max_rank))
+        total = cursor.fetchone()[0]
+        distributed = min(after_rank, total)
+        
+        while True:
             cursor.execute('''
-                SELECT user_id, username, rank_position, score
+                SELECT user_id, username, rank_position
                 FROM leaderboard_entries
-                WHERE leaderboard_type = ? AND season_id = ? AND rank_position <= 100
+                WHERE leaderboard_type = ? AND season_id = ?
+                  AND rank_position > ? AND rank_position <= ?
                 ORDER BY rank_position ASC
-            ''', (leaderboard_type, self.current_season.season_id))
+                LIMIT ?
+            ''', (leaderboard_type, season_id, after_rank, max_rank, self.reward_batch_size))
             
-            top_players = cursor.fetchall()
+            page = cursor.fetchall()
+            if not page:
+                break
             
-            for user_id, username, rank, score in top_players:
+            rows = []
+            for user_id, username, rank in page:
                 tier = self._get_reward_tier(rank)
                 if not tier:
                     continue
                 
                 rewards = self._calculate_rewards(tier, rank)
                 rewards_json = json.dumps([asdict(reward) for reward in rewards])
-                
-                # Store rewards
-                cursor.execute('''
-                    INSERT INTO leaderboard_rewards 
-                    (user_id, season_id, leaderboard_type, rank_achieved, tier, rewards)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (user_id, self.current_season.season_id, leaderboard_type, 
-                      rank, tier.value, rewards_json))
-                
-                self.logger.info(f"Distributed {tier.value} rewards to {username} (rank {rank})")
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            self.logger.error(f"Failed to distribute season rewards: {e}")
+                rows.append((user_id, season_id, leaderboard_type, rank, tier.value, rewards_json))
+            
+            after_rank = page[-1][2]
+            
+            # Store rewards and advance the checkpoint atomically
+            with self._stats_lock:
+                with self._pool.transaction() as write_cursor:
+                    write_cursor.executemany('''
+                        INSERT INTO leaderboard_rewards 
+                        (user_id, season_id, leaderboard_type, rank_achieved, tier, rewards)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', rows)
+                    write_cursor.execute('''
+                        UPDATE seasons SET reward_checkpoint_type = ?, reward_checkpoint_rank = ?
+                        WHERE season_id = ?
+                    ''', (leaderboard_type, after_rank, season_id))
+                self._bump_counters(rewards_pending=len(rows))
+            
+            distributed += len(page)
+            self.logger.info(
+                f"Distributed {leaderboard_type} rewards for {season_id}: {distributed}/{total}"
+            )
+            if self.reward_progress_callback:
+                try:
+                    self.reward_progress_callback(season_id, leaderboard_type, distributed, total)
+                except Exception as e:
+                    self.logger.warning(f"Reward progress callback failed: {e}")
+        
+        return distributed
     
     def get_player_rewards(self, user_id: str, claimed: Optional[bool] = None) -> List[Dict]:
         """Get rewards for a specific player"""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
+            cursor = self._pool.connection().cursor()
             
             query = '''
                 SELECT id, season_id, leaderboard_type, rank_achieved, tier, rewards, 
@@ -611,7 +2221,6 @@ class LeaderboardManager:
                     'created_at': created_at
                 })
             
-            conn.close()
             return rewards_list
             
         except Exception as e:
@@ -621,29 +2230,28 @@ class LeaderboardManager:
     def claim_rewards(self, user_id: str, reward_id: int) -> bool:
         """Claim rewards for a player"""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
-            # Check if rewards exist and are unclaimed
-            cursor.execute('''
-                SELECT rewards, claimed FROM leaderboard_rewards
-                WHERE id = ? AND user_id = ?
-            ''', (reward_id, user_id))
-            
-            result = cursor.fetchone()
-            if not result or result[1]:  # Doesn't exist or already claimed
-                conn.close()
-                return False
-            
-            # Mark as claimed
-            cursor.execute('''
-                UPDATE leaderboard_rewards 
-                SET claimed = 1, claim_date = ?
-                WHERE id = ? AND user_id = ?
-            ''', (time.time(), reward_id, user_id))
-            
-            conn.commit()
-            conn.close()
+            with self._stats_lock:
+                with self._pool.transaction() as cursor:
+                    # Check if rewards exist and are unclaimed
+                    cursor.execute('''
+                        SELECT rewards, claimed FROM leaderboard_rewards
+                        WHERE id = ? AND user_id = ?
+                    ''', (reward_id, user_id))
+                    
+                    result = cursor.fetchone()
+                    if not result or result[1]:  # Doesn't exist or already claimed
+                        return False
+                    
+                    # Mark as claimed; the claimed guard stops a concurrent double claim
+                    cursor.execute('''
+                        UPDATE leaderboard_rewards 
+                        SET claimed = 1, claim_date = ?
+                        WHERE id = ? AND user_id = ? AND claimed = 0
+                    ''', (time.time(), reward_id, user_id))
+                    
+                    if cursor.rowcount != 1:
+                        return False
+                self._bump_counters(rewards_claimed=1, rewards_pending=-1)
             
             # TODO: Apply rewards to player inventory/stats
             rewards = json.loads(result[0])
@@ -662,6 +2270,18 @@ class LeaderboardManager:
         for reward in rewards:
             self.logger.info(f"Applied reward to {user_id}: {reward}")
     
+    def close(self):
+        """Drain queued scores, wait for reward distribution and release pooled connections"""
+        self.stop_stats_reconciliation()
+        if self.score_queue is not None:
+            self.score_queue.close()
+        self.wait_for_reward_distribution()
+        with self._partition_lock:
+            board_pools, self._board_pools = list(self._board_pools.values()), {}
+        for pool in board_pools:
+            pool.close_all()
+        self._pool.close_all()
+    
     def get_season_info(self) -> Optional[SeasonInfo]:
         """Get current season information"""
         return self.current_season
@@ -670,7 +2290,7 @@ class LeaderboardManager:
         """Force end current season (admin function)"""
         try:
             if self.current_season:
-                self._end_season()
+                self._end_season(background=False)
                 return True
             return False
         except Exception as e:
@@ -678,40 +2298,96 @@ class LeaderboardManager:
             return False
     
     def get_leaderboard_stats(self) -> Dict[str, Any]:
-        """Get overall leaderboard statistics"""
+        """Get overall leaderboard statistics from the running aggregates"""
         try:
-            conn = sqlite3.connect(self.database_path)
-            cursor = conn.cursor()
-            
             stats = {}
             
-            # Get player counts per leaderboard
+            # Per-leaderboard aggregates for the current season
+            total_players = 0
             for lb_type in LeaderboardType:
-                cursor.execute('''
-                    SELECT COUNT(*) FROM leaderboard_entries
-                    WHERE leaderboard_type = ? AND season_id = ?
-                ''', (lb_type.value, self.current_season.season_id if self.current_season else ""))
-                
-                count = cursor.fetchone()[0]
-                stats[f"{lb_type.value}_players"] = count
+                board_stats = self._get_board_stats(lb_type.value) if self.current_season else BoardStats()
+                stats[f"{lb_type.value}_players"] = board_stats.players
+                stats[f"{lb_type.value}_score_total"] = board_stats.score_total
+                stats[f"{lb_type.value}_top_score"] = board_stats.top_score
+                total_players += board_stats.players
+            stats['total_players'] = total_players
+            
+            # Rewards claimed versus pending, seasons and partitions
+            with self._stats_lock:
+                if self._counters is None:
+                    self._counters = self._count_counters()
+                counters = dict(self._counters)
+            if self.partition_mode == PartitionMode.NONE:
+                del counters['partitions'], counters['archived_partitions']
+            stats.update(counters)
             
-            # Get total rewards distributed
-            cursor.execute('SELECT COUNT(*) FROM leaderboard_rewards WHERE claimed = 1')
-            stats['rewards_claimed'] = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM leaderboard_rewards WHERE claimed = 0')
-            stats['rewards_pending'] = cursor.fetchone()[0]
-            
-            # Get season count
-            cursor.execute('SELECT COUNT(*) FROM seasons')
-            stats['total_seasons'] = cursor.fetchone()[0]
-            
-            conn.close()
             return stats
             
         except Exception as e:
             self.logger.error(f"Failed to get leaderboard stats: {e}")
             return {}
+    
+    def reconcile_stats(self, repair: bool = True) -> Dict[str, Any]:
+        """Recount every aggregate from the tables and compare with the running values.
+        
+        Returns the drifted values as name -> (cached, actual); with repair the
+        recounted values replace the cached ones.
+        """
+        drift = {}
+        try:
+            if self.current_season:
+                season_id = self.current_season.season_id
+                for lb_type in LeaderboardType:
+                    key = (lb_type.value, season_id)
+                    with self._board_lock(lb_type.value, season_id):
+                        cached = self._board_stats.get(key)
+                        if cached is None:
+                            continue
+                        actual = self._count_board_stats(lb_type.value, season_id)
+                        if cached != actual:
+                            drift[lb_type.value] = (asdict(cached), asdict(actual))
+                            if repair:
+                                self._board_stats[key] = actual
+            
+            with self._stats_lock:
+                if self._counters is not None:
+                    actual = self._count_counters()
+                    for name, value in actual.items():
+                        if self._counters[name] != value:
+                            drift[name] = (self._counters[name], value)
+                    if repair:
+                        self._counters = actual
+            
+            if drift:
+                self.logger.warning(f"Leaderboard stats drifted from the tables: {drift}")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to reconcile leaderboard stats: {e}")
+        
+        return drift
+    
+    def start_stats_reconciliation(self, interval: float = 600.0):
+        """Run reconcile_stats every interval seconds on a daemon thread (idempotent)"""
+        if self._reconcile_thread is not None and self._reconcile_thread.is_alive():
+            return
+        
+        self._reconcile_stop.clear()
+        
+        def run():
+            while not self._reconcile_stop.wait(interval):
+                self.reconcile_stats()
+        
+        self._reconcile_thread = threading.Thread(
+            target=run, name="leaderboard-stats-reconcile", daemon=True
+        )
+        self._reconcile_thread.start()
+    
+    def stop_stats_reconciliation(self):
+        """Stop the background reconciliation job if it is running"""
+        self._reconcile_stop.set()
+        if self._reconcile_thread is not None:
+            self._reconcile_thread.join()
+            self._reconcile_thread = None
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -723,6 +2399,12 @@ if __name__ == "__main__":
     lb_manager.update_player_score("player2", "TestPlayer2", LeaderboardType.POWER_LEVEL, 150, 12)
     lb_manager.update_player_score("player3", "TestPlayer3", LeaderboardType.POWER_LEVEL, 120, 18)
     
+    # Example: Queue a score update without waiting for the database
+    lb_manager.queue_score_update("player3", "TestPlayer3", LeaderboardType.POWER_LEVEL, 50, 18)
+    queued_rank = lb_manager.get_player_ranking("player3", LeaderboardType.POWER_LEVEL)
+    print(f"Player3 score with queued update: {queued_rank.score}")
+    lb_manager.score_queue.flush()
+    
     # Get leaderboard
     leaderboard = lb_manager.get_leaderboard(LeaderboardType.POWER_LEVEL, 10)
     for entry in leaderboard:
@@ -741,4 +2423,6 @@ if __name__ == "__main__":
     
     # Get stats
     stats = lb_manager.get_leaderboard_stats()
-    print(f"\nLeaderboard stats: {stats}")
\ No newline at end of file
+    print(f"\nLeaderboard stats: {stats}")
+    
+    lb_manager.close()
\ No newline at end of file
@@ -0,0 +1,294 @@
+"""
+Kingdom of Aldoria - Player State
+Typed, slot-based sections of the player save that convert losslessly to and
+from the JSON layout used by SaveManager
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Type
+
+from ..core.config import Config
+
+class StateSection(MutableMapping):
+    """Slot-backed save section that still behaves like its JSON dict
+    
+    Known keys live in slots and are read as plain attributes; any other key is
+    kept in `extra`, so converting back to the JSON layout loses nothing. Keys
+    absent from the source dict stay unset: they are left out of to_dict() and
+    read as their FIELDS default (mutable defaults are stored on first read so
+    changes to them stick).
+    """
+    
+    __slots__ = ('extra',)
+    
+    # Field name -> default value (types and classes are called for a fresh value)
+    FIELDS: Dict[str, Any] = {}
+    # Attribute names for fields whose JSON key clashes with a Mapping method
+    RENAMED: Dict[str, str] = {}
+    # Fields that hold a nested section, converted from plain dicts on assignment
+    TYPES: Dict[str, Type["StateSection"]] = {}
+    # Section type for every key in extra (mapping-style sections)
+    EXTRA_TYPE: Optional[Type["StateSection"]] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRS = {key: cls.RENAMED.get(key, key) for key in cls.FIELDS}
+        cls._DEFAULTS = {cls._ATTRS[key]: default for key, default in cls.FIELDS.items()}
+    
+    def __init__(self, **values: Any):
+        self.extra: Dict[str, Any] = {}
+        for key, value in values.items():
+            self[key] = value
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StateSection":
+        """Build a section from its JSON layout (nested containers are shared)"""
+        if isinstance(data, cls):
+            return data
+        section = cls()
+        for key, value in data.items():
+            section[key] = value
+        return section
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to the JSON layout (nested containers are shared)"""
+        data = {}
+        for key in self:
+            value = self[key]
+            data[key] = value.to_dict() if isinstance(value, StateSection) else value
+        return data
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for unset slots (keys missing from the save)
+        defaults = type(self)._DEFAULTS
+        if name not in defaults:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
+        default = defaults[name]
+        if not callable(default):
+            return default
+        value = default()
+        object.__setattr__(self, name, value)
+        return value
+    
+    def __getitem__(self, key: str) -> Any:
+        attr = self._ATTRS.get(key)
+        if attr is None:
+            return self.extra[key]
+        try:
+            return object.__getattribute__(self, attr)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key: str, value: Any):
+        attr = self._ATTRS.get(key)
+        nested = self.EXTRA_TYPE if attr is None else self.TYPES.get(key)
+        if nested is not None and isinstance(value, dict):
+            value = nested.from_dict(value)
+        if attr is None:
+            self.extra[key] = value
+        else:
+            object.__setattr__(self, attr, value)
+    
+    def __delitem__(self, key: str):
+        attr = self._ATTRS.get(key)
+        if attr is None:
+            del self.extra[key]
+            return
+        try:
+            object.__delattr__(self, attr)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __iter__(self) -> Iterator[str]:
+        for key, attr in self._ATTRS.items():
+            try:
+                object.__getattribute__(self, attr)
+            except AttributeError:
+                continue
+            yield key
+        yield from self.extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+    
+    def __reduce__(self):
+        # Copies and pickles hold only the keys that are set, never the defaults
+        return (type(self).from_dict, (self.to_dict(),))
+
+StateSection._ATTRS = {}
+StateSection._DEFAULTS = {}
+
+class ProgressState(StateSection):
+    """World and stage progress"""
+    __slots__ = ('current_world', 'current_stage', 'worlds_unlocked', 'stages_completed', 'bosses_defeated')
+    FIELDS = {
+        "current_world": 0,
+        "current_stage": 1,
+        "worlds_unlocked": 1,
+        "stages_completed": 0,
+        "bosses_defeated": 0
+    }
+    
+    current_world: int
+    current_stage: int
+    worlds_unlocked: int
+    stages_completed: int
+    bosses_defeated: int
+
+class StaminaState(StateSection):
+    """Stamina pool and recharge clock"""
+    __slots__ = ('current', 'max', 'last_recharge')
+    FIELDS = {
+        "current": Config.MAX_STAMINA_DEFAULT,
+        "max": Config.MAX_STAMINA_DEFAULT,
+        "last_recharge": 0.0
+    }
+    
+    current: int
+    max: int
+    last_recharge: float
+
+class CurrencyState(StateSection):
+    """Gold and gems balances"""
+    __slots__ = ('gold', 'gems')
+    FIELDS = {"gold": 0, "gems": 0}
+    
+    gold: int
+    gems: int
+
+class EquipmentState(StateSection):
+    """Equipped weapon and skin"""
+    __slots__ = ('weapon', 'skin')
+    FIELDS = {"weapon": "wooden_sword", "skin": "default"}
+    
+    weapon: str
+    skin: str
+
+class InventoryState(StateSection):
+    """Owned weapons, skins and items"""
+    __slots__ = ('weapons', 'skins', 'item_counts', 'equipped')
+    FIELDS = {"weapons": list, "skins": list, "items": dict, "equipped": EquipmentState}
+    RENAMED = {"items": "item_counts"}  # items() stays the Mapping method
+    TYPES = {"equipped": EquipmentState}
+    
+    weapons: List[str]
+    skins: List[str]
+    item_counts: Dict[str, int]
+    equipped: EquipmentState
+
+class AdsState(StateSection):
+    """Ad counters, earnings and analytics"""
+    __slots__ = ('watched_today', 'total_watched', 'last_ad_time', 'last_reset_date',
+                 'total_gems_earned', 'total_gold_earned', 'analytics')
+    FIELDS = {
+        "watched_today": 0,
+        "total_watched": 0,
+        "last_ad_time": 0,
+        "last_reset_date": "",
+        "total_gems_earned": 0,
+        "total_gold_earned": 0,
+        "analytics": dict
+    }
+    
+    watched_today: int
+    total_watched: int
+    last_ad_time: float
+    last_reset_date: str
+    total_gems_earned: int
+    total_gold_earned: int
+    analytics: Dict[str, Any]
+
+class CompetitionTrack(StateSection):
+    """Ad views counted toward one competition period"""
+    __slots__ = ('ads_watched', 'last_reset', 'entries')
+    FIELDS = {"ads_watched": 0, "last_reset": 0.0, "entries": list}
+    
+    ads_watched: int
+    last_reset: float
+    entries: List[float]
+
+class CompetitionEntry(StateSection):
+    """One player's daily, weekly and monthly competition progress"""
+    __slots__ = ('daily', 'weekly', 'monthly')
+    FIELDS = {"daily": CompetitionTrack, "weekly": CompetitionTrack, "monthly": CompetitionTrack}
+    TYPES = {"daily": CompetitionTrack, "weekly": CompetitionTrack, "monthly": CompetitionTrack}
+    
+    daily: CompetitionTrack
+    weekly: CompetitionTrack
+    monthly: CompetitionTrack
+
+class CompetitionsState(StateSection):
+    """Competition progress keyed by user id"""
+    __slots__ = ()
+    EXTRA_TYPE = CompetitionEntry
+
+# Top-level player_data sections stored as typed sections
+SECTION_TYPES: Dict[str, Type[StateSection]] = {
+    "progress": ProgressState,
+    "stamina": StaminaState,
+    "currency": CurrencyState,
+    "inventory": InventoryState,
+    "ads": AdsState,
+    "competitions": CompetitionsState
+}
+
+def adopt_sections(player_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the typed sections of JSON-layout player data in place"""
+    for section, section_type in SECTION_TYPES.items():
+        value = player_data.get(section)
+        if isinstance(value, dict):
+            player_data[section] = section_type.from_dict(value)
+    return player_data
+
+def to_json_layout(player_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain JSON-layout copy of player data holding typed sections"""
+    return {
+        section: value.to_dict() if isinstance(value, StateSection) else value
+        for section, value in player_data.items()
+    }
+
+def json_default(value: Any) -> Dict[str, Any]:
+    """json.dumps default hook that writes typed sections in their JSON layout"""
+    if isinstance(value, StateSection):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class PlayerState:
+    """Typed access to the live sections of a player save
+    
+    Attribute reads go straight to slots. Changes made through attributes must
+    be followed by SaveManager.mark_dirty(section) to be saved; set_player_data
+    keeps working for path-based callers.
+    """
+    
+    __slots__ = ('_sections',)
+    
+    def __init__(self, sections: Callable[[str], StateSection]):
+        self._sections = sections
+    
+    @property
+    def progress(self) -> ProgressState:
+        return self._sections("progress")
+    
+    @property
+    def stamina(self) -> StaminaState:
+        return self._sections("stamina")
+    
+    @property
+    def currency(self) -> CurrencyState:
+        return self._sections("currency")
+    
+    @property
+    def inventory(self) -> InventoryState:
+        return self._sections("inventory")
+    
+    @property
+    def ads(self) -> AdsState:
+        return self._sections("ads")
+    
+    @property
+    def competitions(self) -> CompetitionsState:
+        return self._sections("competitions")
@@ -3,15 +3,269 @@ Kingdom of Aldoria - Save Manager
 Handles game save data, player progress, and persistent storage
 """
 
+import os
+import copy
 import json
+import zlib
+import struct
 import logging
+import threading
 import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
 from cryptography.fernet import Fernet
 import hashlib
 
 from ..core.config import Config
+from .player_state import PlayerState, StateSection, SECTION_TYPES, adopt_sections, json_default
+
+@lru_cache(maxsize=1024)
+def compile_path(key: str) -> Tuple[str, ...]:
+    """Split a dot-separated key path once and reuse the tuple afterwards"""
+    return tuple(key.split('.'))
+
+_MISSING = object()
+
+# Sectioned save container: magic, format version and encrypted header length,
+# then the encrypted header (generation, section names, token lengths and hashes)
+# and one independently encrypted token of canonical (sorted-key) JSON per
+# top-level section
+SAVE_MAGIC = b"ALDS"
+SAVE_FORMAT_VERSION = 3
+_CONTAINER_PREFIX = struct.Struct(">4sHI")
+
+def canonical_json(value: Any) -> str:
+    """Compact, key-sorted JSON; equal data always encodes to the same text"""
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, default=json_default)
+
+def section_hash(section_json: str) -> str:
+    """SHA-256 of a section's canonical JSON"""
+    return hashlib.sha256(section_json.encode('utf-8')).hexdigest()
+
+def merkle_root(section_hashes: Dict[str, str]) -> str:
+    """Combine per-section hashes into a root hash independent of section order"""
+    root = hashlib.sha256()
+    for section in sorted(section_hashes):
+        root.update(hashlib.sha256(f"{section}:{section_hashes[section]}".encode('utf-8')).digest())
+    return root.hexdigest()
+
+def changed_sections(ours: Dict[str, str], theirs: Dict[str, str]) -> List[str]:
+    """Sections whose hashes differ or that exist on only one side"""
+    return sorted(section for section in set(ours) | set(theirs) if ours.get(section) != theirs.get(section))
+
+def _lookup(data: Any, keys: Tuple[str, ...], default: Any = _MISSING) -> Any:
+    """Walk compiled path keys through nested dicts"""
+    try:
+        for k in keys:
+            data = data[k]
+        return data
+    except (KeyError, TypeError):
+        if default is _MISSING:
+            raise KeyError('.'.join(keys))
+        return default
+
+class SaveDataView(Mapping):
+    """Read-only, copy-free view of nested save data
+    
+    Nested dicts come back as views and lists as tuples, so UI code can read
+    the whole save without being able to change it behind SaveManager's back.
+    """
+    
+    __slots__ = ('_data',)
+    
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+    
+    @staticmethod
+    def _wrap(value: Any) -> Any:
+        if isinstance(value, (dict, StateSection)):
+            return SaveDataView(value)
+        if isinstance(value, list):
+            return tuple(SaveDataView._wrap(item) for item in value)
+        return value
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._wrap(self._data[key])
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __repr__(self) -> str:
+        return f"SaveDataView({self._data!r})"
+    
+    def path(self, key: str, default: Any = None) -> Any:
+        """Read a dot-separated key path"""
+        return self._wrap(_lookup(self._data, compile_path(key), default))
+
+def atomic_write(path: Path, data: bytes):
+    """Replace a file via write-to-temp, fsync and rename"""
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    
+    # Persist the rename itself where the platform allows it
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+class BackupStore:
+    """Content-addressed store of compressed, encrypted save backups
+    
+    Each distinct payload is kept once under objects/<sha256>.bak, zlib-compressed
+    and then Fernet-encrypted. index.json lists the backups (hash and time) so
+    retention can prune without scanning the directory. Retention keeps the
+    newest keep_recent backups plus the newest backup of each of the last
+    keep_hourly hours and keep_daily days.
+    """
+    
+    def __init__(self, backup_dir: Path, cipher: Fernet, keep_recent: int = 5,
+                 keep_hourly: int = 24, keep_daily: int = 7):
+        self.logger = logging.getLogger(__name__)
+        self.backup_dir = backup_dir
+        self.objects_dir = backup_dir / "objects"
+        self.index_file = backup_dir / "index.json"
+        self.cipher = cipher
+        self.keep_recent = keep_recent
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.entries: List[Dict[str, Any]] = self._load_index()  # oldest first
+    
+    def _load_index(self) -> List[Dict[str, Any]]:
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)["entries"]
+        except Exception as e:
+            self.logger.warning(f"Failed to load backup index, rebuilding: {e}")
+            return self._rebuild_index()
+        return []
+    
+    def _rebuild_index(self) -> List[Dict[str, Any]]:
+        """Recreate the index from the stored objects (only after index loss)"""
+        entries = [
+            {"hash": path.stem, "time": path.stat().st_mtime}
+            for path in self.objects_dir.glob("*.bak")
+        ]
+        entries.sort(key=lambda entry: entry["time"])
+        return entries
+    
+    def _write_index(self):
+        atomic_write(self.index_file, json.dumps({"version": 1, "entries": self.entries}).encode('utf-8'))
+    
+    def _object_path(self, content_hash: str) -> Path:
+        return self.objects_dir / f"{content_hash}.bak"
+    
+    def add(self, payload: bytes, content: Optional[bytes] = None,
+            timestamp: Optional[float] = None) -> Optional[str]:
+        """Back up a payload unless it matches the newest backup
+        
+        Args:
+            payload: Bytes to store
+            content: Bytes identifying the payload for deduplication (defaults
+                to the payload; lets callers ignore volatile fields)
+            timestamp: Backup time (defaults to now)
+        
+        Returns:
+            Content hash of the backup, or None if it was a duplicate
+        """
+        content_hash = hashlib.sha256(payload if content is None else content).hexdigest()
+        if self.entries and self.entries[-1]["hash"] == content_hash:
+            return None
+        
+        object_path = self._object_path(content_hash)
+        if not object_path.exists():
+            atomic_write(object_path, self.cipher.encrypt(zlib.compress(payload, 6)))
+        
+        self.entries.append({"hash": content_hash, "time": timestamp or time.time()})
+        self.prune()
+        return content_hash
+    
+    def read(self, content_hash: str) -> bytes:
+        """Decrypt and decompress a stored backup"""
+        with open(self._object_path(content_hash), 'rb') as f:
+            return zlib.decompress(self.cipher.decrypt(f.read()))
+    
+    def hashes(self) -> List[str]:
+        """Backup hashes, newest first"""
+        return [entry["hash"] for entry in reversed(self.entries)]
+    
+    def prune(self, now: Optional[float] = None):
+        """Apply the retention tiers, delete unreferenced objects and save the index"""
+        now = now or time.time()
+        newest_first = list(reversed(self.entries))
+        keep = set(range(min(self.keep_recent, len(newest_first))))
+        
+        for bucket_seconds, buckets in ((3600, self.keep_hourly), (86400, self.keep_daily)):
+            seen = set()
+            for position, entry in enumerate(newest_first):
+                bucket = int(entry["time"] // bucket_seconds)
+                if bucket <= int(now // bucket_seconds) - buckets or bucket in seen:
+                    continue
+                seen.add(bucket)
+                keep.add(position)
+        
+        kept = [entry for position, entry in enumerate(newest_first) if position in keep]
+        dropped = {entry["hash"] for entry in newest_first} - {entry["hash"] for entry in kept}
+        self.entries = list(reversed(kept))
+        self._write_index()
+        
+        for content_hash in dropped:
+            try:
+                self._object_path(content_hash).unlink()
+            except FileNotFoundError:
+                pass
+    
+    def import_legacy(self, pattern: str, decrypt: Fernet):
+        """Move old full-copy backups (player_backup_<time>.sav) into the store"""
+        for legacy in sorted(self.backup_dir.glob(pattern)):
+            try:
+                payload = decrypt.decrypt(legacy.read_bytes())
+                content_hash = hashlib.sha256(payload).hexdigest()
+                if not self._object_path(content_hash).exists():
+                    atomic_write(self._object_path(content_hash), self.cipher.encrypt(zlib.compress(payload, 6)))
+                self.entries.append({"hash": content_hash, "time": legacy.stat().st_mtime})
+            except Exception as e:
+                self.logger.warning(f"Dropping unreadable legacy backup {legacy.name}: {e}")
+            legacy.unlink()
+        
+        self.entries.sort(key=lambda entry: entry["time"])
+        self.prune()
+
+@dataclass
+class SaveSnapshot:
+    """Point-in-time copy of the data a save has to write"""
+    # Full save: (section, cached JSON, cached token, copied value, snapshot seq), with
+    # JSON and token None for changed sections; None = no full save
+    sections: Optional[List[Tuple[str, Optional[str], Optional[bytes], Any, int]]]
+    settings: Optional[Dict[str, Any]]  # None = settings unchanged
+    force: bool = False
+    # Journal record: (dot path, copied value) pairs appended after any full save
+    deltas: Optional[List[Tuple[str, Any]]] = None
+    
+    def merge(self, older: "SaveSnapshot"):
+        """Fold an older, not yet written snapshot into this one"""
+        if self.sections is None:
+            # A full save in the older snapshot still has to land before these deltas
+            self.sections = older.sections
+            if older.deltas:
+                self.deltas = older.deltas + (self.deltas or [])
+        if self.settings is None:
+            self.settings = older.settings
+        self.force = self.force or older.force
 
 class SaveManager:
     """Manages game save data and persistent storage"""
@@ -25,6 +279,44 @@ class SaveManager:
         self.game_settings: Dict[str, Any] = {}
         self.last_save_time = 0
         
+        # Dirty tracking: top-level player_data sections changed since the last
+        # save, and the compact JSON last written for each section
+        self._dirty_sections: Set[str] = set()
+        self._section_json: Dict[str, str] = {}
+        
+        # Encrypted container token last written for each clean section, and the
+        # sections left encoded at load until first access (see LAZY_SECTIONS)
+        self._section_tokens: Dict[str, bytes] = {}
+        self._lazy_sections: Set[str] = set()
+        
+        # Hash of each section's canonical JSON as last written (or computed while
+        # clean); dirty sections are rehashed on demand
+        self._section_hashes: Dict[str, str] = {}
+        self._settings_dirty = False
+        self._saved_settings_json: Optional[str] = None
+        
+        # Delta journal: set_player_data changes since the last save, appended as
+        # encrypted records to the journal until it is compacted into a full save.
+        # Records carry the generation of the snapshot they apply to
+        self._pending_deltas: Dict[str, Any] = {}
+        self._needs_full_save = False
+        self._journal_generation = 0
+        self._journal_bytes = 0
+        
+        # Background save worker: snapshots are taken on the caller's thread and
+        # encoded, encrypted and written on the worker; requests that arrive while
+        # one is pending are coalesced into it
+        self._snapshot_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._snapshot_seq = 0
+        self._section_seq: Dict[str, int] = {}
+        self._save_condition = threading.Condition()
+        self._pending_snapshot: Optional[SaveSnapshot] = None
+        self._save_in_progress = False
+        self._last_save_ok = True
+        self._save_thread: Optional[threading.Thread] = None
+        self._stop_save_worker = False
+        
         # Encryption
         self.encryption_key = self._get_or_create_key()
         self.cipher = Fernet(self.encryption_key)
@@ -34,13 +326,26 @@ class SaveManager:
         self.save_dir.mkdir(parents=True, exist_ok=True)
         
         self.player_save_file = self.save_dir / "player_data.sav"
+        self.journal_file = self.save_dir / "player_data.journal"
         self.settings_file = self.save_dir / "settings.json"
         self.backup_dir = self.save_dir / "backups"
         self.backup_dir.mkdir(exist_ok=True)
+        self.backup_store = BackupStore(self.backup_dir, self.cipher)
+        if any(self.backup_dir.glob("player_backup_*.sav")):
+            self.backup_store.import_legacy("player_backup_*.sav", self.cipher)
+        
+        # Typed access to the typed sections (see player_state)
+        self.state = PlayerState(self.get_section)
         
         self.logger.info("SaveManager initialized")
         self._load_all_data()
     
+    # Journal size that triggers compaction into a full snapshot
+    JOURNAL_COMPACT_BYTES = 64 * 1024
+    
+    # Sections that grow with play time but are rarely read; decoded on first access
+    LAZY_SECTIONS = frozenset({"ads", "competitions", "transactions"})
+    
     def _get_or_create_key(self) -> bytes:
         """Get or create encryption key"""
         key_file = Config.SAVE_DIR / ".key"
@@ -70,23 +375,159 @@ class SaveManager:
         self._load_settings()
     
     def _load_player_data(self):
-        """Load player save data"""
-        try:
-            if self.player_save_file.exists():
-                with open(self.player_save_file, 'rb') as f:
-                    encrypted_data = f.read()
-                
-                # Decrypt data
-                decrypted_data = self.cipher.decrypt(encrypted_data)
-                self.player_data = json.loads(decrypted_data.decode('utf-8'))
-                
-                self.logger.info("Player data loaded successfully")
-            else:
-                self._create_new_player_data()
+        """Load player save data
+        
+        The snapshot is replayed with its journal. An unreadable snapshot falls
+        back to the newest readable backup before starting a new game.
+        """
+        candidates = []
+        if self.player_save_file.exists():
+            candidates.append((self.player_save_file.name, lambda: self._read_snapshot(self.LAZY_SECTIONS)))
+        for content_hash in self.backup_store.hashes():
+            candidates.append((f"backup {content_hash[:12]}", lambda h=content_hash: self._read_backup(h)))
+        
+        for source, read in candidates:
+            try:
+                self.player_data, self._journal_generation, encoded = read()
+            except Exception as e:
+                self.logger.error(f"Failed to load player data from {source}: {e}")
+                continue
+            
+            self._dirty_sections.clear()
+            self._pending_deltas.clear()
+            self._section_tokens = {section: token for section, (token, _, _) in encoded.items()}
+            self._section_json = {section: text for section, (_, text, _) in encoded.items() if text is not None}
+            self._section_hashes = {section: digest for section, (_, _, digest) in encoded.items()}
+            self._lazy_sections = set(encoded) - set(self.player_data)
+            
+            replayed = self._replay_journal()
+            adopt_sections(self.player_data)
+            if source != self.player_save_file.name:
+                self.logger.warning(f"Recovered player data from {source}")
+                self._needs_full_save = True
+            elif not encoded:
+                # Older formats are rewritten as the current container
+                self._needs_full_save = True
+            
+            self.logger.info(f"Player data loaded successfully ({replayed} journal records)")
+            return
+        
+        self._create_new_player_data()
+    
+    def _read_snapshot(self, lazy: Iterable[str] = ()) -> Tuple[Dict[str, Any], int,
+                                                                Dict[str, Tuple[bytes, Optional[str], str]]]:
+        """Decrypt the full save
+        
+        Args:
+            lazy: Sections to leave encoded
+            
+        Returns:
+            Player data, its journal generation, and each container section's
+            token, JSON (None for sections left encoded) and hash; empty for
+            saves from before the container, which are decoded in full
+        """
+        with open(self.player_save_file, 'rb') as f:
+            encrypted_data = f.read()
+        
+        # Saves written before the sectioned container are one encrypted JSON document
+        if not encrypted_data.startswith(SAVE_MAGIC):
+            return json.loads(self.cipher.decrypt(encrypted_data)), 0, {}
+        
+        magic, version, header_length = _CONTAINER_PREFIX.unpack_from(encrypted_data)
+        if version != SAVE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported save format version {version}")
+        
+        offset = _CONTAINER_PREFIX.size + header_length
+        header = json.loads(self.cipher.decrypt(encrypted_data[_CONTAINER_PREFIX.size:offset]))
+        if offset + sum(entry[1] for entry in header["sections"]) != len(encrypted_data):
+            raise ValueError("Save file is truncated")
+        
+        lazy = set(lazy)
+        player_data = {}
+        encoded = {}
+        for section, length, digest in header["sections"]:
+            token = encrypted_data[offset:offset + length]
+            offset += length
+            if section in lazy:
+                encoded[section] = (token, None, digest)
+                continue
+            section_json = self.cipher.decrypt(token).decode('utf-8')
+            player_data[section] = json.loads(section_json)
+            encoded[section] = (token, section_json, digest)
+        
+        return player_data, header["journal_generation"], encoded
+    
+    def _read_backup(self, content_hash: str) -> Tuple[Dict[str, Any], int, Dict[str, Tuple[bytes, Optional[str], str]]]:
+        """Read a backup from the store (backups hold bare player data)"""
+        return json.loads(self.backup_store.read(content_hash)), 0, {}
+    
+    def _replay_journal(self) -> int:
+        """Apply journal records for the loaded snapshot, dropping a torn tail
+        
+        Returns:
+            Number of records applied
+        """
+        self._journal_bytes = 0
+        if not self.journal_file.exists():
+            return 0
+        
+        applied = 0
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(self.cipher.decrypt(line.rstrip(b"\n")).decode('utf-8'))
+                except Exception:
+                    self.logger.warning(f"Discarding corrupt journal tail after {valid_bytes} bytes")
+                    break
                 
-        except Exception as e:
-            self.logger.error(f"Failed to load player data: {e}")
-            self._create_new_player_data()
+                valid_bytes += len(line)
+                if record.get("generation") != self._journal_generation:
+                    continue  # Already part of the snapshot
+                for key, value in record["set"]:
+                    section = compile_path(key)[0]
+                    self._ensure_sections([section])
+                    self._apply_path(self.player_data, key, value)
+                    # The container's copy of the section is now out of date
+                    self._section_json.pop(section, None)
+                    self._section_tokens.pop(section, None)
+                    self._section_hashes.pop(section, None)
+                applied += 1
+        
+        if valid_bytes != self.journal_file.stat().st_size:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+        self._journal_bytes = valid_bytes
+        return applied
+    
+    def _ensure_sections(self, sections: Iterable[str]):
+        """Decode lazily loaded sections before they are read or changed"""
+        for section in sections:
+            if section not in self._lazy_sections:
+                continue
+            with self._snapshot_lock:
+                if section not in self._lazy_sections:
+                    continue
+                self._lazy_sections.discard(section)
+                try:
+                    section_json = self.cipher.decrypt(self._section_tokens[section]).decode('utf-8')
+                    self.player_data[section] = adopt_sections({section: json.loads(section_json)})[section]
+                    self._section_json[section] = section_json
+                except Exception as e:
+                    # Treated as missing; the backups still hold the section
+                    self._section_tokens.pop(section, None)
+                    self._section_hashes.pop(section, None)
+                    self.logger.error(f"Failed to decode save section {section}: {e}")
+    
+    @staticmethod
+    def _apply_path(data: Dict[str, Any], key: str, value: Any):
+        """Set a dot-separated key path, creating parents as needed"""
+        keys = compile_path(key)
+        for k in keys[:-1]:
+            if k not in data:
+                data[k] = {}
+            data = data[k]
+        data[keys[-1]] = value
     
     def _load_settings(self):
         """Load game settings"""
@@ -94,6 +535,8 @@ class SaveManager:
             if self.settings_file.exists():
                 with open(self.settings_file, 'r', encoding='utf-8') as f:
                     self.game_settings = json.load(f)
+                self._saved_settings_json = json.dumps(self.game_settings, indent=2)
+                self._settings_dirty = False
                 self.logger.info("Settings loaded successfully")
             else:
                 self._create_default_settings()
@@ -183,6 +626,8 @@ class SaveManager:
             }
         }
         
+        adopt_sections(self.player_data)
+        self.mark_dirty()
         self.logger.info("New player data created")
     
     def _create_default_settings(self):
@@ -209,66 +654,330 @@ class SaveManager:
             }
         }
         
+        self._settings_dirty = True
         self.logger.info("Default settings created")
     
-    def save_game_data(self):
-        """Save all game data"""
+    def save_game_data(self, force: bool = False):
+        """Save game data that changed since the last save
+        
+        Blocks until written; goes through the background worker when it is
+        running so writes stay in order.
+        
+        Args:
+            force: Rewrite player data and settings even if nothing changed
+        """
+        if self._save_thread is not None:
+            self.request_save(force)
+            return self.flush()
+        
+        snapshot = self._take_snapshot(force)
+        self.last_save_time = time.time()
+        if snapshot is None:
+            return True
+        return self._write_snapshot(snapshot)
+    
+    def request_save(self, force: bool = False):
+        """Queue a save on the background worker without blocking the game loop
+        
+        Args:
+            force: Rewrite player data and settings even if nothing changed
+        """
+        snapshot = self._take_snapshot(force)
+        self.last_save_time = time.time()
+        if snapshot is None:
+            return
+        
+        with self._save_condition:
+            if self._pending_snapshot is not None:
+                snapshot.merge(self._pending_snapshot)
+            self._pending_snapshot = snapshot
+            
+            if self._save_thread is None:
+                self._stop_save_worker = False
+                self._save_thread = threading.Thread(target=self._save_worker, name="SaveWorker",
+                                                     daemon=True)
+                self._save_thread.start()
+            self._save_condition.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued saves to reach disk
+        
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+            
+        Returns:
+            True if everything queued was written successfully
+        """
+        with self._save_condition:
+            finished = self._save_condition.wait_for(
+                lambda: self._pending_snapshot is None and not self._save_in_progress, timeout
+            )
+            return finished and self._last_save_ok
+    
+    def _save_worker(self):
+        """Write queued snapshots until stopped"""
+        while True:
+            with self._save_condition:
+                self._save_condition.wait_for(
+                    lambda: self._pending_snapshot is not None or self._stop_save_worker
+                )
+                if self._pending_snapshot is None:
+                    return
+                snapshot, self._pending_snapshot = self._pending_snapshot, None
+                self._save_in_progress = True
+            
+            saved = self._write_snapshot(snapshot)
+            
+            with self._save_condition:
+                self._save_in_progress = False
+                self._last_save_ok = saved
+                self._save_condition.notify_all()
+    
+    def _shutdown_save_worker(self):
+        """Stop the background worker after it drains"""
+        with self._save_condition:
+            thread, self._save_thread = self._save_thread, None
+            self._stop_save_worker = True
+            self._save_condition.notify_all()
+        if thread is not None:
+            thread.join()
+    
+    def _take_snapshot(self, force: bool = False) -> Optional[SaveSnapshot]:
+        """Copy what changed since the last save (None if nothing did)
+        
+        Only dirty sections are deep-copied; clean sections carry the JSON they
+        were last written with.
+        """
+        with self._snapshot_lock:
+            save_player = force or self._needs_full_save or bool(self._dirty_sections)
+            save_settings = force or self._settings_dirty
+            if not save_player and not save_settings:
+                return None
+            
+            self._snapshot_seq += 1
+            sections = None
+            deltas = None
+            if save_player:
+                # Update last played time
+                self.player_data["last_played"] = time.time()
+                self._dirty_sections.add("last_played")
+                self._record_delta("last_played", self.player_data["last_played"])
+                for section in self._dirty_sections:
+                    # Also stops an in-flight write from caching its older JSON
+                    self._section_json.pop(section, None)
+                    self._section_tokens.pop(section, None)
+                    self._section_hashes.pop(section, None)
+                    self._section_seq[section] = self._snapshot_seq
+                self._dirty_sections.clear()
+                
+                full_save = (force or self._needs_full_save or not self.player_save_file.exists()
+                             or self._journal_bytes >= self.JOURNAL_COMPACT_BYTES)
+                if full_save:
+                    # Compaction: the full snapshot supersedes any pending deltas
+                    sections = []
+                    for section, value in self.player_data.items():
+                        cached = self._section_json.get(section)
+                        token = self._section_tokens.get(section)
+                        if cached is None and token is None:
+                            self._section_seq[section] = self._snapshot_seq
+                            sections.append((section, None, None, copy.deepcopy(value), self._snapshot_seq))
+                        else:
+                            sections.append((section, cached, token, None, self._section_seq.get(section, 0)))
+                    # Sections never decoded are rewritten from their tokens
+                    for section in self._lazy_sections:
+                        sections.append((section, None, self._section_tokens[section], None,
+                                         self._section_seq.get(section, 0)))
+                    self._needs_full_save = False
+                else:
+                    deltas = [(key, copy.deepcopy(value)) for key, value in self._pending_deltas.items()]
+                self._pending_deltas.clear()
+            
+            settings = None
+            if save_settings:
+                settings = copy.deepcopy(self.game_settings)
+                self._settings_dirty = False
+            
+            return SaveSnapshot(sections, settings, force, deltas)
+    
+    def _record_delta(self, key: str, value: Any):
+        """Queue a changed key path for the next journal record (latest write last)"""
+        self._pending_deltas.pop(key, None)
+        self._pending_deltas[key] = value
+    
+    def _write_snapshot(self, snapshot: SaveSnapshot) -> bool:
+        """Encode, encrypt and write a snapshot, then back it up"""
         try:
-            self._save_player_data()
-            self._save_settings()
-            self._create_backup()
-            self.last_save_time = time.time()
-            self.logger.info("Game data saved successfully")
+            with self._write_lock:
+                backup = self._save_player_data(snapshot) if snapshot.sections is not None else None
+                player_saved = backup is not None
+                if snapshot.deltas:
+                    self._append_journal(snapshot.deltas)
+                if snapshot.settings is not None:
+                    self._save_settings(snapshot.settings, snapshot.force)
+                if player_saved:
+                    self._create_backup(*backup)
+            
+            if player_saved:
+                self.logger.info("Game data saved successfully")
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to save game data: {e}")
+            
+            # Mark the snapshot's data dirty again so the next save retries it; the
+            # unwritten changes may now be in neither file, so that save is a full one
+            with self._snapshot_lock:
+                if snapshot.sections is not None:
+                    self._dirty_sections.update(
+                        section for section, cached, token, _, _ in snapshot.sections
+                        if cached is None and token is None
+                    )
+                if snapshot.sections is not None or snapshot.deltas:
+                    self._needs_full_save = True
+                if snapshot.settings is not None:
+                    self._settings_dirty = True
             return False
     
-    def _save_player_data(self):
-        """Save player data with encryption"""
-        # Update last played time
-        self.player_data["last_played"] = time.time()
+    def _save_player_data(self, snapshot: SaveSnapshot) -> Optional[Tuple[bytes, bytes]]:
+        """Save a snapshot's player data with encryption
+        
+        Returns:
+            The player data JSON that was written and its content without
+            last_played, for the backup store
+        """
+        # Serialize and encrypt each section on its own, reusing the JSON and
+        # token of sections that did not change
+        parts = []
+        content_parts = []
+        tokens = []
+        encoded = {}
+        for section, section_json, token, value, seq in snapshot.sections:
+            if section_json is None and token is None:
+                section_json = canonical_json(value)
+            elif section_json is None:
+                # Never decoded since load; only the backup needs its JSON
+                section_json = self.cipher.decrypt(token).decode('utf-8')
+            digest = section_hash(section_json)
+            if token is None:
+                token = self.cipher.encrypt(section_json.encode('utf-8'))
+                encoded[section] = (section_json, token, digest, seq)
+            tokens.append((section, token, digest))
+            parts.append(f"{json.dumps(section)}:{section_json}")
+            if section != "last_played":
+                content_parts.append(parts[-1])
+        json_data = "{" + ",".join(parts) + "}"
+        
+        # The new generation makes older journal records obsolete even if the
+        # journal cannot be truncated after the rename
+        generation = self._journal_generation + 1
+        header = json.dumps({
+            "journal_generation": generation,
+            "sections": [[section, len(token), digest] for section, token, digest in tokens]
+        }, separators=(',', ':'))
+        header_token = self.cipher.encrypt(header.encode('utf-8'))
+        container = b"".join([_CONTAINER_PREFIX.pack(SAVE_MAGIC, SAVE_FORMAT_VERSION, len(header_token)),
+                              header_token] + [token for _, token, _ in tokens])
+        
+        atomic_write(self.player_save_file, container)
+        self._journal_generation = generation
+        
+        with open(self.journal_file, 'wb'):
+            pass
+        self._journal_bytes = 0
+        
+        # Cache the new JSON and tokens unless a later snapshot copied the section again
+        with self._snapshot_lock:
+            for section, (section_json, token, digest, seq) in encoded.items():
+                if self._section_seq.get(section, 0) == seq and section not in self._dirty_sections:
+                    self._section_json[section] = section_json
+                    self._section_tokens[section] = token
+                    self._section_hashes[section] = digest
+            for cache in (self._section_json, self._section_tokens, self._section_hashes):
+                for section in [section for section in cache
+                                if section not in self.player_data and section not in self._lazy_sections]:
+                    del cache[section]
+        
+        content = "{" + ",".join(content_parts) + "}"
+        return json_data.encode('utf-8'), content.encode('utf-8')
+    
+    def _save_settings(self, settings: Dict[str, Any], force: bool = False) -> bool:
+        """Save game settings if their content changed
         
-        # Serialize and encrypt
-        json_data = json.dumps(self.player_data, indent=2)
-        encrypted_data = self.cipher.encrypt(json_data.encode('utf-8'))
+        Returns:
+            True if the settings file was written
+        """
+        settings_json = json.dumps(settings, indent=2)
+        if not force and settings_json == self._saved_settings_json:
+            return False
         
-        # Write to file
-        with open(self.player_save_file, 'wb') as f:
-            f.write(encrypted_data)
+        atomic_write(self.settings_file, settings_json.encode('utf-8'))
+        self._saved_settings_json = settings_json
+        return True
     
-    def _save_settings(self):
-        """Save game settings"""
-        with open(self.settings_file, 'w', encoding='utf-8') as f:
-            json.dump(self.game_settings, f, indent=2)
+    def _append_journal(self, deltas: List[Tuple[str, Any]]):
+        """Append one encrypted delta record to the journal and fsync it"""
+        record = json.dumps({"generation": self._journal_generation, "set": deltas}, separators=(',', ':'),
+                            default=json_default)
+        line = self.cipher.encrypt(record.encode('utf-8')) + b"\n"
+        
+        try:
+            with open(self.journal_file, 'ab') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            # Cut off a partial record so later appends stay readable
+            try:
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(self._journal_bytes)
+            except OSError:
+                pass
+            raise
+        
+        self._journal_bytes += len(line)
     
-    def _create_backup(self):
-        """Create backup of save files"""
+    def _create_backup(self, payload: Optional[bytes] = None, content: Optional[bytes] = None):
+        """Add the current save to the backup store
+        
+        Args:
+            payload: Player data JSON just written (None reads the save file)
+            content: The payload without last_played, used for deduplication
+        """
         try:
-            timestamp = int(time.time())
-            backup_file = self.backup_dir / f"player_backup_{timestamp}.sav"
-            
-            if self.player_save_file.exists():
-                import shutil
-                shutil.copy2(self.player_save_file, backup_file)
-            
-            # Keep only last 5 backups
-            self._cleanup_old_backups()
+            with self._write_lock:
+                if payload is None:
+                    if not self.player_save_file.exists():
+                        return
+                    player_data, _, _ = self._read_snapshot()
+                    payload = json.dumps(player_data, separators=(',', ':')).encode('utf-8')
+                    player_data = {key: value for key, value in player_data.items() if key != "last_played"}
+                    content = json.dumps(player_data, separators=(',', ':')).encode('utf-8')
+                
+                # Saves that only moved last_played are deduplicated; retention
+                # pruning runs from the index
+                self.backup_store.add(payload, content)
             
         except Exception as e:
             self.logger.warning(f"Failed to create backup: {e}")
     
-    def _cleanup_old_backups(self):
-        """Remove old backup files"""
-        try:
-            backups = sorted(self.backup_dir.glob("player_backup_*.sav"))
-            if len(backups) > 5:
-                for backup in backups[:-5]:
-                    backup.unlink()
-                    
-        except Exception as e:
-            self.logger.warning(f"Failed to cleanup backups: {e}")
+    def get_section(self, section: str) -> StateSection:
+        """Get a live typed section (progress, stamina, currency, inventory, ads, competitions)
+        
+        Attribute changes must be followed by mark_dirty(section) to be saved.
+        
+        Args:
+            section: Top-level section name from SECTION_TYPES
+            
+        Returns:
+            The section object stored in player data (created empty if missing)
+        """
+        if section in self._lazy_sections:
+            self._ensure_sections([section])
+        value = self.player_data.get(section)
+        if not isinstance(value, StateSection):
+            value = SECTION_TYPES[section].from_dict(value or {})
+            self.player_data[section] = value
+        return value
     
     def get_player_data(self, key: str = None) -> Any:
         """Get player data
@@ -277,22 +986,37 @@ class SaveManager:
             key: Specific key to get (None for all data)
             
         Returns:
-            Player data or specific value
+            Specific value, or a read-only SaveDataView of all data
         """
         if key is None:
-            return self.player_data.copy()
-        
-        keys = key.split('.')
-        data = self.player_data
+            self._ensure_sections(list(self._lazy_sections))
+            return SaveDataView(self.player_data)
         
+        keys = compile_path(key)
+        if keys[0] in self._lazy_sections:
+            self._ensure_sections(keys[:1])
         try:
-            for k in keys:
-                data = data[k]
-            return data
+            return _lookup(self.player_data, keys)
         except KeyError:
             self.logger.warning(f"Player data key not found: {key}")
             return None
     
+    def get_many(self, keys: Iterable[str], default: Any = None) -> List[Any]:
+        """Get several player data values in one call
+        
+        Args:
+            keys: Dot-separated key paths
+            default: Value for paths that do not exist (no warning is logged)
+            
+        Returns:
+            Values in the same order as keys
+        """
+        paths = [compile_path(key) for key in keys]
+        if self._lazy_sections:
+            self._ensure_sections({path[0] for path in paths})
+        player_data = self.player_data
+        return [_lookup(player_data, path, default) for path in paths]
+    
     def set_player_data(self, key: str, value: Any):
         """Set player data
         
@@ -300,17 +1024,27 @@ class SaveManager:
             key: Dot-separated key path
             value: Value to set
         """
-        keys = key.split('.')
+        keys = compile_path(key)
+        if keys[0] in self._lazy_sections:
+            self._ensure_sections(keys[:1])
         data = self.player_data
         
         # Navigate to parent
         for k in keys[:-1]:
             if k not in data:
-                data[k] = {}
+                data[k] = SECTION_TYPES[k]() if data is self.player_data and k in SECTION_TYPES else {}
             data = data[k]
         
-        # Set value
+        # Set value; writing back an equal value leaves the section clean, but the
+        # same object handed back was usually mutated in place (get, append, set)
+        current = data.get(keys[-1], _MISSING)
+        if current == value and not (current is value and isinstance(value, (dict, list, StateSection))):
+            return
+        if len(keys) == 1 and key in SECTION_TYPES and isinstance(value, dict):
+            value = SECTION_TYPES[key].from_dict(value)
         data[keys[-1]] = value
+        self._dirty_sections.add(keys[0])
+        self._record_delta(key, value)
         
         self.logger.debug(f"Set player data: {key} = {value}")
     
@@ -323,13 +1057,8 @@ class SaveManager:
         Returns:
             Setting value or None
         """
-        keys = key.split('.')
-        data = self.game_settings
-        
         try:
-            for k in keys:
-                data = data[k]
-            return data
+            return _lookup(self.game_settings, compile_path(key))
         except KeyError:
             self.logger.warning(f"Setting key not found: {key}")
             return None
@@ -341,7 +1070,7 @@ class SaveManager:
             key: Dot-separated key path
             value: Value to set
         """
-        keys = key.split('.')
+        keys = compile_path(key)
         data = self.game_settings
         
         # Navigate to parent
@@ -351,15 +1080,38 @@ class SaveManager:
             data = data[k]
         
         # Set value
+        if keys[-1] in data and data[keys[-1]] == value:
+            return
         data[keys[-1]] = value
+        self._settings_dirty = True
         
         self.logger.debug(f"Set setting: {key} = {value}")
     
+    def mark_dirty(self, key: str = None):
+        """Mark player data as changed outside set_player_data
+        
+        Args:
+            key: Dot-separated key path whose section changed (None for all data)
+        """
+        if key is None:
+            self._dirty_sections.update(self.player_data.keys())
+            self._needs_full_save = True
+        else:
+            section = compile_path(key)[0]
+            self._ensure_sections([section])
+            self._dirty_sections.add(section)
+            if section in self.player_data:
+                self._record_delta(section, self.player_data[section])
+    
+    def has_unsaved_changes(self) -> bool:
+        """Check whether player data or settings changed since the last save"""
+        return bool(self._dirty_sections) or self._needs_full_save or self._settings_dirty
+    
     def auto_save_if_needed(self):
-        """Auto-save if enough time has passed"""
+        """Auto-save if enough time has passed and something changed"""
         current_time = time.time()
-        if current_time - self.last_save_time > Config.AUTO_SAVE_INTERVAL:
-            self.save_game_data()
+        if current_time - self.last_save_time > Config.AUTO_SAVE_INTERVAL and self.has_unsaved_changes():
+            self.request_save()
     
     def export_save_data(self) -> Optional[str]:
         """Export save data as JSON string
@@ -368,13 +1120,16 @@ class SaveManager:
             JSON string of save data or None if failed
         """
         try:
+            section_hashes = self.get_section_hashes()
+            self._ensure_sections(list(self._lazy_sections))
             export_data = {
                 "version": Config.SAVE_VERSION,
                 "export_time": time.time(),
                 "player_data": self.player_data,
-                "checksum": self._calculate_checksum(self.player_data)
+                "section_hashes": section_hashes,
+                "checksum": merkle_root(section_hashes)
             }
-            return json.dumps(export_data, indent=2)
+            return json.dumps(export_data, indent=2, default=json_default)
             
         except Exception as e:
             self.logger.error(f"Failed to export save data: {e}")
@@ -392,10 +1147,20 @@ class SaveManager:
         try:
             import_data = json.loads(json_data)
             
-            # Verify checksum
-            if "checksum" in import_data:
-                expected_checksum = self._calculate_checksum(import_data["player_data"])
-                if import_data["checksum"] != expected_checksum:
+            # Verify section hashes and the root checksum over them
+            if "section_hashes" in import_data:
+                section_hashes = {
+                    section: section_hash(canonical_json(value))
+                    for section, value in import_data["player_data"].items()
+                }
+                mismatched = changed_sections(section_hashes, import_data["section_hashes"])
+                if mismatched or import_data.get("checksum") != merkle_root(section_hashes):
+                    self.logger.error(f"Save data checksum mismatch in sections: {mismatched}")
+                    return False
+            elif "checksum" in import_data:
+                # Exports made before section hashes carry an MD5 of the whole data
+                json_str = json.dumps(import_data["player_data"], sort_keys=True)
+                if import_data["checksum"] != hashlib.md5(json_str.encode('utf-8')).hexdigest():
                     self.logger.error("Save data checksum mismatch")
                     return False
             
@@ -403,7 +1168,12 @@ class SaveManager:
             self._create_backup()
             
             # Import data
-            self.player_data = import_data["player_data"]
+            self.player_data = adopt_sections(import_data["player_data"])
+            self._section_json.clear()
+            self._section_tokens.clear()
+            self._section_hashes.clear()
+            self._lazy_sections.clear()
+            self.mark_dirty()
             self.save_game_data()
             
             self.logger.info("Save data imported successfully")
@@ -413,26 +1183,42 @@ class SaveManager:
             self.logger.error(f"Failed to import save data: {e}")
             return False
     
-    def _calculate_checksum(self, data: Dict[str, Any]) -> str:
-        """Calculate checksum for data integrity
+    def get_section_hashes(self) -> Dict[str, str]:
+        """Get the hash of each top-level section's canonical JSON
+        
+        Only sections changed since they were last written are re-serialized.
         
-        Args:
-            data: Data to calculate checksum for
-            
         Returns:
-            MD5 checksum string
+            Section name to SHA-256 hex digest
         """
-        json_str = json.dumps(data, sort_keys=True)
-        return hashlib.md5(json_str.encode('utf-8')).hexdigest()
+        with self._snapshot_lock:
+            hashes = {}
+            for section, value in self.player_data.items():
+                digest = self._section_hashes.get(section)
+                if digest is None or section in self._dirty_sections:
+                    digest = section_hash(canonical_json(value))
+                    if section not in self._dirty_sections:
+                        self._section_hashes[section] = digest
+                hashes[section] = digest
+            for section in self._lazy_sections:
+                hashes[section] = self._section_hashes[section]
+            return hashes
+    
+    def get_root_hash(self) -> str:
+        """Get the root hash over all section hashes (equal saves, equal roots)"""
+        return merkle_root(self.get_section_hashes())
     
     def cleanup(self):
         """Clean up save manager"""
         self.logger.info("Cleaning up SaveManager")
         
-        # Final save
+        # Final save, waiting for anything still queued on the worker
         try:
-            self.save_game_data()
+            if not self.save_game_data():
+                self.logger.error("Final save during cleanup did not complete")
         except Exception as e:
             self.logger.error(f"Failed final save during cleanup: {e}")
+        finally:
+            self._shutdown_save_worker()
         
         self.logger.info("SaveManager cleanup complete")
\ No newline at end of file
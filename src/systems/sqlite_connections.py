@@ -0,0 +1,146 @@
+"""
+Kingdom of Aldoria - SQLite Connections
+WAL-mode connection pool shared by the game's SQLite-backed systems
+"""
+
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+class SQLiteConnectionPool:
+    """Per-thread readers and one dedicated writer for a SQLite database
+
+    Every thread reads through its own long-lived connection, and WAL mode
+    means those reads never wait for a writer. All writes go through a
+    single writer connection inside transaction(), so threads queue on a lock
+    in this process instead of failing with SQLITE_BUSY. busy_timeout covers
+    the rest, such as other processes or a checkpoint.
+    """
+
+    def __init__(self, database_path: str, timeout: float = 30.0,
+                 cache_size_kb: int = 16384, cached_statements: int = 256,
+                 row_factory: Optional[Callable] = None):
+        self.database_path = database_path
+        self.timeout = timeout
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+        self.row_factory = row_factory
+        self.logger = logging.getLogger(__name__)
+        
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        
+        # Writer state is only touched while holding write_lock
+        self.write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._depth = 0
+        self._owner: Optional[int] = None
+    
+    def _open(self) -> sqlite3.Connection:
+        """Open and tune a new connection"""
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            isolation_level=None,  # Transactions are opened explicitly by transaction()
+            check_same_thread=False  # Only the owning thread uses it; close_all may run elsewhere
+        )
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        conn.execute(f'PRAGMA busy_timeout={int(self.timeout * 1000)}')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+    
+    @property
+    def in_transaction(self) -> bool:
+        """Whether the calling thread is inside transaction()"""
+        return self._owner == threading.get_ident()
+    
+    def connection(self) -> sqlite3.Connection:
+        """Connection for the calling thread
+
+        Inside transaction() this is the writer, so the block reads its own
+        uncommitted writes; elsewhere it is the thread's reader, opened on
+        first use and kept until close_all().
+        """
+        if self._owner == threading.get_ident():
+            return self._writer
+        
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._open()
+            self._local.connection = conn
+        return conn
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Run a block of writes on the writer connection with a single commit
+
+        The outermost block takes the database write lock up front (BEGIN
+        IMMEDIATE) and commits, or rolls back if an exception escapes. Nested
+        blocks run in a savepoint, so a failed inner block only undoes its own
+        writes. Other threads wait until the outermost block finishes.
+        """
+        with self.write_lock:
+            if self._writer is None:
+                self._writer = self._open()
+            conn = self._writer
+            depth = self._depth
+            if depth == 0:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                self._owner = threading.get_ident()
+            else:
+                conn.execute(f'SAVEPOINT uow_{depth}')
+            
+            self._depth = depth + 1
+            try:
+                yield conn.cursor()
+            except BaseException:
+                self._depth = depth
+                if depth == 0:
+                    self._owner = None
+                    conn.rollback()
+                else:
+                    conn.execute(f'ROLLBACK TO uow_{depth}')
+                    conn.execute(f'RELEASE uow_{depth}')
+                raise
+            
+            self._depth = depth
+            if depth == 0:
+                self._owner = None
+                try:
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+            else:
+                conn.execute(f'RELEASE uow_{depth}')
+    
+    def checkpoint(self):
+        """Fold the WAL back into the main database file"""
+        with self.write_lock:
+            self.connection().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    def close_all(self):
+        """Close the writer and every reader (call on shutdown)"""
+        with self.write_lock:
+            with self._lock:
+                connections, self._connections = self._connections, []
+                self._local = threading.local()
+                self._writer = None
+            
+            for conn in connections:
+                try:
+                    conn.close()
+                except Exception as e:
+                    self.logger.warning(f"Failed to close connection to {self.database_path}: {e}")
@@ -297,11 +297,15 @@ class MainMenuState(GameState):
         y_offset = 35
         
         # Get player data
-        player_level = save_manager.get_player_data("player.level") or 1
-        player_gold = save_manager.get_player_data("currency.gold") or 0
-        player_gems = save_manager.get_player_data("currency.gems") or 0
-        current_world = save_manager.get_player_data("progress.current_world") or 0
-        current_stage = save_manager.get_player_data("progress.current_stage") or 1
+        player_level, player_gold, player_gems, current_world, current_stage = save_manager.get_many([
+            "player.level", "currency.gold", "currency.gems",
+            "progress.current_world", "progress.current_stage"
+        ])
+        player_level = player_level or 1
+        player_gold = player_gold or 0
+        player_gems = player_gems or 0
+        current_world = current_world or 0
+        current_stage = current_stage or 1
         
         stats_data = [
             f"Level: {player_level}",
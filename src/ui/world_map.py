@@ -360,8 +360,9 @@ class WorldMapState(GameState):
         if not save_manager:
             return
         
-        current_stamina = save_manager.get_player_data("stamina.current") or 0
-        max_stamina = save_manager.get_player_data("stamina.max") or Config.MAX_STAMINA_DEFAULT
+        current_stamina, max_stamina = save_manager.get_many(["stamina.current", "stamina.max"])
+        current_stamina = current_stamina or 0
+        max_stamina = max_stamina or Config.MAX_STAMINA_DEFAULT
         
         # Stamina bar background
         pygame.draw.rect(screen, Config.DARK_GRAY, self.stamina_bar_rect)
@@ -515,9 +516,12 @@ class WorldMapState(GameState):
             return
         
         current_time = time.time()
-        last_recharge = save_manager.get_player_data("stamina.last_recharge") or current_time
-        current_stamina = save_manager.get_player_data("stamina.current") or 0
-        max_stamina = save_manager.get_player_data("stamina.max") or Config.MAX_STAMINA_DEFAULT
+        last_recharge, current_stamina, max_stamina = save_manager.get_many(
+            ["stamina.last_recharge", "stamina.current", "stamina.max"]
+        )
+        last_recharge = last_recharge or current_time
+        current_stamina = current_stamina or 0
+        max_stamina = max_stamina or Config.MAX_STAMINA_DEFAULT
         
         # Calculate stamina to add
         time_diff = current_time - last_recharge
@@ -563,8 +567,9 @@ class WorldMapState(GameState):
         if not save_manager:
             return stage_num == 1
         
-        current_world = save_manager.get_player_data("progress.current_world") or 0
-        current_stage = save_manager.get_player_data("progress.current_stage") or 1
+        current_world, current_stage = save_manager.get_many(["progress.current_world", "progress.current_stage"])
+        current_world = current_world or 0
+        current_stage = current_stage or 1
         
         # If it's the current world, check current stage
         if world_id == current_world:
@@ -582,8 +587,9 @@ class WorldMapState(GameState):
         if not save_manager:
             return False
         
-        current_world = save_manager.get_player_data("progress.current_world") or 0
-        current_stage = save_manager.get_player_data("progress.current_stage") or 1
+        current_world, current_stage = save_manager.get_many(["progress.current_world", "progress.current_stage"])
+        current_world = current_world or 0
+        current_stage = current_stage or 1
         
         # Stages in previous worlds are completed
         if world_id < current_world: